@@ -0,0 +1,181 @@
+# app/benchmarks/loadtest_db.py
+"""
+Base de datos para pruebas de carga.
+
+- `InMemoryPool`: reemplazo de `asyncpg.Pool` con lo que usa PostgresClient
+  (sesiones, escrituras en bloque, consultas de traducciones), con latencia
+  por ida y vuelta configurable. Se activa con `SIGN_DB_BACKEND=memory`.
+- `--init-schema`: crea las tablas en una instancia descartable de Postgres
+  (la que apunten las variables `SIGN_DB_*`), p. ej.:
+
+    docker run --rm -d -p 5433:5432 -e POSTGRES_PASSWORD=admin -e POSTGRES_DB=TraductionSigns postgres:16
+    SIGN_DB_PORT=5433 python -m app.benchmarks.loadtest_db --init-schema
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Mismas tablas que usan PostgresClient y los modelos de la API de Node
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id SERIAL PRIMARY KEY,
+    start_time TIMESTAMPTZ NOT NULL,
+    end_time TIMESTAMPTZ NOT NULL
+);
+CREATE TABLE IF NOT EXISTS translations (
+    id SERIAL PRIMARY KEY,
+    sessionId INTEGER NOT NULL REFERENCES sessions(id),
+    textOutput TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE TABLE IF NOT EXISTS system_logs (
+    id SERIAL PRIMARY KEY,
+    sessionId INTEGER NOT NULL REFERENCES sessions(id),
+    eventType TEXT NOT NULL,
+    message TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+"""
+
+
+class _Transaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _Connection:
+    def __init__(self, pool: "InMemoryPool"):
+        self.pool = pool
+
+    def transaction(self) -> _Transaction:
+        return _Transaction()
+
+    async def executemany(self, sql: str, rows: List[tuple]):
+        await self.pool._round_trip(len(rows))
+        self.pool._store(sql, rows)
+
+    async def execute(self, sql: str, *args) -> str:
+        await self.pool._round_trip()
+        if sql.lstrip().upper().startswith("INSERT INTO"):
+            self.pool._store(sql, [args])
+            return "INSERT 0 1"
+        return "UPDATE 0"
+
+
+class _Acquire:
+    def __init__(self, pool: "InMemoryPool"):
+        self.pool = pool
+
+    async def __aenter__(self) -> _Connection:
+        await self.pool._semaphore.acquire()
+        return _Connection(self.pool)
+
+    async def __aexit__(self, *exc):
+        self.pool._semaphore.release()
+        return False
+
+
+class InMemoryPool:
+    """
+    Guarda las filas en memoria. Cada llamada espera `latency_ms` más
+    `per_row_ms` por fila, y a lo sumo `max_size` llamadas van en paralelo,
+    como las conexiones de un pool real.
+    """
+
+    def __init__(self, max_size: int = 10, latency_ms: float = 2.0, per_row_ms: float = 0.01):
+        self.latency = latency_ms / 1000.0
+        self.per_row = per_row_ms / 1000.0
+        self._semaphore = asyncio.Semaphore(max(1, max_size))
+        self._session_ids = itertools.count(1)
+        self.sessions: Dict[int, Dict[str, float]] = {}
+        self.tables: Dict[str, List[tuple]] = defaultdict(list)
+        self.calls = 0
+        self.rows_written = 0
+
+    async def _round_trip(self, rows: int = 1):
+        self.calls += 1
+        await asyncio.sleep(self.latency + self.per_row * rows)
+
+    def _store(self, sql: str, rows: List[tuple]):
+        table = sql.split()[2]  # "INSERT INTO <tabla> ..."
+        self.tables[table].extend(rows)
+        self.rows_written += len(rows)
+
+    def acquire(self) -> _Acquire:
+        return _Acquire(self)
+
+    async def fetchrow(self, sql: str, *args) -> Dict[str, Any]:
+        async with self.acquire():
+            await self._round_trip()
+            if sql.lstrip().upper().startswith("INSERT INTO SESSIONS"):
+                session_id = next(self._session_ids)
+                self.sessions[session_id] = {"start_time": time.time(), "end_time": time.time() + 3600}
+                return {"id": session_id}
+        raise ValueError(f"Consulta no soportada por la base en memoria: {sql}")
+
+    async def execute(self, sql: str, *args) -> str:
+        async with self.acquire():
+            await self._round_trip()
+            if sql.lstrip().upper().startswith("UPDATE SESSIONS") and args and args[0] in self.sessions:
+                self.sessions[args[0]]["end_time"] = time.time()
+                return "UPDATE 1"
+            return "UPDATE 0"
+
+    async def fetch(self, sql: str, *args) -> List[Dict[str, Any]]:
+        async with self.acquire():
+            await self._round_trip()
+            session_id = args[0] if args else None
+            return [
+                {"id": i, "textoutput": text, "confidence": confidence, "created_at": None}
+                for i, (sid, text, confidence) in enumerate(self.tables["translations"], 1)
+                if sid == session_id
+            ][::-1]
+
+    async def close(self):
+        logger.info(
+            f"Base en memoria: {len(self.sessions)} sesiones, {self.rows_written} filas en {self.calls} llamadas."
+        )
+
+
+async def create_memory_pool(min_size: int = 1, max_size: int = 10, latency_ms: float = 2.0, **_db_config) -> InMemoryPool:
+    """Misma firma que `asyncpg.create_pool` (los datos de conexión se ignoran)."""
+    return InMemoryPool(max_size=max_size, latency_ms=latency_ms)
+
+
+async def init_schema():
+    import asyncpg
+
+    from app import config
+
+    connection = await asyncpg.connect(**config.db_config())
+    try:
+        await connection.execute(SCHEMA_SQL)
+    finally:
+        await connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Base de datos para pruebas de carga.")
+    parser.add_argument("--init-schema", action="store_true", help="Crea las tablas en la base de SIGN_DB_*")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.init_schema:
+        asyncio.run(init_schema())
+        logger.info("Esquema creado.")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+# app/benchmarks/mjpeg_server.py
+"""
+Servidor MJPEG local que imita a la ESP32-CAM para pruebas de carga.
+
+Reproduce un clip grabado (o frames sintéticos) en bucle a los FPS,
+resolución y jitter pedidos, con el mismo formato multipart que el firmware
+de la cámara. Todos los clientes reciben el mismo frame, como con la cámara
+real. Cada frame lleva estampada la hora de envío (una franja de bloques
+blanco/negro abajo) para que `ws_swarm` mida la latencia de punta a punta.
+
+Uso:
+    python -m app.benchmarks.mjpeg_server --video clips/demo.mp4 --fps 25 --width 640 --height 480 --jitter-ms 15
+    SIGN_CAMERA_ESP32_URL=http://127.0.0.1:8081/stream uvicorn app.main:app
+"""
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BOUNDARY = "123456789000000000000987654321"
+# Franja de tiempo: 2 filas x 24 bloques; primer bloque blanco y último negro como guarda
+STAMP_COLUMNS = 24
+STAMP_ROWS = 2
+STAMP_BITS = STAMP_COLUMNS * STAMP_ROWS - 2
+
+
+def stamp_frame(frame: np.ndarray, timestamp_ms: int) -> np.ndarray:
+    """Escribe `timestamp_ms` (módulo 2^46) en la franja inferior del frame, en su lugar."""
+    height, width = frame.shape[:2]
+    # Bloques proporcionales al ancho: la lectura funciona igual en miniaturas
+    block = width / STAMP_COLUMNS
+    bits = [1] + [(timestamp_ms >> i) & 1 for i in range(STAMP_BITS)] + [0]
+    for index, bit in enumerate(bits):
+        row, column = divmod(index, STAMP_COLUMNS)
+        y0, y1 = int(height - (STAMP_ROWS - row) * block), int(height - (STAMP_ROWS - row - 1) * block)
+        frame[y0:y1, int(column * block):int((column + 1) * block)] = 255 if bit else 0
+    return frame
+
+
+def read_stamp(frame: np.ndarray) -> Optional[int]:
+    """Lee la franja de `stamp_frame` (tolera JPEG y reescalado); None si no hay una válida."""
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    height, width = gray.shape[:2]
+    block = width / STAMP_COLUMNS
+    bits = []
+    for index in range(STAMP_COLUMNS * STAMP_ROWS):
+        row, column = divmod(index, STAMP_COLUMNS)
+        # Centro del bloque, lejos de los bordes que el JPEG difumina
+        y = int(height - (STAMP_ROWS - row - 0.5) * block)
+        x = int((column + 0.5) * block)
+        quarter = max(1, int(block / 4))
+        bits.append(gray[y - quarter:y + quarter, x - quarter:x + quarter].mean() >= 128)
+    if not bits[0] or bits[-1]:
+        return None
+    return sum(1 << i for i, bit in enumerate(bits[1:-1]) if bit)
+
+
+def decode_stamp_latency(jpeg: bytes, now: Optional[float] = None) -> Optional[float]:
+    """Segundos desde que el servidor MJPEG envió el frame (mismo reloj: misma máquina o NTP)."""
+    frame = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    if frame is None:
+        return None
+    stamp = read_stamp(frame)
+    if stamp is None:
+        return None
+    now_ms = int((time.time() if now is None else now) * 1000) % (1 << STAMP_BITS)
+    return ((now_ms - stamp) % (1 << STAMP_BITS)) / 1000.0
+
+
+def load_frames(video: Optional[str], width: int, height: int, max_frames: int) -> List[np.ndarray]:
+    """Frames del clip redimensionados, o sintéticos (fondo y un círculo en movimiento) si no hay clip."""
+    frames = []
+    if video:
+        capture = cv2.VideoCapture(video)
+        while len(frames) < max_frames:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            frames.append(cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA))
+        capture.release()
+        if not frames:
+            raise ValueError(f"No se pudieron leer frames de {video}")
+        return frames
+    gradient = np.tile(np.linspace(40, 160, width, dtype=np.uint8), (height, 1))
+    for i in range(min(max_frames, 120)):
+        frame = cv2.cvtColor(gradient, cv2.COLOR_GRAY2BGR)
+        center = (int(width * (0.2 + 0.6 * (i % 60) / 60)), height // 2)
+        cv2.circle(frame, center, max(8, height // 8), (60, 170, 230), -1)
+        frames.append(frame)
+    return frames
+
+
+class FrameSource:
+    """Productor único: avanza el clip a los FPS pedidos y reparte el último JPEG a todos los clientes."""
+
+    def __init__(
+        self,
+        frames: List[np.ndarray],
+        fps: float = 25.0,
+        jitter_ms: float = 0.0,
+        drop_rate: float = 0.0,
+        quality: int = 80,
+        stamp: bool = True,
+    ):
+        self.frames = frames
+        self.interval = 1.0 / max(0.1, fps)
+        self.jitter = jitter_ms / 1000.0
+        self.drop_rate = drop_rate
+        self.quality = quality
+        self.stamp = stamp
+        # Sin estampa el JPEG de cada frame se codifica una sola vez
+        self._cache = {} if not stamp else None
+        self._condition = threading.Condition()
+        self.jpeg: Optional[bytes] = None
+        self.timestamp = 0.0
+        self.sequence = 0
+        self.frames_produced = 0
+        self.frames_dropped = 0
+        self.clients = 0
+        self._running = False
+
+    def start(self):
+        self._running = True
+        threading.Thread(target=self._run, name="mjpeg-source", daemon=True).start()
+
+    def stop(self):
+        self._running = False
+
+    def _encode(self, index: int) -> bytes:
+        if self._cache is not None and index in self._cache:
+            return self._cache[index]
+        frame = self.frames[index]
+        if self.stamp:
+            frame = stamp_frame(frame.copy(), int(time.time() * 1000))
+        ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        jpeg = buffer.tobytes()
+        if self._cache is not None:
+            self._cache[index] = jpeg
+        return jpeg
+
+    def _run(self):
+        index = 0
+        next_time = time.perf_counter()
+        while self._running:
+            next_time += self.interval
+            delay = next_time - time.perf_counter() + (random.gauss(0.0, self.jitter) if self.jitter else 0.0)
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -self.interval:
+                # Atrasado más de un frame: se resincroniza en vez de ráfagas
+                next_time = time.perf_counter()
+            index = (index + 1) % len(self.frames)
+            if self.drop_rate and random.random() < self.drop_rate:
+                # Frame perdido (Wi-Fi): los clientes no ven nada nuevo en este intervalo
+                self.frames_dropped += 1
+                continue
+            jpeg = self._encode(index)
+            with self._condition:
+                self.jpeg, self.timestamp = jpeg, time.time()
+                self.sequence += 1
+                self.frames_produced += 1
+                self._condition.notify_all()
+
+    def wait_frame(self, last_sequence: int, timeout: float = 2.0):
+        """
+        Bloquea hasta que haya un frame más nuevo que `last_sequence` (0 = el
+        primero) o venza el plazo; retorna (seq, jpeg, timestamp) actuales, con
+        jpeg None si todavía no se produjo ninguno.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.sequence != last_sequence or not self._running, timeout)
+            return self.sequence, self.jpeg, self.timestamp
+
+    def add_client(self, delta: int):
+        # Los handlers corren en hilos distintos
+        with self._condition:
+            self.clients += delta
+
+    def get_stats(self) -> dict:
+        return {
+            "clients": self.clients,
+            "frames_produced": self.frames_produced,
+            "frames_dropped": self.frames_dropped,
+            "fps": round(1.0 / self.interval, 2),
+            "resolution": list(self.frames[0].shape[1::-1]),
+        }
+
+
+def create_handler(source: FrameSource):
+    class MJPEGHandler(BaseHTTPRequestHandler):
+        # Como el firmware de la ESP32: "/" y "/stream" transmiten, "/capture" entrega un JPEG
+        def do_GET(self):
+            if self.path.startswith("/capture"):
+                _, jpeg, _ = source.wait_frame(0)
+                if jpeg is None:
+                    self._send(503, "text/plain", b"Sin frames todavia")
+                else:
+                    self._send(200, "image/jpeg", jpeg)
+            elif self.path.startswith("/status"):
+                self._send(200, "application/json", json.dumps(source.get_stats()).encode())
+            else:
+                self._stream()
+
+        def _send(self, status: int, content_type: str, body: bytes):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _stream(self):
+            self.send_response(200)
+            self.send_header("Content-Type", f"multipart/x-mixed-replace;boundary={BOUNDARY}")
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            source.add_client(1)
+            sequence = 0
+            try:
+                while True:
+                    new_sequence, jpeg, timestamp = source.wait_frame(sequence)
+                    if jpeg is None or new_sequence == sequence:
+                        continue
+                    sequence = new_sequence
+                    seconds, micros = int(timestamp), int((timestamp % 1) * 1_000_000)
+                    self.wfile.write(
+                        f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n"
+                        f"X-Timestamp: {seconds}.{micros:06d}\r\n\r\n".encode()
+                    )
+                    self.wfile.write(jpeg)
+                    self.wfile.write(b"\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                source.add_client(-1)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return MJPEGHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor MJPEG local que imita a la ESP32-CAM.")
+    parser.add_argument("--video", default=None, help="Clip a reproducir en bucle; por defecto frames sintéticos")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--fps", type=float, default=25.0)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--quality", type=int, default=80, help="Calidad JPEG")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Desvío estándar del intervalo entre frames")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Fracción de frames perdidos (0.05 = 5%%)")
+    parser.add_argument("--max-frames", type=int, default=900, help="Frames del clip que se cargan en memoria")
+    parser.add_argument("--no-stamp", action="store_true", help="Sin franja de tiempo (JPEG precodificados)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    frames = load_frames(args.video, args.width, args.height, args.max_frames)
+    source = FrameSource(frames, args.fps, args.jitter_ms, args.drop_rate, args.quality, stamp=not args.no_stamp)
+    source.start()
+    server = ThreadingHTTPServer((args.host, args.port), create_handler(source))
+    server.daemon_threads = True
+    logger.info(
+        f"MJPEG en http://{args.host}:{args.port}/stream ({len(frames)} frames, {args.width}x{args.height}, "
+        f"{args.fps} FPS, jitter {args.jitter_ms} ms)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+# app/benchmarks/pipeline_benchmark.py
+"""
+Benchmarks offline del pipeline (CPU, sin cámara).
+
+Mide por etapa: detección de manos (MediaPipe), predicción por backend y
+tamaño de lote, dibujo del overlay, codificación JPEG y `process_next_frame`
+de punta a punta, con un video grabado o con landmarks grabados/sintéticos.
+Los resultados se guardan en JSON y se pueden comparar contra una corrida
+anterior.
+
+Uso:
+    python -m app.benchmarks.pipeline_benchmark --video clips/demo.mp4 --output bench.json
+    python -m app.benchmarks.pipeline_benchmark --landmarks grabaciones/*.npy --backends keras tflite \\
+        --compare bench_base.json --max-regression 0.15
+"""
+import argparse
+import itertools
+import json
+import logging
+import platform
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from app import config
+from app.services.replay_camera import LandmarkReplayCamera, load_landmark_frames, synthetic_landmarks
+from app.services.video_protocol import encode_jpeg
+from app.utils.landmark_io import to_windows
+
+logger = logging.getLogger(__name__)
+
+RESULTS_VERSION = 1
+# Métricas que se comparan entre corridas (más bajo es mejor)
+COMPARED_METRICS = ("p50_ms", "p95_ms")
+
+
+def measure(fn: Callable[[], Any], iterations: int, warmup: int = 5) -> Dict[str, float]:
+    """Ejecuta `fn` y resume las latencias por llamada."""
+    for _ in range(warmup):
+        fn()
+    times = np.empty(iterations, dtype=np.float64)
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn()
+        times[i] = time.perf_counter() - start
+    times_ms = times * 1000.0
+    total = float(times.sum())
+    return {
+        "iterations": iterations,
+        "mean_ms": round(float(times_ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(times_ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(times_ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(times_ms, 99)), 4),
+        "max_ms": round(float(times_ms.max()), 4),
+        "calls_per_s": round(iterations / total, 2) if total > 0 else 0.0,
+    }
+
+
+def _result(name: str, params: Dict[str, Any], stats: Dict[str, float]) -> Dict[str, Any]:
+    key = name + "".join(f"[{k}={v}]" for k, v in sorted(params.items()))
+    logger.info(f"{key}: p50={stats['p50_ms']:.3f} ms p95={stats['p95_ms']:.3f} ms ({stats['calls_per_s']}/s)")
+    return {"key": key, "name": name, "params": params, **stats}
+
+
+def read_video_frames(path: str, max_frames: int) -> List[np.ndarray]:
+    capture = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < max_frames:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(frame)
+    capture.release()
+    if not frames:
+        raise ValueError(f"No se pudieron leer frames de {path}")
+    return frames
+
+
+# ---- Benchmarks por etapa ----
+def bench_detect_hands(frames: List[np.ndarray], iterations: int, hand_tracking: bool) -> Dict[str, Any]:
+    from app.services.camera_manager import CameraManager
+
+    options = {**config.camera_options(), "use_grabber": False, "hand_tracking": hand_tracking}
+    camera = CameraManager(**options)
+    frames_cycle = itertools.cycle(frames)
+
+    def step():
+        camera.detect_hands_array(next(frames_cycle))
+
+    return _result("detect_hands", {"hand_tracking": hand_tracking}, measure(step, iterations))
+
+
+def bench_predict(classifier, sequences: np.ndarray, batch_size: int, iterations: int, backend: str) -> Dict[str, Any]:
+    scaled = classifier.scale_sequences(sequences)
+    picks = np.resize(np.arange(len(scaled)), batch_size * 8)
+    batches = itertools.cycle(
+        [np.ascontiguousarray(scaled[picks[i:i + batch_size]]) for i in range(0, len(picks), batch_size)]
+    )
+
+    # Lote 1 = la llamada que hace el pipeline por frame (incluye el mapeo a etiqueta)
+    predict = classifier.predict_scaled if batch_size == 1 else classifier.predict_proba_scaled
+
+    def step():
+        predict(next(batches))
+
+    stats = measure(step, iterations)
+    stats["sequences_per_s"] = round(stats["calls_per_s"] * batch_size, 2)
+    return _result("predict", {"backend": backend, "batch_size": batch_size}, stats)
+
+
+def bench_annotate(processor, frame: np.ndarray, iterations: int) -> Dict[str, Any]:
+    processor.set_render_options(draw_overlay=True)
+    work = frame.copy()
+
+    def step():
+        work[:] = frame
+        processor._annotate_frame(work, "HOLA", 0.93)
+
+    return _result("annotate", {"size": f"{frame.shape[1]}x{frame.shape[0]}"}, measure(step, iterations))
+
+
+def bench_jpeg(frame: np.ndarray, quality: int, scale: float, iterations: int) -> Dict[str, Any]:
+    stats = measure(lambda: encode_jpeg(frame, quality, scale), iterations)
+    stats["bytes"] = len(encode_jpeg(frame, quality, scale))
+    return _result("jpeg_encode", {"quality": quality, "scale": scale}, stats)
+
+
+def bench_end_to_end(processor, iterations: int, source: str, draw_overlay: bool) -> Dict[str, Any]:
+    processor.set_render_options(draw_overlay=draw_overlay)
+
+    def step():
+        processor.process_next_frame()
+
+    stats = measure(step, iterations, warmup=40)  # llena el buffer de secuencia antes de medir
+    stats["inference"] = processor.get_inference_stats()
+    return _result("process_next_frame", {"source": source, "draw_overlay": draw_overlay}, stats)
+
+
+# ---- Comparación entre corridas ----
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], max_regression: float = 0.10) -> List[Dict[str, Any]]:
+    """Lista de benchmarks cuya latencia empeoró más de `max_regression` (fracción) respecto a la base."""
+    base_by_key = {r["key"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in current.get("results", []):
+        base = base_by_key.get(result["key"])
+        if base is None:
+            continue
+        for metric in COMPARED_METRICS:
+            before, after = base.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if change > max_regression:
+                regressions.append({
+                    "key": result["key"],
+                    "metric": metric,
+                    "baseline": before,
+                    "current": after,
+                    "change": round(change, 4),
+                })
+    return regressions
+
+
+def environment_info() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "timestamp": time.time(),
+    }
+
+
+def run_benchmarks(args) -> Dict[str, Any]:
+    from app.models.sign_classifier import SignClassifier
+    from app.services.camera_manager import CameraManager
+    from app.services.video_processor import VideoProcessor
+
+    results: List[Dict[str, Any]] = []
+
+    # Datos de entrada: video grabado y/o landmarks (grabados o sintéticos)
+    video_frames: Optional[List[np.ndarray]] = None
+    if args.video:
+        video_frames = read_video_frames(args.video, args.max_video_frames)
+    if args.landmarks:
+        landmark_frames = load_landmark_frames(args.landmarks)
+    else:
+        landmark_frames = synthetic_landmarks(max(args.iterations, 300))
+    sequences = to_windows(landmark_frames)
+    if len(sequences) == 0:
+        raise ValueError("Se necesitan al menos 30 frames de landmarks.")
+    frame = video_frames[0] if video_frames else np.zeros((480, 640, 3), dtype=np.uint8)
+
+    if video_frames:
+        for tracking in (False, True):
+            results.append(bench_detect_hands(video_frames, args.iterations, tracking))
+
+    classifiers = {}
+    for backend in args.backends:
+        model_path = args.tflite_model if backend == "tflite" and args.tflite_model else config.model_path_for_backend(backend)
+        try:
+            classifiers[backend] = SignClassifier(
+                model_path, config.VOCAB_PATH, config.SCALER_PATH,
+                backend=backend, num_threads=config.TFLITE_THREADS, fold_scaler=config.FOLD_SCALER,
+            )
+        except Exception as e:
+            logger.warning(f"Backend {backend} no disponible, se omite: {e}")
+            continue
+        for batch_size in args.batch_sizes:
+            results.append(bench_predict(classifiers[backend], sequences, batch_size, args.iterations, backend))
+
+    for quality in args.jpeg_qualities:
+        for scale in (1.0, 0.5):
+            results.append(bench_jpeg(frame, quality, scale, args.iterations))
+
+    if classifiers:
+        backend, classifier = next(iter(classifiers.items()))
+        replay = LandmarkReplayCamera(landmark_frames, frame_size=(frame.shape[1], frame.shape[0]))
+        replay.initialize()
+        processor = VideoProcessor(
+            replay, classifier,
+            inference_stride=config.INFERENCE_STRIDE,
+            motion_threshold=config.MOTION_THRESHOLD,
+        )
+        results.append(bench_annotate(processor, frame, args.iterations))
+        for draw in (False, True):
+            results.append(bench_end_to_end(processor, args.iterations, "landmarks", draw))
+
+        if args.video:
+            camera = CameraManager(**{**config.camera_options(), "use_grabber": False})
+            if camera.connect_file(args.video, loop=True, realtime=False):
+                processor = VideoProcessor(
+                    camera, classifier,
+                    inference_stride=config.INFERENCE_STRIDE,
+                    motion_threshold=config.MOTION_THRESHOLD,
+                )
+                for draw in (False, True):
+                    results.append(bench_end_to_end(processor, args.iterations, "video", draw))
+                camera.close()
+
+    return {
+        "version": RESULTS_VERSION,
+        "environment": environment_info(),
+        "settings": {
+            "backends": list(classifiers),
+            "inference_stride": config.INFERENCE_STRIDE,
+            "motion_threshold": config.MOTION_THRESHOLD,
+            "hand_tracking": config.HAND_TRACKING,
+            "landmarks": "recorded" if args.landmarks else "synthetic",
+            "video": args.video,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks offline del pipeline de reconocimiento de señas.")
+    parser.add_argument("--video", default=None, help="Clip grabado (MP4/MJPEG) para MediaPipe y punta a punta")
+    parser.add_argument("--max-video-frames", type=int, default=300)
+    parser.add_argument("--landmarks", nargs="*", default=None, help="Landmarks grabados (.npy/.npz); por defecto sintéticos")
+    parser.add_argument("--backends", nargs="+", default=["keras"], choices=("keras", "tflite"))
+    parser.add_argument("--tflite-model", default=None, help="Modelo .tflite (por defecto SIGN_TFLITE_MODEL_PATH)")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--jpeg-qualities", nargs="+", type=int, default=[70, 40])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", default=None, help="Archivo JSON de resultados")
+    parser.add_argument("--compare", default=None, help="Resultados base (JSON) contra los que comparar")
+    parser.add_argument("--max-regression", type=float, default=0.10, help="Empeoramiento tolerado (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        logger.info(f"Resultados guardados en {args.output}")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, report, args.max_regression)
+        for r in regressions:
+            print(
+                f"[REGRESIÓN] {r['key']} {r['metric']}: {r['baseline']:.3f} -> {r['current']:.3f} ms "
+                f"({r['change']:+.1%})",
+                file=sys.stderr,
+            )
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,360 @@
+# app/benchmarks/ws_swarm.py
+"""
+Enjambre de clientes WebSocket para pruebas de carga.
+
+Abre clientes de `/ws/video` (o de `/ws/landmarks`) en escalones de
+concurrencia y, por escalón, reporta:
+- latencia del pipeline al cliente (marca de tiempo del paquete -> recepción),
+- latencia de punta a punta (hora estampada por `mjpeg_server` en el frame
+  -> recepción; se decodifica una muestra de los frames),
+- FPS entregados por cliente (media, mínimo, p10),
+- RTT de `get_status` en clientes de `/ws/control` (respuesta del event loop),
+- CPU y RSS del servidor (proceso y sus hijos, con `--server-pid`),
+- descartes del broadcaster y del buffer de BD según `/health`.
+
+Uso (servidor, cámara simulada y enjambre en la misma máquina):
+    python -m app.benchmarks.mjpeg_server --fps 25 &
+    SIGN_CAMERA_ESP32_URL=http://127.0.0.1:8081/stream SIGN_DB_BACKEND=memory uvicorn app.main:app &
+    python -m app.benchmarks.ws_swarm --ramp 1 5 10 25 50 --protocol binary --server-pid $! --output carga.json
+"""
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.benchmarks.mjpeg_server import decode_stamp_latency
+from app.services.landmark_protocol import NUM_LANDMARKS, pack_landmark_frame
+from app.services.video_protocol import BINARY_HEADER
+from app.utils.performance_monitor import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+LEGACY_FRAME_PREFIX = '{"type": "video_frame"'
+
+
+def _latency(histogram: LatencyHistogram) -> Dict[str, float]:
+    return {
+        "count": histogram.count,
+        "p50_ms": round(histogram.quantile(0.5) * 1000, 2),
+        "p95_ms": round(histogram.quantile(0.95) * 1000, 2),
+        "p99_ms": round(histogram.quantile(0.99) * 1000, 2),
+        "max_ms": round(histogram.max_seen * 1000, 2),
+    }
+
+
+class StepStats:
+    """Métricas de un escalón; se reinicia al empezar cada ventana de medición."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.pipeline = LatencyHistogram()
+        self.end_to_end = LatencyHistogram()
+        self.control_rtt = LatencyHistogram()
+        self.landmark_rtt = LatencyHistogram()
+        self.cpu_percent: List[float] = []
+        self.rss_bytes: List[int] = []
+
+
+class ClientStats:
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+        self.connected = False
+        self.error: Optional[str] = None
+
+    def record(self, size: int):
+        self.frames += 1
+        self.bytes += size
+
+
+class Swarm:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.http_base = args.server.rstrip("/")
+        self.ws_base = "ws" + self.http_base[len("http"):]
+        self.clients: Dict[int, ClientStats] = {}
+        self.tasks: List[asyncio.Task] = []
+        self.step = StepStats()
+        # Decodificar JPEG para leer la estampa no debe frenar la recepción
+        self.decode_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="swarm-decode")
+        self.decode_pending = 0
+
+    # ---- Clientes ----
+    def _video_url(self) -> str:
+        a = self.args
+        path = "/ws/video" if a.stream == "default" else f"/ws/video/{a.stream}"
+        return f"{self.ws_base}{path}?protocol={a.protocol}&mode={a.mode}&overlay={a.overlay}"
+
+    def _sample_stamp(self, stats: ClientStats, jpeg_source, received: float):
+        """Lee la estampa de 1 de cada N frames en el pool (se descarta si el pool va atrasado)."""
+        if self.args.stamp_every <= 0 or stats.frames % self.args.stamp_every or self.decode_pending > 8:
+            return
+        step = self.step
+        self.decode_pending += 1
+
+        def decode():
+            jpeg = jpeg_source()
+            return decode_stamp_latency(jpeg, received) if jpeg else None
+
+        def done(future):
+            self.decode_pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                return
+            latency = future.result()
+            if latency is not None and step is self.step:
+                step.end_to_end.record(latency)
+
+        future = asyncio.get_running_loop().run_in_executor(self.decode_pool, decode)
+        future.add_done_callback(done)
+
+    async def video_client(self, index: int):
+        import websockets
+
+        stats = self.clients[index] = ClientStats()
+        try:
+            async with websockets.connect(self._video_url(), max_size=None, ping_interval=None) as ws:
+                stats.connected = True
+                async for message in ws:
+                    received = time.time()
+                    if isinstance(message, bytes):
+                        _, _, timestamp, _ = BINARY_HEADER.unpack_from(message)
+                        stats.record(len(message))
+                        self.step.pipeline.record(received - timestamp)
+                        self._sample_stamp(stats, lambda m=message: m[BINARY_HEADER.size:], received)
+                    elif message.startswith(LEGACY_FRAME_PREFIX):
+                        # El JSON legado no trae marca de tiempo: solo la estampa del frame
+                        stats.record(len(message))
+                        self._sample_stamp(stats, lambda m=message: self._legacy_jpeg(m), received)
+                    elif self.args.mode == "preview":
+                        data = json.loads(message)
+                        if data.get("type") == "frame_metadata":
+                            stats.record(len(message))
+                            self.step.pipeline.record(received - data["timestamp"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            stats.error = str(e) or type(e).__name__
+        finally:
+            stats.connected = False
+
+    @staticmethod
+    def _legacy_jpeg(message: str) -> Optional[bytes]:
+        frame_uri = json.loads(message).get("frame")
+        return base64.b64decode(frame_uri.split(",", 1)[1]) if frame_uri else None
+
+    async def landmark_client(self, index: int):
+        """Envía landmarks sintéticos a `--landmark-fps`; cada predicción cuenta como frame entregado."""
+        import websockets
+
+        stats = self.clients[index] = ClientStats()
+        rng = np.random.default_rng(index)
+        hand = rng.uniform(0.3, 0.7, size=(1, NUM_LANDMARKS, 3)).astype(np.float32)
+        sent: "OrderedDict[int, float]" = OrderedDict()
+
+        async def send_frames(ws):
+            interval = 1.0 / max(1.0, self.args.landmark_fps)
+            seq = 0
+            while True:
+                seq += 1
+                moved = hand + rng.normal(0.0, 0.01, size=hand.shape).astype(np.float32)
+                sent[seq] = time.perf_counter()
+                if len(sent) > 256:
+                    sent.popitem(last=False)
+                await ws.send(pack_landmark_frame(seq, time.time(), moved))
+                await asyncio.sleep(interval)
+
+        try:
+            async with websockets.connect(f"{self.ws_base}/ws/landmarks", ping_interval=None) as ws:
+                stats.connected = True
+                sender = asyncio.create_task(send_frames(ws))
+                try:
+                    async for message in ws:
+                        data = json.loads(message)
+                        if data.get("type") == "prediction":
+                            stats.record(len(message))
+                            start = sent.pop(data["seq"], None)
+                            if start is not None:
+                                self.step.landmark_rtt.record(time.perf_counter() - start)
+                        elif data.get("type") == "error":
+                            stats.error = data.get("message")
+                finally:
+                    sender.cancel()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            stats.error = str(e) or type(e).__name__
+        finally:
+            stats.connected = False
+
+    async def control_client(self):
+        """Pide `get_status` periódicamente y mide la respuesta: si el event loop se traba, sube el RTT."""
+        import websockets
+
+        try:
+            async with websockets.connect(f"{self.ws_base}/ws/control", ping_interval=None) as ws:
+                while True:
+                    start = time.perf_counter()
+                    await ws.send(json.dumps({"command": "get_status", "stream_id": self.args.stream}))
+                    while json.loads(await ws.recv()).get("type") != "system_status":
+                        pass
+                    self.step.control_rtt.record(time.perf_counter() - start)
+                    await asyncio.sleep(self.args.control_interval)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Cliente de control desconectado: {e}")
+
+    # ---- Servidor ----
+    async def sample_server(self, pid: int):
+        import psutil
+
+        root = psutil.Process(pid)
+        tracked: Dict[int, Any] = {}
+        while True:
+            cpu, rss = 0.0, 0
+            try:
+                processes = [root] + root.children(recursive=True)
+            except psutil.Error:
+                logger.warning(f"El proceso {pid} ya no existe.")
+                return
+            for process in processes:
+                known = tracked.setdefault(process.pid, process)
+                try:
+                    # Multi-proceso (SIGN_EXECUTOR_BACKEND=process): se suman los workers
+                    cpu += known.cpu_percent(None)
+                    rss += known.memory_info().rss
+                except psutil.Error:
+                    tracked.pop(process.pid, None)
+            self.step.cpu_percent.append(cpu)
+            self.step.rss_bytes.append(rss)
+            await asyncio.sleep(1.0)
+
+    def _fetch_health(self) -> Optional[Dict[str, Any]]:
+        try:
+            with urllib.request.urlopen(f"{self.http_base}/health", timeout=5) as response:
+                return json.loads(response.read())
+        except Exception as e:
+            logger.warning(f"No se pudo leer /health: {e}")
+            return None
+
+    # ---- Escalones ----
+    def _spawn(self, target: int):
+        client = self.landmark_client if self.args.kind == "landmarks" else self.video_client
+        while len(self.tasks) < target:
+            self.tasks.append(asyncio.create_task(client(len(self.tasks))))
+
+    async def run_step(self, concurrency: int) -> Dict[str, Any]:
+        self._spawn(concurrency)
+        # Las conexiones nuevas se asientan antes de medir
+        await asyncio.sleep(self.args.settle_seconds)
+        start_frames = {i: c.frames for i, c in self.clients.items()}
+        start_bytes = sum(c.bytes for c in self.clients.values())
+        self.step = step = StepStats()
+        await asyncio.sleep(self.args.step_seconds)
+        elapsed = time.perf_counter() - step.started
+
+        fps = np.array([(c.frames - start_frames.get(i, 0)) / elapsed for i, c in self.clients.items()] or [0.0])
+        health = await asyncio.to_thread(self._fetch_health)
+        result = {
+            "concurrency": concurrency,
+            "connected": sum(c.connected for c in self.clients.values()),
+            "errors": sorted({c.error for c in self.clients.values() if c.error}),
+            "fps_mean": round(float(fps.mean()), 2),
+            "fps_min": round(float(fps.min()), 2),
+            "fps_p10": round(float(np.percentile(fps, 10)), 2),
+            "mbps": round((sum(c.bytes for c in self.clients.values()) - start_bytes) * 8 / 1e6 / elapsed, 2),
+            "pipeline_latency": _latency(step.pipeline),
+            "end_to_end_latency": _latency(step.end_to_end),
+            "control_rtt": _latency(step.control_rtt),
+            "landmark_rtt": _latency(step.landmark_rtt),
+            "server_cpu_percent_mean": round(float(np.mean(step.cpu_percent)), 1) if step.cpu_percent else None,
+            "server_cpu_percent_max": round(float(np.max(step.cpu_percent)), 1) if step.cpu_percent else None,
+            "server_rss_mb_max": round(max(step.rss_bytes) / 2**20, 1) if step.rss_bytes else None,
+        }
+        if health is not None:
+            stream = health.get("streams", {}).get(self.args.stream, {})
+            result["server_broadcast"] = stream.get("video_broadcast")
+            result["server_db_buffer"] = health.get("db_buffer")
+        return result
+
+    async def run(self) -> List[Dict[str, Any]]:
+        background = [asyncio.create_task(self.control_client()) for _ in range(self.args.control_clients)]
+        if self.args.server_pid:
+            background.append(asyncio.create_task(self.sample_server(self.args.server_pid)))
+        results = []
+        try:
+            for concurrency in self.args.ramp:
+                result = await self.run_step(concurrency)
+                results.append(result)
+                log_step(result)
+                if self._saturated(result):
+                    logger.info(f"Límite alcanzado con {concurrency} clientes; se detiene la rampa.")
+                    break
+        finally:
+            for task in self.tasks + background:
+                task.cancel()
+            await asyncio.gather(*self.tasks, *background, return_exceptions=True)
+            self.decode_pool.shutdown(wait=False)
+        return results
+
+    def _saturated(self, result: Dict[str, Any]) -> bool:
+        a = self.args
+        latency = result["end_to_end_latency"] if result["end_to_end_latency"]["count"] else result["pipeline_latency"]
+        if a.max_p95_ms and latency["p95_ms"] > a.max_p95_ms:
+            return True
+        return bool(a.min_fps and result["fps_p10"] < a.min_fps)
+
+
+def log_step(result: Dict[str, Any]):
+    e2e, pipeline = result["end_to_end_latency"], result["pipeline_latency"]
+    logger.info(
+        f"{result['concurrency']:>4} clientes ({result['connected']} conectados): "
+        f"FPS media={result['fps_mean']} p10={result['fps_p10']} min={result['fps_min']} | "
+        f"pipeline p50={pipeline['p50_ms']} p95={pipeline['p95_ms']} ms | "
+        f"e2e p50={e2e['p50_ms']} p95={e2e['p95_ms']} ms | "
+        f"control p95={result['control_rtt']['p95_ms']} ms | "
+        f"CPU={result['server_cpu_percent_mean']}% RSS={result['server_rss_mb_max']} MB"
+    )
+    if result["errors"]:
+        logger.warning(f"Errores: {result['errors'][:5]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enjambre de clientes WebSocket para pruebas de carga.")
+    parser.add_argument("--server", default="http://127.0.0.1:8000")
+    parser.add_argument("--kind", choices=("video", "landmarks"), default="video", help="Clientes que se escalan")
+    parser.add_argument("--ramp", nargs="+", type=int, default=[1, 5, 10, 25, 50], help="Clientes por escalón")
+    parser.add_argument("--step-seconds", type=float, default=20.0, help="Ventana de medición por escalón")
+    parser.add_argument("--settle-seconds", type=float, default=3.0, help="Espera tras abrir las conexiones")
+    parser.add_argument("--stream", default="default", help="Stream de /ws/video/{stream_id}")
+    parser.add_argument("--protocol", choices=("json", "binary"), default="binary")
+    parser.add_argument("--mode", choices=("full", "thumbnail", "preview"), default="full")
+    parser.add_argument("--overlay", choices=("server", "client", "none"), default="server")
+    parser.add_argument("--stamp-every", type=int, default=10, help="Decodifica la estampa de 1 de cada N frames (0 = nunca)")
+    parser.add_argument("--landmark-fps", type=float, default=30.0)
+    parser.add_argument("--control-clients", type=int, default=1)
+    parser.add_argument("--control-interval", type=float, default=1.0)
+    parser.add_argument("--server-pid", type=int, default=None, help="PID de uvicorn para medir CPU/RSS")
+    parser.add_argument("--max-p95-ms", type=float, default=None, help="Detiene la rampa si la latencia p95 lo supera")
+    parser.add_argument("--min-fps", type=float, default=None, help="Detiene la rampa si el p10 de FPS baja de esto")
+    parser.add_argument("--output", default=None, help="Archivo JSON de resultados")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    results = asyncio.run(Swarm(args).run())
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "steps": results}, f, indent=2)
+        logger.info(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
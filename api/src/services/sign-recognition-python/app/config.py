@@ -0,0 +1,231 @@
+# app/config.py
+"""Configuración del micro-servicio leída desde variables de entorno."""
+import os
+
+
+def _env_str(name: str, default: str) -> str:
+    return os.getenv(name, default)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# ---- Modelo ----
+MODEL_PATH = _env_str("SIGN_MODEL_PATH", "trained_models/model_2/best_colombian_model.keras")
+VOCAB_PATH = _env_str("SIGN_VOCAB_PATH", "trained_models/model_2/sign_language_vocabulary.json")
+SCALER_PATH = _env_str("SIGN_SCALER_PATH", "trained_models/model_2/scaler.save")
+# "keras" (TensorFlow completo) o "tflite" (intérprete liviano, ver app/models/export_tflite.py)
+MODEL_BACKEND = _env_str("SIGN_MODEL_BACKEND", "keras")
+TFLITE_MODEL_PATH = _env_str("SIGN_TFLITE_MODEL_PATH", "trained_models/model_2/best_colombian_model_float16.tflite")
+TFLITE_THREADS = _env_int("SIGN_TFLITE_THREADS", 1)
+# Integra el StandardScaler como capa Normalization al inicio del grafo (backend keras)
+FOLD_SCALER = _env_bool("SIGN_FOLD_SCALER", True)
+# Carpeta con una subcarpeta por versión (modelo + scaler.save + vocabulario) para el cambio en caliente
+MODEL_DIR = _env_str("SIGN_MODEL_DIR", "trained_models")
+# Fracción de secuencias que se evalúan con el modelo en sombra si el comando no la indica
+SHADOW_SAMPLE_RATE = _env_float("SIGN_SHADOW_SAMPLE_RATE", 0.1)
+
+
+
+def model_path_for_backend(backend: str = MODEL_BACKEND) -> str:
+    return TFLITE_MODEL_PATH if backend == "tflite" else MODEL_PATH
+
+
+# ---- Ejecución del pipeline ----
+# "thread": hilo dedicado dentro del proceso del servidor
+# "process": proceso hijo con su propia cámara, MediaPipe y modelo
+EXECUTOR_BACKEND = _env_str("SIGN_EXECUTOR_BACKEND", "thread")
+
+# ---- Política de inferencia ----
+# El modelo corre cada N frames, o antes si el movimiento medio de los landmarks
+# (coordenadas relativas a la muñeca) supera el umbral. Negativo = sin umbral.
+INFERENCE_STRIDE = _env_int("SIGN_INFERENCE_STRIDE", 3)
+_motion = _env_float("SIGN_MOTION_THRESHOLD", 0.02)
+MOTION_THRESHOLD = _motion if _motion >= 0 else None
+
+# ---- Inferencia por lotes (varios streams en un mismo proceso) ----
+BATCH_INFERENCE = _env_bool("SIGN_BATCH_INFERENCE", False)
+BATCH_MAX_SIZE = _env_int("SIGN_BATCH_MAX_SIZE", 16)
+BATCH_MAX_WAIT_MS = _env_float("SIGN_BATCH_MAX_WAIT_MS", 8.0)
+
+# ---- Decodificación temporal de señas ----
+DECODER_MODE = _env_str("SIGN_DECODER_MODE", "majority")  # "majority" o "ema"
+DECODER_WINDOW = _env_int("SIGN_DECODER_WINDOW", 7)
+DECODER_EMA_ALPHA = _env_float("SIGN_DECODER_EMA_ALPHA", 0.3)
+DECODER_ENTER_THRESHOLD = _env_float("SIGN_DECODER_ENTER_THRESHOLD", 0.8)
+DECODER_EXIT_THRESHOLD = _env_float("SIGN_DECODER_EXIT_THRESHOLD", 0.6)
+DECODER_MIN_HOLD = _env_float("SIGN_DECODER_MIN_HOLD", 0.3)
+# Frames seguidos sin seña (p. ej. sin manos) que liberan la seña activa
+DECODER_RELEASE_FRAMES = _env_int("SIGN_DECODER_RELEASE_FRAMES", 3)
+
+
+def decoder_options() -> dict:
+    return {
+        "mode": DECODER_MODE,
+        "window": DECODER_WINDOW,
+        "ema_alpha": DECODER_EMA_ALPHA,
+        "enter_threshold": DECODER_ENTER_THRESHOLD,
+        "exit_threshold": DECODER_EXIT_THRESHOLD,
+        "min_hold": DECODER_MIN_HOLD,
+        "release_frames": DECODER_RELEASE_FRAMES,
+    }
+
+
+# ---- Cámara ----
+# Hilo que drena la cámara y conserva solo el frame más reciente
+CAMERA_GRABBER = _env_bool("SIGN_CAMERA_GRABBER", True)
+# Fuentes que se prueban al arrancar, en paralelo y con tiempo límite (ESP32 tiene prioridad).
+# URL vacía / índice negativo = no probar esa fuente.
+CAMERA_ESP32_URL = _env_str("SIGN_CAMERA_ESP32_URL", "http://192.168.126.15:81/")
+CAMERA_LOCAL_INDEX = _env_int("SIGN_CAMERA_LOCAL_INDEX", 0)
+CAMERA_PROBE_TIMEOUT = _env_float("SIGN_CAMERA_PROBE_TIMEOUT", 3.0)
+# Clip grabado (MP4/MJPEG) que reemplaza a la cámara, en bucle y a su ritmo original
+CAMERA_FILE = _env_str("SIGN_CAMERA_FILE", "")
+
+# ---- Detección de manos ----
+# Tracking (opcional): detección sobre copia reducida y, con manos presentes, solo en un recorte
+# alrededor de ellas. Desactivado por defecto: MediaPipe con su propio tracking es la referencia de precisión
+HAND_TRACKING = _env_bool("SIGN_HAND_TRACKING", False)
+DETECTION_SCALE = _env_float("SIGN_DETECTION_SCALE", 1.0)
+ROI_MARGIN = _env_float("SIGN_ROI_MARGIN", 0.25)
+ROI_MAX_SIDE = _env_int("SIGN_ROI_MAX_SIDE", 256)
+REDETECT_INTERVAL = _env_int("SIGN_REDETECT_INTERVAL", 10)
+# Procesos dedicados a MediaPipe (0 = en el mismo hilo del pipeline); cada stream se fija a uno
+DETECTION_WORKERS = _env_int("SIGN_DETECTION_WORKERS", 0)
+
+
+def camera_options() -> dict:
+    return {
+        "use_grabber": CAMERA_GRABBER,
+        "hand_tracking": HAND_TRACKING,
+        "detection_scale": DETECTION_SCALE,
+        "roi_margin": ROI_MARGIN,
+        "roi_max_side": ROI_MAX_SIDE,
+        "redetect_interval": REDETECT_INTERVAL,
+        "source_file": CAMERA_FILE or None,
+        "esp32_url": CAMERA_ESP32_URL or None,
+        "local_index": CAMERA_LOCAL_INDEX if CAMERA_LOCAL_INDEX >= 0 else None,
+        "probe_timeout": CAMERA_PROBE_TIMEOUT,
+    }
+
+# Campos de camera_options() que eligen la fuente (el resto configura la detección)
+CAMERA_SOURCE_OPTIONS = ("source_file", "esp32_url", "local_index", "probe_timeout")
+
+
+def camera_options_for_source(source: dict) -> dict:
+    """
+    Opciones de cámara para una fuente fija, sin probar otras:
+    {"type": "esp32", "url": ...}, {"type": "local", "index": 1} o {"type": "file", "path": ...}.
+    """
+    options = {**camera_options(), "source_file": None, "esp32_url": None, "local_index": None}
+    kind = source.get("type")
+    if kind == "esp32" and source.get("url"):
+        options["esp32_url"] = source["url"]
+    elif kind == "local":
+        options["local_index"] = int(source.get("index", 0))
+    elif kind == "file" and source.get("path"):
+        options["source_file"] = source["path"]
+    else:
+        raise ValueError(f"Fuente de cámara inválida: {source}")
+    return options
+
+
+# ---- Streams (varias cámaras en el mismo proceso) ----
+# Streams adicionales al arrancar: "aula1=esp32:http://10.0.0.21:81/,aula2=local:1,demo=file:clips/demo.mp4"
+STREAMS = _env_str("SIGN_STREAMS", "")
+MAX_STREAMS = _env_int("SIGN_MAX_STREAMS", 16)
+
+
+def stream_sources() -> dict:
+    """Interpreta SIGN_STREAMS como {stream_id: fuente}; las entradas mal formadas se ignoran."""
+    sources = {}
+    for entry in STREAMS.split(","):
+        stream_id, _, spec = entry.strip().partition("=")
+        kind, _, target = spec.partition(":")
+        if not stream_id or not target:
+            continue
+        if kind == "esp32":
+            sources[stream_id] = {"type": "esp32", "url": target}
+        elif kind == "local" and target.lstrip("-").isdigit():
+            sources[stream_id] = {"type": "local", "index": int(target)}
+        elif kind == "file":
+            sources[stream_id] = {"type": "file", "path": target}
+    return sources
+
+# ---- Difusión de video ----
+VIDEO_CLIENT_QUEUE_SIZE = _env_int("SIGN_VIDEO_QUEUE_SIZE", 2)
+# Protocolo binario: segundos entre mensajes de predicción/métricas (además de cada cambio de predicción)
+BINARY_METADATA_INTERVAL = _env_float("SIGN_BINARY_METADATA_INTERVAL", 0.25)
+# Overlay por defecto de los clientes de video: "server" (frames anotados),
+# "client" (frames sin dibujar + landmarks como datos) o "none"
+VIDEO_OVERLAY = _env_str("SIGN_VIDEO_OVERLAY", "server")
+
+# ---- Streaming adaptativo por cliente ----
+ADAPTIVE_STREAMING = _env_bool("SIGN_ADAPTIVE_STREAMING", True)
+STREAM_MIN_QUALITY = _env_int("SIGN_STREAM_MIN_QUALITY", 30)
+STREAM_MAX_QUALITY = _env_int("SIGN_STREAM_MAX_QUALITY", 70)
+STREAM_MIN_SCALE = _env_float("SIGN_STREAM_MIN_SCALE", 0.5)
+STREAM_MIN_FPS = _env_float("SIGN_STREAM_MIN_FPS", 5.0)
+STREAM_MAX_FPS = _env_float("SIGN_STREAM_MAX_FPS", 30.0)
+
+# ---- Reconocimiento offline de videos ----
+# Directorio desde el que /recognize/video puede leer archivos por ruta (vacío = solo subidas)
+OFFLINE_VIDEO_DIR = _env_str("SIGN_OFFLINE_VIDEO_DIR", "")
+OFFLINE_BATCH_SIZE = _env_int("SIGN_OFFLINE_BATCH_SIZE", 64)
+OFFLINE_MAX_JOBS = _env_int("SIGN_OFFLINE_MAX_JOBS", 1)
+
+# ---- Grabación de landmarks por sesión ----
+# Archivos .lmk (landmarks + predicción por frame) para re-evaluar sesiones con otro modelo
+LANDMARK_RECORDING = _env_bool("SIGN_LANDMARK_RECORDING", False)
+LANDMARK_DIR = _env_str("SIGN_LANDMARK_DIR", "recordings/landmarks")
+LANDMARK_CHUNK_FRAMES = _env_int("SIGN_LANDMARK_CHUNK_FRAMES", 1024)
+
+# ---- Ingesta de landmarks (/ws/landmarks) ----
+# Clientes que ya corren MediaPipe y envían solo landmarks; sin cámara ni JPEG en el servidor
+LANDMARK_MAX_CLIENTS = _env_int("SIGN_LANDMARK_MAX_CLIENTS", 500)
+
+# ---- Base de datos ----
+DB_HOST = _env_str("SIGN_DB_HOST", "localhost")
+DB_PORT = _env_int("SIGN_DB_PORT", 5432)
+DB_NAME = _env_str("SIGN_DB_NAME", "TraductionSigns")
+DB_USER = _env_str("SIGN_DB_USER", "postgres")
+DB_PASSWORD = _env_str("SIGN_DB_PASSWORD", "admin")
+# "postgres" o "memory" (base en memoria para pruebas de carga, ver app/benchmarks/loadtest_db.py)
+DB_BACKEND = _env_str("SIGN_DB_BACKEND", "postgres")
+DB_MEMORY_LATENCY_MS = _env_float("SIGN_DB_MEMORY_LATENCY_MS", 2.0)
+DB_POOL_MIN_SIZE = _env_int("SIGN_DB_POOL_MIN_SIZE", 1)
+DB_POOL_MAX_SIZE = _env_int("SIGN_DB_POOL_MAX_SIZE", 10)
+# Escritura diferida: se vacía al llegar a N registros o cada X segundos
+DB_FLUSH_SIZE = _env_int("SIGN_DB_FLUSH_SIZE", 100)
+DB_FLUSH_INTERVAL = _env_float("SIGN_DB_FLUSH_INTERVAL", 1.0)
+DB_MAX_PENDING = _env_int("SIGN_DB_MAX_PENDING", 10000)
+# Segundos que las escrituras con await esperan lugar en el buffer lleno (el bucle de frames nunca espera)
+DB_ENQUEUE_TIMEOUT = _env_float("SIGN_DB_ENQUEUE_TIMEOUT", 5.0)
+
+
+def db_config() -> dict:
+    return {
+        "host": DB_HOST,
+        "port": DB_PORT,
+        "database": DB_NAME,
+        "user": DB_USER,
+        "password": DB_PASSWORD,
+    }
@@ -1,17 +1,36 @@
 # app/main.py
-import base64
 import json
 import asyncio
 import logging
 import time
-import cv2
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+import functools
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, UploadFile, File, Query
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.services.camera_manager import CameraManager
-from app.services.video_processor import VideoProcessor
-from app.utils.performance_monitor import PerformanceMonitor
-from app.models.sign_classifier import SignClassifier
+from app import config
+from app.services.frame_executor import (
+    FrameExecutor, create_video_processor, get_shared_inference_server, get_shared_model_registry,
+)
+from app.services.landmark_ingest import LandmarkIngestor
+from app.services.landmark_protocol import unpack_landmark_frames
+from app.services.stream_registry import DEFAULT_STREAM, StreamRegistry, VideoStream
+from app.services.video_protocol import FramePacket, PROTOCOLS
+from app.services.adaptive_stream import AdaptiveStreamController, STREAM_MODES
+from app.services.frame_renderer import OVERLAY_MODES
+from app.services.video_file_recognizer import (
+    VideoFileRecognizer, STREAM_FORMATS, STREAM_MEDIA_TYPES, format_stream_message,
+)
+from app.utils.landmark_store import LandmarkStore
+from app.utils.performance_monitor import PerformanceMonitor, format_prometheus
 from app.utils.postgres_client import PostgresClient
 
 logging.basicConfig(level=logging.INFO)
@@ -29,96 +48,418 @@ app.add_middleware(
 )
 
 # ---- Componentes globales ----
-camera_manager = CameraManager()
-classifier = SignClassifier(
-    model_path="trained_models/model_2/best_colombian_model.keras",
-    vocab_path="trained_models/model_2/sign_language_vocabulary.json",
-    scaler_path="trained_models/model_2/scaler.save"
-)
+# Cámara, MediaPipe y modelo de cada stream viven dentro de su worker (hilo o proceso dedicado),
+# así el event loop queda libre para /ws/control, /health y la base de datos.
+def create_stream_executor(camera_options: Dict[str, Any]) -> FrameExecutor:
+    return FrameExecutor(
+        functools.partial(
+            create_video_processor,
+            model_path=config.model_path_for_backend(config.MODEL_BACKEND),
+            vocab_path=config.VOCAB_PATH,
+            scaler_path=config.SCALER_PATH,
+            model_backend=config.MODEL_BACKEND,
+            num_threads=config.TFLITE_THREADS,
+            fold_scaler=config.FOLD_SCALER,
+            camera_options=camera_options,
+            inference_stride=config.INFERENCE_STRIDE,
+            motion_threshold=config.MOTION_THRESHOLD,
+            batch_inference=config.BATCH_INFERENCE,
+            batch_max_size=config.BATCH_MAX_SIZE,
+            batch_max_wait_ms=config.BATCH_MAX_WAIT_MS,
+            decoder_options=config.decoder_options(),
+            # Sin clientes no se dibuja nada; se activa según lo que pidan los clientes
+            draw_overlay=False,
+            export_landmarks=False,
+            detection_workers=config.DETECTION_WORKERS,
+            models_root=config.MODEL_DIR,
+        ),
+        backend=config.EXECUTOR_BACKEND,
+    )
+
+
+def create_pool_factory():
+    """Pool de asyncpg, o la base en memoria de las pruebas de carga con SIGN_DB_BACKEND=memory."""
+    if config.DB_BACKEND != "memory":
+        return None
+    from app.benchmarks.loadtest_db import create_memory_pool
+
+    logger.warning("Base de datos en memoria (SIGN_DB_BACKEND=memory): nada se persiste.")
+    return functools.partial(create_memory_pool, latency_ms=config.DB_MEMORY_LATENCY_MS)
+
+
 performance_monitor = PerformanceMonitor()
-db_client = PostgresClient()
-video_processor = VideoProcessor(camera_manager, classifier)
+db_client = PostgresClient(
+    min_pool_size=config.DB_POOL_MIN_SIZE,
+    max_pool_size=config.DB_POOL_MAX_SIZE,
+    flush_size=config.DB_FLUSH_SIZE,
+    flush_interval=config.DB_FLUSH_INTERVAL,
+    max_pending=config.DB_MAX_PENDING,
+    enqueue_timeout=config.DB_ENQUEUE_TIMEOUT,
+    db_config=config.db_config(),
+    pool_factory=create_pool_factory(),
+)
+
+# Trabajos de reconocimiento offline (videos grabados), fuera del pipeline en vivo
+offline_executor = ThreadPoolExecutor(max_workers=max(1, config.OFFLINE_MAX_JOBS), thread_name_prefix="offline-video")
 
 connected_video_clients = set()
 connected_control_clients = set()
 
-# ---- Startup: inicializar cámara y BD ----
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Iniciando cámara automáticamente...")
+# Sesión a la que se asocian las señas confirmadas
+active_session_id: Optional[int] = None
+
+
+_frame_seq = itertools.count(1)
+
+
+def build_frame_packet(stream: VideoStream, result) -> FramePacket:
+    """Arma el paquete compartido; cada formato (JSON/binario) se codifica una vez al pedirse."""
+    frame, prediction, confidence = result
+
+    # Obtener métricas de rendimiento
+    system_usage = performance_monitor.get_system_usage() or {}
+    metrics = {
+        "stream_id": stream.stream_id,
+        "camera_info": stream.executor.camera_status,
+        "fps": stream.executor.fps,
+        "cpu": system_usage.get("cpu_percent"),
+        "ram": system_usage.get("ram_percent"),
+    }
+    performance_monitor.increment("frames_broadcast")
+    return FramePacket(
+        next(_frame_seq), frame, prediction, confidence, metrics,
+        landmarks=stream.executor.landmarks, monitor=performance_monitor,
+    )
+
+
+def handle_sign_event(stream: VideoStream, event: Dict[str, Any]):
+    """Difunde una seña confirmada a los clientes del stream y la persiste si hay una sesión activa."""
+    message = {"type": "sign_committed", "session_id": active_session_id, "stream_id": stream.stream_id, **event}
+    stream.broadcaster.publish_event(json.dumps(message))
+    if active_session_id is not None:
+        # Sin espera: la escritura a BD nunca frena el ciclo de frames
+        if not db_client.save_translation_nowait(active_session_id, event["label"], event["confidence"]):
+            logger.warning("Buffer de la base de datos lleno; se descartó una traducción.")
+
+
+async def set_active_session(session_id: Optional[int]):
+    global active_session_id
+    active_session_id = session_id
+    # Con sesión activa los pipelines siguen aunque no haya dashboards conectados
+    stream_registry.set_keep_alive(session_id is not None)
+    await asyncio.gather(*(update_recording(stream) for stream in stream_registry))
+
+
+async def update_recording(stream: VideoStream):
+    """Graba los landmarks del stream mientras haya una sesión activa (un archivo por sesión y stream)."""
+    if not config.LANDMARK_RECORDING:
+        return
     try:
-        camera_manager.initialize(auto_connect=True)
-        if camera_manager.get_status():
-            logger.info("Cámara iniciada con éxito.")
+        if active_session_id is None:
+            await stream.executor.call("stop_recording")
         else:
-            logger.warning("No se pudo iniciar ninguna cámara.")
+            path = str(landmark_store.path_for(active_session_id, stream.stream_id))
+            await stream.executor.call("start_recording", path, config.LANDMARK_CHUNK_FRAMES)
     except Exception as e:
-        logger.error(f"Error inicializando cámara: {e}")
+        logger.error(f"Error actualizando la grabación de landmarks del stream {stream.stream_id}: {e}")
+
+
+def create_video_stream(stream_id: str, source: Optional[Dict[str, Any]]) -> VideoStream:
+    """Cada stream tiene su worker y su productor; un único productor por stream reparte a todos sus clientes."""
+    camera_options = config.camera_options() if source is None else config.camera_options_for_source(source)
+    return VideoStream(
+        stream_id,
+        create_stream_executor(camera_options),
+        build_frame_packet,
+        handle_sign_event,
+        source=source,
+        queue_size=config.VIDEO_CLIENT_QUEUE_SIZE,
+    )
 
-    # Conexión a Postgres
+
+# Grabaciones de landmarks por sesión (re-evaluación offline, ver app/utils/landmark_store.py)
+landmark_store = LandmarkStore(config.LANDMARK_DIR, chunk_frames=config.LANDMARK_CHUNK_FRAMES)
+stream_registry = StreamRegistry(create_video_stream, max_streams=config.MAX_STREAMS)
+# Stream por defecto (/ws/video): prueba ESP32 y cámara local como siempre
+default_stream = stream_registry.add(DEFAULT_STREAM)
+for _stream_id, _source in config.stream_sources().items():
+    try:
+        stream_registry.add(_stream_id, _source)
+    except ValueError as e:
+        logger.error(f"SIGN_STREAMS: {e}")
+
+# ---- Startup por etapas ----
+# El servidor acepta conexiones de inmediato; modelo, detector y cámara se cargan en segundo plano
+# y /health reporta en qué etapa está (listo cuando "ready" es True).
+startup_state: Dict[str, Any] = {
+    "stage": "starting",
+    "ready": False,
+    "model_ready": False,
+    "camera_connected": False,
+    "database_connected": False,
+    "error": None,
+    "timings_ms": {},
+}
+startup_task: Optional[asyncio.Task] = None
+
+
+async def connect_database():
+    start = time.perf_counter()
     try:
         await db_client.postgres_connection()
+        startup_state["database_connected"] = True
         logger.info("Conectado a la base de datos PostgreSQL.")
     except Exception as e:
         logger.error(f"No se pudo conectar a la base de datos PostgreSQL: {e}")
+    startup_state["timings_ms"]["database"] = round((time.perf_counter() - start) * 1000, 1)
+
+
+async def connect_stream(stream: VideoStream) -> bool:
+    try:
+        connected = await stream.connect()
+    except Exception as e:
+        logger.error(f"Error abriendo la cámara del stream {stream.stream_id}: {e}")
+        return False
+    if not connected:
+        logger.warning(f"No se pudo abrir la cámara del stream {stream.stream_id} ({stream.source}).")
+    return connected
+
+
+async def staged_startup():
+    """Modelo + detector (con warm-up) y luego cámara; la BD conecta en paralelo."""
+    started = time.perf_counter()
+    database = asyncio.create_task(connect_database())
+    try:
+        # La primera llamada crea el pipeline en el worker (carga del modelo y de MediaPipe)
+        startup_state["stage"] = "loading_model"
+        start = time.perf_counter()
+        warmup = await default_stream.executor.call("warm_up")
+        startup_state["timings_ms"]["model_load_and_warmup"] = round((time.perf_counter() - start) * 1000, 1)
+        startup_state["timings_ms"].update(warmup)
+        startup_state["model_ready"] = True
+
+        startup_state["stage"] = "probing_camera"
+        start = time.perf_counter()
+        camera_connected = await default_stream.connect()
+        startup_state["timings_ms"]["camera_probe"] = round((time.perf_counter() - start) * 1000, 1)
+        if camera_connected:
+            startup_state["camera_connected"] = True
+            logger.info("Cámara iniciada con éxito.")
+        else:
+            logger.warning("No se pudo iniciar ninguna cámara.")
+        # Streams de SIGN_STREAMS: sus cámaras se abren en paralelo (el modelo ya está cargado)
+        await asyncio.gather(*(connect_stream(s) for s in stream_registry if s is not default_stream))
+    except Exception as e:
+        startup_state["error"] = str(e)
+        logger.error(f"Error en el arranque del pipeline: {e}")
+
+    await database
+    startup_state["stage"] = "ready" if startup_state["model_ready"] else "failed"
+    startup_state["ready"] = startup_state["model_ready"]
+    startup_state["timings_ms"]["total"] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(f"Arranque terminado: {startup_state['stage']} ({startup_state['timings_ms']['total']} ms)")
+
+
+@app.on_event("startup")
+async def startup_event():
+    global startup_task
+    logger.info("Iniciando pipeline en segundo plano...")
+    stream_registry.start()
+    startup_task = asyncio.create_task(staged_startup())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if startup_task is not None and not startup_task.done():
+        startup_task.cancel()
+    # Detiene productores y cierra cámaras de todos los streams
+    await stream_registry.stop()
+    offline_executor.shutdown(wait=False, cancel_futures=True)
+    # Escribe lo pendiente del buffer y cierra el pool
+    await db_client.close_connection()
 
 # ---- WebSocket: video stream ----
+def create_stream_controller(mode: str) -> AdaptiveStreamController:
+    """Controlador de calidad/escala/FPS por cliente (fijo si el modo adaptativo está apagado)."""
+    if mode not in STREAM_MODES:
+        mode = "full"
+    if not config.ADAPTIVE_STREAMING:
+        return AdaptiveStreamController(
+            mode=mode,
+            min_quality=config.STREAM_MAX_QUALITY,
+            max_quality=config.STREAM_MAX_QUALITY,
+            scales=(1.0, config.STREAM_MIN_SCALE),
+            min_fps=config.STREAM_MAX_FPS,
+            max_fps=config.STREAM_MAX_FPS,
+        )
+    return AdaptiveStreamController(
+        mode=mode,
+        min_quality=config.STREAM_MIN_QUALITY,
+        max_quality=config.STREAM_MAX_QUALITY,
+        scales=(1.0, 0.75, config.STREAM_MIN_SCALE),
+        min_fps=config.STREAM_MIN_FPS,
+        max_fps=config.STREAM_MAX_FPS,
+    )
+
+
+async def read_video_commands(websocket: WebSocket, video_stream: VideoStream, stream: AdaptiveStreamController):
+    """
+    Atiende comandos del cliente de video, p. ej.
+    {"command": "set_stream_mode", "mode": "preview"} o {"command": "set_overlay", "overlay": "client"}.
+    """
+    try:
+        while True:
+            data = json.loads(await websocket.receive_text())
+            if data.get("command") == "set_stream_mode" and data.get("mode") in STREAM_MODES:
+                stream.set_mode(data["mode"])
+                logger.info(f"Cliente de video cambió a modo {stream.mode}.")
+            elif data.get("command") == "set_overlay" and data.get("overlay") in OVERLAY_MODES:
+                await video_stream.set_overlay(websocket, data["overlay"])
+                logger.info(f"Cliente de video cambió a overlay {data['overlay']}.")
+    except (WebSocketDisconnect, asyncio.CancelledError):
+        pass
+    except Exception as e:
+        logger.warning(f"Comando inválido en WS de video: {e}")
+
+
+# Parámetros por query string:
+#   protocol=json|binary       (por defecto "json", el formato original)
+#   mode=full|thumbnail|preview (preview = solo predicciones, sin frames)
+#   overlay=server|client|none (client = frames sin dibujar + landmarks como datos)
 @app.websocket("/ws/video")
 async def websocket_video(websocket: WebSocket):
     await websocket.accept()
+    await serve_video_client(websocket, default_stream)
+
+
+# Mismo protocolo que /ws/video, para un stream del registro (p. ej. /ws/video/aula-3)
+@app.websocket("/ws/video/{stream_id}")
+async def websocket_video_stream(websocket: WebSocket, stream_id: str):
+    await websocket.accept()
+    video_stream = stream_registry.get(stream_id)
+    if video_stream is None:
+        await websocket.send_json({"type": "error", "message": f"Stream desconocido: {stream_id}"})
+        await websocket.close(code=4404)
+        return
+    await serve_video_client(websocket, video_stream)
+
+
+async def serve_video_client(websocket: WebSocket, video_stream: VideoStream):
+    protocol = websocket.query_params.get("protocol", "json")
+    if protocol not in PROTOCOLS:
+        protocol = "json"
+    stream = create_stream_controller(websocket.query_params.get("mode", "full"))
+    overlay = websocket.query_params.get("overlay", config.VIDEO_OVERLAY)
+    if overlay not in OVERLAY_MODES:
+        overlay = "server"
     connected_video_clients.add(websocket)
-    logger.info("Cliente conectado al WS de video.")
+    await video_stream.set_overlay(websocket, overlay)
+    logger.info(
+        f"Cliente conectado al WS de video (stream={video_stream.stream_id}, protocolo={protocol}, "
+        f"modo={stream.mode}, overlay={overlay})."
+    )
 
     # Enviar estado inicial de cámara
     await websocket.send_json({
         "type": "camera_status",
-        "camera_status": camera_manager.get_status()
+        "stream_id": video_stream.stream_id,
+        "camera_status": video_stream.executor.camera_status,
+        "protocol": protocol,
+        "stream": stream.get_state(),
     })
 
+    subscription = video_stream.broadcaster.subscribe()
+    reader = asyncio.create_task(read_video_commands(websocket, video_stream, stream))
+    last_metadata_time = 0.0
+    last_prediction = None
     try:
         while True:
-            # Procesar el siguiente frame (incluye inferencia)
-            result = video_processor.process_next_frame()
-            if result is None:
-                await asyncio.sleep(0.05)
+            item = await subscription.get()
+            if item is None:
+                # El stream fue eliminado
+                await websocket.send_json({"type": "stream_removed", "stream_id": video_stream.stream_id})
+                await websocket.close()
+                break
+            if isinstance(item, str):
+                # Eventos (señas confirmadas) ya serializados
+                await websocket.send_text(item)
                 continue
 
-            frame, prediction, confidence = result
+            now = time.monotonic()
+            metadata_due = (
+                item.prediction != last_prediction
+                or (video_stream.overlays.get(websocket) == "client" and item.landmarks is not None)
+                or now - last_metadata_time >= config.BINARY_METADATA_INTERVAL
+            )
 
-            # Codificar frame procesado en base64
-            try:
-                _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
-                frame_base64 = base64.b64encode(buffer).decode('utf-8')
-                frame_uri = f"data:image/jpeg;base64,{frame_base64}"
-            except Exception as e:
-                logger.warning(f"Error codificando frame a JPEG: {e}")
-                frame_uri = None
-
-            # Obtener métricas de rendimiento
-            fps = video_processor.performance.get_fps()
-            system_usage = video_processor.performance.get_system_usage() or {}
-
-            # Enviar frame + predicción + métricas
-            message = {
-                "type": "video_frame",
-                "frame": frame_uri,
-                "prediction": prediction,
-                "confidence": float(confidence),
-                "camera_info": camera_manager.get_status(),
-                "fps": fps,
-                "cpu": system_usage.get("cpu_percent"),
-                "ram": system_usage.get("ram_percent"),
-            }
-
-            await websocket.send_text(json.dumps(message))
-            await asyncio.sleep(0.03) 
+            if not stream.sends_frames or not stream.should_send(now):
+                # Sin frame para este cliente: solo predicción (preview, o en binario a su ritmo)
+                if metadata_due and (not stream.sends_frames or protocol == "binary"):
+                    await websocket.send_text(item.metadata_json())
+                    last_metadata_time, last_prediction = now, item.prediction
+                continue
+
+            # La codificación se comparte entre clientes con la misma calidad/escala
+            if protocol == "binary":
+                payload = await item.binary_frame(stream.quality, stream.scale)
+                send_start = time.perf_counter()
+                await websocket.send_bytes(payload)
+                performance_monitor.record_stage("ws_send", time.perf_counter() - send_start)
+                if metadata_due:
+                    await websocket.send_text(item.metadata_json())
+                    last_metadata_time, last_prediction = now, item.prediction
+            else:
+                payload = await item.legacy_json(stream.quality, stream.scale)
+                send_start = time.perf_counter()
+                await websocket.send_text(payload)
+                performance_monitor.record_stage("ws_send", time.perf_counter() - send_start)
+            performance_monitor.increment("frames_sent")
+            stream.record_send(time.perf_counter() - send_start, subscription.qsize(), subscription.dropped)
 
     except WebSocketDisconnect:
-        connected_video_clients.discard(websocket)
         logger.info("Cliente desconectado del WS de video.")
     except Exception as e:
-        connected_video_clients.discard(websocket)
         logger.error(f"Error en WS de video: {e}")
+    finally:
+        reader.cancel()
+        video_stream.broadcaster.unsubscribe(subscription)
+        connected_video_clients.discard(websocket)
+        await video_stream.remove_client(websocket)
+
+# ---- Versiones del modelo ----
+# Cada worker tiene su registro (uno por proceso): con backend "process" el comando va a todos los
+# streams; con hilos lo atiende el mismo registro y repetirlo no tiene efecto.
+MODEL_COMMANDS = ("load_model", "promote_model", "unload_model", "start_shadow", "stop_shadow", "get_model_status")
+
+
+def model_command_args(command: str, data: Dict[str, Any]) -> tuple:
+    if command == "load_model":
+        return data["version"], data.get("backend"), bool(data.get("promote", False))
+    if command == "start_shadow":
+        return data["version"], float(data.get("sample_rate", config.SHADOW_SAMPLE_RATE))
+    if command in ("promote_model", "unload_model"):
+        return (data["version"],)
+    return ()
+
+
+async def call_model_registry(method: str, *args):
+    """Ejecuta el método en el worker de cada stream; retorna el resultado del stream por defecto."""
+    streams = list(stream_registry) if config.EXECUTOR_BACKEND == "process" else [default_stream]
+    results = await asyncio.gather(*(stream.executor.call(method, *args) for stream in streams))
+    if config.EXECUTOR_BACKEND == "process" and landmark_registry is not None:
+        # El registro de /ws/landmarks vive en el proceso principal
+        apply_landmark_model_command(method, *args)
+    return results[0]
+
+
+def apply_landmark_model_command(method: str, *args):
+    """Mismos comandos que VideoProcessor (load_model, promote_model...) sobre el registro de la ingesta."""
+    if method == "load_model":
+        version, backend, promote = args
+        return landmark_registry.load(version, backend or landmark_registry.active.backend, promote)
+    if method == "get_model_status":
+        return landmark_registry.get_status()
+    return getattr(landmark_registry, method.replace("_model", ""))(*args)
+
 
 # ---- WebSocket: control ----
 @app.websocket("/ws/control")
@@ -132,18 +473,26 @@ async def websocket_control(websocket: WebSocket):
             message = await websocket.receive_text()
             data = json.loads(message)
             command = data.get("command")
+            # Los comandos de cámara/clasificador aplican al stream indicado (por defecto "default")
+            stream_id = data.get("stream_id", DEFAULT_STREAM)
+            video_stream = stream_registry.get(stream_id)
+
+            if command in ("get_status", "reset_classifier", "switch_camera") and video_stream is None:
+                await websocket.send_json({"type": "error", "message": f"Stream desconocido: {stream_id}"})
 
-            if command == "get_status":
+            elif command == "get_status":
                 await websocket.send_json({
                     "type": "system_status",
-                    "camera_status": camera_manager.get_status(),
-                    "fps": performance_monitor.get_fps()
+                    "stream_id": stream_id,
+                    "camera_status": video_stream.executor.camera_status,
+                    "fps": video_stream.executor.fps,
+                    "streams": list(stream_registry.streams),
                 })
 
             elif command == "reset_classifier":
                 # reset del clasificador a través del video_processor
                 try:
-                    video_processor.reset_classifier()
+                    await video_stream.executor.call("reset_classifier")
                     await websocket.send_json({"type": "info", "message": "Clasificador reiniciado."})
                 except Exception as e:
                     logger.error(f"Error reiniciando clasificador: {e}")
@@ -151,24 +500,71 @@ async def websocket_control(websocket: WebSocket):
 
             elif command == "switch_camera":
                 camera_config = data.get("camera", {})
-                success = camera_manager.switch_camera(camera_config)
+                success = await video_stream.executor.call("switch_camera", camera_config)
                 await websocket.send_json({
                     "type": "camera_status",
-                    "camera_status": camera_manager.get_status(),
+                    "stream_id": stream_id,
+                    "camera_status": await video_stream.executor.refresh_camera_status(),
                     "success": success
                 })
 
+            elif command == "add_stream":
+                # {"command": "add_stream", "stream_id": "aula-3", "camera": {"type": "esp32", "url": "http://..."}}
+                try:
+                    source = data.get("camera") or {}
+                    config.camera_options_for_source(source)  # valida la fuente antes de crear el worker
+                    video_stream = stream_registry.add(stream_id, source)
+                except ValueError as e:
+                    await websocket.send_json({"type": "error", "message": str(e)})
+                    continue
+                success = await connect_stream(video_stream)
+                await update_recording(video_stream)
+                await websocket.send_json({
+                    "type": "stream_added",
+                    "stream_id": stream_id,
+                    "camera_status": video_stream.executor.camera_status,
+                    "success": success,
+                })
+
+            elif command == "remove_stream":
+                try:
+                    removed = await stream_registry.remove(stream_id)
+                except ValueError as e:
+                    await websocket.send_json({"type": "error", "message": str(e)})
+                    continue
+                await websocket.send_json({"type": "stream_removed", "stream_id": stream_id, "success": removed})
+
+            elif command == "list_streams":
+                await websocket.send_json({"type": "streams", "streams": stream_registry.get_stats()})
+
+            elif command in MODEL_COMMANDS:
+                try:
+                    result = await call_model_registry(command, *model_command_args(command, data))
+                    await websocket.send_json({"type": "model_status", "command": command, "result": result})
+                except Exception as e:
+                    logger.error(f"Error en comando de modelo {command}: {e}")
+                    await websocket.send_json({"type": "error", "message": str(e)})
+
             elif command == "start_session":
                 try:
                     session_id = await db_client.create_session()
+                    await set_active_session(session_id)
                     await websocket.send_json({"type": "session_started", "session_id": session_id})
                 except Exception as e:
                     logger.error(f"Error creando sesión: {e}")
                     await websocket.send_json({"type": "error", "message": "Error creando sesión"})
 
             elif command == "stop_session":
-                # Para tu implementación: espera session_id en payload o maneja cierre global
-                await websocket.send_json({"type": "session_ended"})
+                session_id = data.get("session_id", active_session_id)
+                try:
+                    if session_id is not None:
+                        await db_client.end_session(session_id)
+                    if session_id == active_session_id:
+                        await set_active_session(None)
+                    await websocket.send_json({"type": "session_ended", "session_id": session_id})
+                except Exception as e:
+                    logger.error(f"Error finalizando sesión: {e}")
+                    await websocket.send_json({"type": "error", "message": "Error finalizando sesión"})
             else:
                 await websocket.send_json({"type": "error", "message": f"Comando desconocido: {command}"})
 
@@ -184,6 +580,7 @@ async def websocket_control(websocket: WebSocket):
 async def start_session():
     try:
         session_id = await db_client.create_session()
+        await set_active_session(session_id)
         await db_client.log_system_event(
             session_id=session_id,
             event_type="SESSION_STARTED",
@@ -199,6 +596,8 @@ async def start_session():
 async def end_session(session_id: int):
     try:
         await db_client.end_session(session_id)
+        if session_id == active_session_id:
+            await set_active_session(None)
         await db_client.log_system_event(
             session_id=session_id,
             event_type="SESSION_ENDED",
@@ -210,7 +609,333 @@ async def end_session(session_id: int):
         logger.error(f"Error finalizando sesión: {e}")
         raise HTTPException(status_code=500, detail="Error finalizando sesión")
 
+# ---- Reconocimiento offline de videos ----
+def create_file_recognizer(frame_step: int) -> VideoFileRecognizer:
+    """Se ejecuta en el hilo del trabajo: el modelo (versión activa) se comparte, MediaPipe es propio del trabajo."""
+    registry = get_shared_model_registry(
+        config.model_path_for_backend(config.MODEL_BACKEND),
+        config.VOCAB_PATH,
+        config.SCALER_PATH,
+        config.MODEL_BACKEND,
+        config.TFLITE_THREADS,
+        config.FOLD_SCALER,
+        models_root=config.MODEL_DIR,
+    )
+    return VideoFileRecognizer(
+        registry.active.classifier,
+        camera_options=config.camera_options(),
+        decoder_options=config.decoder_options(),
+        batch_size=config.OFFLINE_BATCH_SIZE,
+        inference_stride=config.INFERENCE_STRIDE,
+        frame_step=frame_step,
+    )
+
+
+def resolve_offline_path(path: str) -> Path:
+    """Solo se aceptan archivos dentro de SIGN_OFFLINE_VIDEO_DIR."""
+    if not config.OFFLINE_VIDEO_DIR:
+        raise HTTPException(status_code=403, detail="Lectura de videos por ruta deshabilitada (SIGN_OFFLINE_VIDEO_DIR)")
+    root = Path(config.OFFLINE_VIDEO_DIR).resolve()
+    target = (root / path).resolve()
+    if root != target and root not in target.parents:
+        raise HTTPException(status_code=403, detail="Ruta fuera del directorio de videos")
+    if not target.is_file():
+        raise HTTPException(status_code=404, detail=f"Video no encontrado: {path}")
+    return target
+
+
+def save_upload(upload: UploadFile) -> str:
+    """Copia la subida a un archivo temporal por bloques (OpenCV necesita una ruta)."""
+    suffix = Path(upload.filename or "").suffix or ".mp4"
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        shutil.copyfileobj(upload.file, tmp, length=1024 * 1024)
+        return tmp.name
+
+
+async def stream_file_recognition(path: str, fmt: str, frame_step: int, session_id: Optional[int], cleanup: bool):
+    """
+    Ejecuta el reconocimiento en un hilo y reenvía sus mensajes a medida que
+    salen. La cola acotada frena la lectura del video si el cliente lee lento.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=64)
+    recognizer_ref: Dict[str, VideoFileRecognizer] = {}
+    # threading.Event: lo consulta el hilo del trabajo
+    cancelled = threading.Event()
+
+    def put(message):
+        if not cancelled.is_set():
+            asyncio.run_coroutine_threadsafe(queue.put(message), loop).result()
+
+    def run_job():
+        try:
+            recognizer = recognizer_ref["job"] = create_file_recognizer(frame_step)
+            if cancelled.is_set():
+                # El cliente se desconectó mientras se creaba el reconocedor
+                return
+            for message in recognizer.recognize(path):
+                if cancelled.is_set():
+                    break
+                put(message)
+        except Exception as e:
+            logger.error(f"Error reconociendo video {path}: {e}")
+            put({"type": "error", "message": str(e)})
+        finally:
+            put(None)
+
+    job = loop.run_in_executor(offline_executor, run_job)
+    try:
+        while True:
+            message = await queue.get()
+            if message is None:
+                break
+            if message["type"] == "sign_committed" and session_id is not None:
+                await db_client.save_translation(session_id, message["label"], message["confidence"])
+            yield format_stream_message(message, fmt)
+    finally:
+        # Cliente desconectado o fin: detener el trabajo (si aún no existe el reconocedor,
+        # el hilo ve `cancelled` al crearlo) y vaciar la cola por si quedó esperando lugar
+        cancelled.set()
+        if "job" in recognizer_ref:
+            recognizer_ref["job"].stop()
+        while not job.done():
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.wait({job}, timeout=0.1)
+        if cleanup:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+# Un video subido (multipart, campo "file") o uno en disco (?path=, relativo a SIGN_OFFLINE_VIDEO_DIR).
+#   format=ndjson|sse   frame_step=N (procesa 1 de cada N frames)   session_id= (persiste las señas)
+@app.post("/recognize/video")
+async def recognize_video(
+    file: Optional[UploadFile] = File(None),
+    path: Optional[str] = None,
+    fmt: str = Query("ndjson", alias="format"),
+    frame_step: int = 1,
+    session_id: Optional[int] = None,
+):
+    if fmt not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Formato no soportado: {fmt}")
+    if file is not None:
+        video_path, cleanup = await asyncio.to_thread(save_upload, file), True
+    elif path:
+        video_path, cleanup = str(resolve_offline_path(path)), False
+    else:
+        raise HTTPException(status_code=400, detail="Se requiere un archivo subido o ?path=")
+
+    return StreamingResponse(
+        stream_file_recognition(video_path, fmt, max(1, frame_step), session_id, cleanup),
+        media_type=STREAM_MEDIA_TYPES[fmt],
+    )
+
+# ---- WebSocket: ingesta de landmarks ----
+# Registro y servidor de lotes del proceso principal, creados con la primera conexión
+# (con backend "thread" son los mismos que usan los streams de video).
+landmark_registry = None
+landmark_server = None
+landmark_backend_lock = asyncio.Lock()
+connected_landmark_clients = set()
+
+
+async def get_landmark_backend():
+    global landmark_registry, landmark_server
+    async with landmark_backend_lock:
+        if landmark_registry is None:
+            registry = await asyncio.to_thread(
+                get_shared_model_registry,
+                config.model_path_for_backend(config.MODEL_BACKEND),
+                config.VOCAB_PATH,
+                config.SCALER_PATH,
+                config.MODEL_BACKEND,
+                config.TFLITE_THREADS,
+                config.FOLD_SCALER,
+                models_root=config.MODEL_DIR,
+            )
+            landmark_server = get_shared_inference_server(
+                registry.active.classifier, config.BATCH_MAX_SIZE, config.BATCH_MAX_WAIT_MS, registry
+            )
+            landmark_registry = registry
+    return landmark_registry, landmark_server
+
+
+def handle_landmark_event(session_id: Optional[int], event: Dict[str, Any]):
+    if session_id is not None and not db_client.save_translation_nowait(session_id, event["label"], event["confidence"]):
+        logger.warning("Buffer de la base de datos lleno; se descartó una traducción.")
+
+
+# El cliente corre MediaPipe y envía mensajes binarios con landmarks (ver app/services/landmark_protocol.py);
+# recibe {"type": "prediction", ...} y {"type": "sign_committed", ...} en JSON.
+#   session_id=N  persiste las señas confirmadas en esa sesión (por defecto, la sesión activa)
+# Comandos de texto: {"command": "reset"} (nueva frase) y {"command": "stats"}.
+@app.websocket("/ws/landmarks")
+async def websocket_landmarks(websocket: WebSocket):
+    await websocket.accept()
+    if len(connected_landmark_clients) >= config.LANDMARK_MAX_CLIENTS:
+        await websocket.send_json({"type": "error", "message": "Se alcanzó el máximo de clientes de landmarks"})
+        await websocket.close(code=1013)
+        return
+    session_param = websocket.query_params.get("session_id")
+    try:
+        session_id = int(session_param) if session_param else None
+    except ValueError:
+        await websocket.send_json({"type": "error", "message": f"session_id inválido: {session_param}"})
+        await websocket.close(code=1003)
+        return
+
+    connected_landmark_clients.add(websocket)
+    ingestor = None
+    try:
+        registry, server = await get_landmark_backend()
+        ingestor = LandmarkIngestor(
+            registry,
+            server,
+            inference_stride=config.INFERENCE_STRIDE,
+            motion_threshold=config.MOTION_THRESHOLD,
+            decoder_options=config.decoder_options(),
+            monitor=performance_monitor,
+        )
+        await websocket.send_json({"type": "ready", "model_version": registry.active.version})
+        last_prediction = None
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes") is not None:
+                try:
+                    frames = list(unpack_landmark_frames(message["bytes"]))
+                except ValueError as e:
+                    performance_monitor.increment("landmark_frames_rejected")
+                    await websocket.send_json({"type": "error", "message": str(e)})
+                    continue
+                for seq, timestamp, num_hands, landmarks in frames:
+                    performance_monitor.increment("landmark_frames")
+                    try:
+                        prediction, confidence, inferred, event = await ingestor.process(landmarks, num_hands, timestamp)
+                    except ValueError as e:
+                        performance_monitor.increment("landmark_frames_rejected")
+                        await websocket.send_json({"type": "error", "seq": seq, "message": str(e)})
+                        continue
+                    if inferred or prediction != last_prediction:
+                        await websocket.send_json({
+                            "type": "prediction",
+                            "seq": seq,
+                            "prediction": prediction,
+                            "confidence": confidence,
+                            "inferred": inferred,
+                        })
+                        last_prediction = prediction
+                    if event is not None:
+                        target_session = session_id if session_id is not None else active_session_id
+                        payload = event.to_dict()
+                        await websocket.send_json({"type": "sign_committed", "session_id": target_session, "seq": seq, **payload})
+                        handle_landmark_event(target_session, payload)
+            elif message.get("text"):
+                try:
+                    data = json.loads(message["text"])
+                except ValueError:
+                    await websocket.send_json({"type": "error", "message": "Comando inválido"})
+                    continue
+                if data.get("command") == "reset":
+                    ingestor.reset()
+                    last_prediction = None
+                elif data.get("command") == "stats":
+                    await websocket.send_json({"type": "stats", **ingestor.get_stats()})
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Error en WS de landmarks: {e}")
+    finally:
+        connected_landmark_clients.discard(websocket)
+        if ingestor is not None:
+            ingestor.close()
+
+# ---- Modelos ----
+@app.get("/models")
+async def model_status():
+    return await call_model_registry("get_model_status")
+
+
+@app.post("/models/{version}/load")
+async def load_model(version: str, backend: Optional[str] = None, promote: bool = False):
+    try:
+        return await call_model_registry("load_model", version, backend, promote)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.post("/models/{version}/promote")
+async def promote_model(version: str):
+    if not await call_model_registry("promote_model", version):
+        raise HTTPException(status_code=409, detail=f"La versión {version} no está cargada")
+    return {"active": version}
+
+
+@app.post("/models/{version}/shadow")
+async def start_shadow(version: str, sample_rate: float = config.SHADOW_SAMPLE_RATE):
+    if not await call_model_registry("start_shadow", version, sample_rate):
+        raise HTTPException(status_code=409, detail=f"La versión {version} no está cargada o ya está activa")
+    return {"shadow": version, "sample_rate": sample_rate}
+
+
+@app.delete("/models/shadow")
+async def stop_shadow():
+    return {"shadow": await call_model_registry("stop_shadow")}
+
 # ---- Health check ----
 @app.get("/health")
 async def health_check():
-    return {"status": "ok", "connected_clients": len(connected_video_clients)}
+    return {
+        "status": "ok" if startup_state["ready"] else startup_state["stage"],
+        "startup": startup_state,
+        "connected_clients": len(connected_video_clients),
+        "video_broadcast": default_stream.broadcaster.get_stats(),
+        "executor_backend": config.EXECUTOR_BACKEND,
+        "render_options": default_stream.render_options,
+        "streams": stream_registry.get_stats(),
+        "landmark_clients": len(connected_landmark_clients),
+        "db_buffer": db_client.get_buffer_stats(),
+    }
+
+
+# Readiness para el orquestador: 503 hasta que el modelo esté cargado y calentado
+@app.get("/health/ready")
+async def readiness_check():
+    status_code = 200 if startup_state["ready"] else 503
+    return JSONResponse(status_code=status_code, content={"ready": startup_state["ready"], "stage": startup_state["stage"]})
+
+
+# ---- Métricas (formato de texto de Prometheus) ----
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    sources = []
+    for video_stream in stream_registry:
+        try:
+            # Etapas del pipeline (captura, MediaPipe, escalado, inferencia, dibujo) desde el worker de cada stream
+            snapshot = await video_stream.executor.call("get_metrics")
+        except Exception as e:
+            logger.warning(f"No se pudieron obtener métricas del stream {video_stream.stream_id}: {e}")
+            continue
+        broadcast = video_stream.broadcaster.get_stats()
+        snapshot["gauges"]["video_clients"] = broadcast["clients"]
+        snapshot["gauges"]["video_client_frames_dropped"] = broadcast["dropped"]
+        snapshot["gauges"]["video_client_events_dropped"] = broadcast["events_dropped"]
+        sources.append((snapshot, {"component": "pipeline", "stream": video_stream.stream_id}))
+
+    # Servidor: codificación JPEG, envío por WebSocket, streams y buffer de BD
+    performance_monitor.set_gauge("streams", len(stream_registry))
+    performance_monitor.set_gauge("landmark_clients", len(connected_landmark_clients))
+    db_stats = db_client.get_buffer_stats()
+    performance_monitor.set_gauge("db_pending_translations", db_stats["pending_translations"])
+    performance_monitor.set_gauge("db_pending_system_logs", db_stats["pending_system_logs"])
+    performance_monitor.set_gauge("db_records_written", db_stats["records_written"])
+    performance_monitor.set_gauge("db_records_dropped", db_stats["records_dropped"])
+    system_usage = performance_monitor.get_system_usage() or {}
+    for key, value in system_usage.items():
+        performance_monitor.set_gauge(f"system_{key}", value)
+    sources.append((performance_monitor.snapshot(), {"component": "server"}))
+    return format_prometheus(sources)
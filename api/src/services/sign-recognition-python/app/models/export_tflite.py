@@ -0,0 +1,122 @@
+# app/models/export_tflite.py
+"""
+Exporta el modelo .keras a TFLite (float32, float16 o int8).
+
+Uso:
+    python -m app.models.export_tflite --quantization float16
+    python -m app.models.export_tflite --quantization int8 --calibration grabaciones/*.npy
+"""
+import argparse
+import json
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+import joblib
+import numpy as np
+
+from app import config
+from app.models.inference_backends import build_inference_model, tflite_metadata_path
+from app.utils.landmark_io import load_landmark_sequences
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATIONS = ("float32", "float16", "int8")
+
+
+def export_tflite(
+    model_path: str,
+    output_path: str,
+    quantization: str = "float32",
+    scaler_path: Optional[str] = None,
+    calibration_files: Optional[List[str]] = None,
+    calibration_samples: int = 200,
+    allow_select_ops: bool = False,
+    fold_scaler: bool = False,
+) -> Path:
+    import tensorflow as tf
+
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Cuantización no soportada: {quantization}")
+
+    model = tf.keras.models.load_model(model_path, compile=False)
+    mean = scale = None
+    if scaler_path is not None:
+        scaler = joblib.load(scaler_path)
+        mean = scaler.mean_.astype(np.float32)
+        scale = scaler.scale_.astype(np.float32)
+    if fold_scaler:
+        if mean is None:
+            raise ValueError("Integrar el scaler requiere --scaler.")
+        # El .tflite recibe landmarks sin escalar, igual que el backend Keras
+        model = build_inference_model(model, mean, scale)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+
+    if quantization == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == "int8":
+        if not calibration_files or mean is None:
+            raise ValueError("La cuantización int8 requiere --calibration y --scaler.")
+        sequences = load_landmark_sequences(calibration_files)
+        if len(sequences) == 0:
+            raise ValueError("No se encontraron secuencias de calibración.")
+        rng = np.random.default_rng(0)
+        picks = rng.choice(len(sequences), size=min(calibration_samples, len(sequences)), replace=False)
+
+        def representative_dataset():
+            # Misma entrada que en producción: cruda si el scaler va en el grafo
+            for i in picks:
+                sample = sequences[i] if fold_scaler else (sequences[i] - mean) / scale
+                yield [sample[np.newaxis].astype(np.float32)]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+
+    if allow_select_ops:
+        # Necesario para algunas capas recurrentes; requiere TensorFlow completo al ejecutar
+        converter.target_spec.supported_ops = [
+            tf.lite.OpsSet.TFLITE_BUILTINS,
+            tf.lite.OpsSet.SELECT_TF_OPS,
+        ]
+
+    tflite_model = converter.convert()
+    output = Path(output_path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_bytes(tflite_model)
+    tflite_metadata_path(output).write_text(
+        json.dumps({"quantization": quantization, "scaler_in_graph": fold_scaler}, indent=2),
+        encoding="utf-8",
+    )
+    logger.info(f"Modelo TFLite ({quantization}) exportado a {output} ({len(tflite_model) / 1024:.1f} KB)")
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta el modelo de señas a TFLite.")
+    parser.add_argument("--model", default=config.MODEL_PATH)
+    parser.add_argument("--output", default=None, help="Por defecto junto al modelo, con sufijo de cuantización")
+    parser.add_argument("--quantization", choices=QUANTIZATIONS, default="float32")
+    parser.add_argument("--scaler", default=config.SCALER_PATH)
+    parser.add_argument("--calibration", nargs="*", default=None, help="Secuencias grabadas (.npy/.npz) para int8")
+    parser.add_argument("--calibration-samples", type=int, default=200)
+    parser.add_argument("--allow-select-ops", action="store_true")
+    parser.add_argument("--fold-scaler", action="store_true", help="Integra el StandardScaler al inicio del grafo")
+    args = parser.parse_args()
+
+    output = args.output or str(Path(args.model).with_name(f"{Path(args.model).stem}_{args.quantization}.tflite"))
+    export_tflite(
+        args.model,
+        output,
+        quantization=args.quantization,
+        scaler_path=args.scaler,
+        calibration_files=args.calibration,
+        calibration_samples=args.calibration_samples,
+        allow_select_ops=args.allow_select_ops,
+        fold_scaler=args.fold_scaler,
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,166 @@
+# app/models/inference_backends.py
+"""
+Backends de inferencia para SignClassifier.
+
+Todos reciben un lote (B, 30, 126) float32 listo para el modelo y exponen:
+- predict_proba(lote) -> probabilidades (B, num_clases)
+- classify(lote) -> (índices de clase (B,), confianzas (B,))
+
+Si `scaler_in_graph` es True, la estandarización ya está dentro del modelo
+y el lote debe llegar sin escalar.
+"""
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("keras", "tflite")
+
+
+def build_inference_model(model, scaler_mean: np.ndarray, scaler_scale: np.ndarray):
+    """Antepone al modelo una capa Normalization con la media/escala del StandardScaler."""
+    import tensorflow as tf
+
+    inputs = tf.keras.Input(shape=model.input_shape[1:], dtype="float32", name="landmarks")
+    normalization = tf.keras.layers.Normalization(
+        axis=-1,
+        mean=np.asarray(scaler_mean, dtype=np.float32),
+        variance=np.square(np.asarray(scaler_scale, dtype=np.float32)),
+        name="scaler",
+    )
+    outputs = model(normalization(inputs), training=False)
+    return tf.keras.Model(inputs, outputs, name=f"{model.name}_with_scaler")
+
+
+class KerasBackend:
+    """Modelo .keras completo con TensorFlow."""
+
+    name = "keras"
+
+    def __init__(
+        self,
+        model_path: Path,
+        scaler_mean: Optional[np.ndarray] = None,
+        scaler_scale: Optional[np.ndarray] = None,
+    ):
+        import tensorflow as tf
+
+        self._tf = tf
+        self.model = tf.keras.models.load_model(model_path, compile=False)
+
+        # Con media/escala, el scaler queda integrado al inicio del grafo
+        self.scaler_in_graph = scaler_mean is not None and scaler_scale is not None
+        graph_model = (
+            build_inference_model(self.model, scaler_mean, scaler_scale)
+            if self.scaler_in_graph else self.model
+        )
+        self.graph_model = graph_model
+
+        # Firma fija: cambiar forma o tipo falla en vez de retrazar en silencio
+        spec = tf.TensorSpec(shape=(None,) + tuple(self.model.input_shape[1:]), dtype=tf.float32)
+
+        @tf.function(input_signature=[spec])
+        def predict_fn(x):
+            return graph_model(x, training=False)
+
+        @tf.function(input_signature=[spec])
+        def classify_fn(x):
+            probs = graph_model(x, training=False)
+            return tf.argmax(probs, axis=-1, output_type=tf.int32), tf.reduce_max(probs, axis=-1)
+
+        self.predict_fn = predict_fn
+        self.classify_fn = classify_fn
+
+    def predict_proba(self, batch: np.ndarray) -> np.ndarray:
+        return self.predict_fn(batch).numpy()
+
+    def classify(self, batch: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        class_ids, confidences = self.classify_fn(batch)
+        return class_ids.numpy(), confidences.numpy()
+
+
+def _load_tflite_interpreter(model_path: Path, num_threads: Optional[int]):
+    """Usa tflite_runtime si está instalado (liviano); si no, el intérprete de TensorFlow."""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        from tensorflow.lite.python.interpreter import Interpreter
+    return Interpreter(model_path=str(model_path), num_threads=num_threads)
+
+
+def tflite_metadata_path(model_path: Path) -> Path:
+    """Archivo JSON junto al .tflite con datos de exportación (p. ej. scaler integrado)."""
+    return Path(str(model_path) + ".json")
+
+
+class TFLiteBackend:
+    """Modelo exportado a .tflite (float32, float16 o int8) con el intérprete liviano."""
+
+    name = "tflite"
+
+    def __init__(self, model_path: Path, num_threads: Optional[int] = None):
+        metadata_path = tflite_metadata_path(model_path)
+        metadata = json.loads(metadata_path.read_text(encoding="utf-8")) if metadata_path.exists() else {}
+        self.scaler_in_graph = bool(metadata.get("scaler_in_graph", False))
+
+        self.interpreter = _load_tflite_interpreter(model_path, num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = int(self._input["shape"][0])
+        # El intérprete no es seguro entre hilos
+        self._lock = threading.Lock()
+
+    def _resize(self, batch_size: int):
+        if batch_size == self._batch_size:
+            return
+        shape = list(self._input["shape"])
+        shape[0] = batch_size
+        self.interpreter.resize_tensor_input(self._input["index"], shape)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = batch_size
+
+    def predict_proba(self, batch: np.ndarray) -> np.ndarray:
+        with self._lock:
+            self._resize(batch.shape[0])
+            data = batch
+            input_dtype = self._input["dtype"]
+            if input_dtype != np.float32:
+                # Modelo con entrada cuantizada: q = x / escala + punto_cero
+                scale, zero_point = self._input["quantization"]
+                data = np.round(batch / scale + zero_point)
+                info = np.iinfo(input_dtype)
+                data = np.clip(data, info.min, info.max)
+            self.interpreter.set_tensor(self._input["index"], data.astype(input_dtype, copy=False))
+            self.interpreter.invoke()
+            output = self.interpreter.get_tensor(self._output["index"])
+            if self._output["dtype"] != np.float32:
+                scale, zero_point = self._output["quantization"]
+                output = (output.astype(np.float32) - zero_point) * scale
+            return np.array(output, dtype=np.float32)
+
+    def classify(self, batch: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        probs = self.predict_proba(batch)
+        class_ids = np.argmax(probs, axis=-1)
+        return class_ids, probs[np.arange(len(class_ids)), class_ids]
+
+
+def load_backend(
+    name: str,
+    model_path: Path,
+    num_threads: Optional[int] = None,
+    scaler_mean: Optional[np.ndarray] = None,
+    scaler_scale: Optional[np.ndarray] = None,
+):
+    if name == "keras":
+        return KerasBackend(model_path, scaler_mean=scaler_mean, scaler_scale=scaler_scale)
+    if name == "tflite":
+        return TFLiteBackend(model_path, num_threads=num_threads)
+    raise ValueError(f"Backend de inferencia no soportado: {name}")
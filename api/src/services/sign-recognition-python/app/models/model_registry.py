@@ -0,0 +1,339 @@
+# app/models/model_registry.py
+"""
+Registro de versiones del modelo dentro de un proceso.
+
+- `load` carga un paquete modelo/scaler/vocabulario en un hilo aparte y lo
+  calienta; el pipeline sigue con el modelo activo mientras tanto.
+- `promote` cambia el modelo activo de forma atómica: cada stream lo nota
+  en su siguiente inferencia y reescala su buffer de secuencia si el scaler
+  cambió, sin cortar el video.
+- `start_shadow` ejecuta un modelo candidato sobre una fracción de las
+  secuencias del activo, en su propio hilo, y mide coincidencia y latencia.
+
+Las versiones son carpetas bajo la raíz de modelos (p. ej. trained_models/model_3)
+con el modelo (.keras o .tflite), `scaler.save` y `sign_language_vocabulary.json`.
+"""
+import logging
+import queue
+import random
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.sign_classifier import SignClassifier
+from app.utils.performance_monitor import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+SCALER_FILE = "scaler.save"
+VOCAB_FILE = "sign_language_vocabulary.json"
+MODEL_SUFFIXES = {"keras": ".keras", "tflite": ".tflite"}
+
+
+def resolve_bundle(models_root: str, version: str, backend: str = "keras") -> Dict[str, str]:
+    """Rutas del paquete `version` (una carpeta dentro de `models_root`)."""
+    root = Path(models_root).resolve()
+    directory = (root / version).resolve()
+    if root not in directory.parents or not directory.is_dir():
+        raise ValueError(f"Versión de modelo no encontrada: {version}")
+    models = sorted(directory.glob(f"*{MODEL_SUFFIXES[backend]}"))
+    if not models:
+        raise ValueError(f"La versión {version} no tiene un modelo {MODEL_SUFFIXES[backend]}")
+    return {
+        "model_path": str(models[0]),
+        "scaler_path": str(directory / SCALER_FILE),
+        "vocab_path": str(directory / VOCAB_FILE),
+    }
+
+
+def same_scaling(a: SignClassifier, b: SignClassifier) -> bool:
+    if a is b:
+        return True
+    if a.scaler_in_graph != b.scaler_in_graph:
+        return False
+    return a.scaler_in_graph or (
+        np.array_equal(a.scaler_mean, b.scaler_mean) and np.array_equal(a.scaler_scale, b.scaler_scale)
+    )
+
+
+def convert_scaled(sequences: np.ndarray, source: SignClassifier, target: SignClassifier) -> np.ndarray:
+    """Secuencias preparadas para `source` -> preparadas para `target` (sin copia si escalan igual)."""
+    if same_scaling(source, target):
+        return sequences
+    raw = sequences if source.scaler_in_graph else sequences * source.scaler_scale + source.scaler_mean
+    return target.scale_sequences(raw)
+
+
+class ModelBundle:
+    """Una versión cargada y lista para predecir."""
+
+    def __init__(self, version: str, classifier: SignClassifier, paths: Dict[str, str], backend: str):
+        self.version = version
+        self.classifier = classifier
+        self.paths = paths
+        self.backend = backend
+        self.load_seconds = 0.0
+        self.warmup_seconds = 0.0
+        self.loaded_at = time.time()
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "backend": self.backend,
+            "classes": len(self.classifier.classes),
+            "load_ms": round(self.load_seconds * 1000, 1),
+            "warmup_ms": round(self.warmup_seconds * 1000, 1),
+            "loaded_at": self.loaded_at,
+            **self.paths,
+        }
+
+
+class ShadowEvaluator:
+    """
+    Ejecuta el candidato sobre una muestra de las secuencias del modelo
+    activo, fuera del hilo del pipeline: `offer` nunca bloquea (si la cola
+    está llena, la muestra se descarta). `stop` tampoco espera lugar en la
+    cola: avisa con un Event y el hilo termina en su siguiente vuelta.
+    """
+
+    def __init__(self, bundle: ModelBundle, sample_rate: float = 0.1, max_queue: int = 64):
+        self.bundle = bundle
+        self.sample_rate = min(1.0, max(0.0, sample_rate))
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.offered = 0
+        self.sampled = 0
+        self.dropped = 0
+        self.compared = 0
+        self.agreements = 0
+        self.errors = 0
+        self.confidence_delta = 0.0
+        self.disagreements: Counter = Counter()
+        self.primary_latency = LatencyHistogram()
+        self.shadow_latency = LatencyHistogram()
+        self._thread = threading.Thread(target=self._run, name=f"shadow-{bundle.version}", daemon=True)
+        self._thread.start()
+
+    def offer(self, seq_scaled: np.ndarray, source: SignClassifier, label: str, confidence: float, primary_seconds: float):
+        self.offered += 1
+        if self._stopped.is_set() or random.random() >= self.sample_rate:
+            return
+        try:
+            # Copia: el buffer del stream se sobrescribe con el siguiente frame
+            self._queue.put_nowait((seq_scaled.copy(), source, label, confidence, primary_seconds))
+            self.sampled += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def signal_stop(self):
+        """Pide al hilo que termine sin esperarlo (se puede llamar con locks tomados)."""
+        self._stopped.set()
+        try:
+            # Despierta al hilo si está esperando; con la cola llena lo nota al vaciarla
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def stop(self, timeout: float = 2.0):
+        self.signal_stop()
+        self._thread.join(timeout=timeout)
+
+    def _run(self):
+        classifier = self.bundle.classifier
+        while not self._stopped.is_set():
+            item = self._queue.get()
+            if item is None:
+                continue
+            sequence, source, label, confidence, primary_seconds = item
+            try:
+                sequence = convert_scaled(sequence, source, classifier)
+                start = time.perf_counter()
+                shadow_label, shadow_confidence = classifier.predict_scaled(sequence)
+                elapsed = time.perf_counter() - start
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Error en el modelo sombra {self.bundle.version}: {e}")
+                continue
+            with self._lock:
+                self.compared += 1
+                self.primary_latency.record(primary_seconds)
+                self.shadow_latency.record(elapsed)
+                self.confidence_delta += shadow_confidence - confidence
+                if shadow_label == label:
+                    self.agreements += 1
+                else:
+                    self.disagreements[(label, shadow_label)] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            def latency(h: LatencyHistogram) -> Dict[str, float]:
+                return {f"p{int(q * 100)}_ms": round(h.quantile(q) * 1000, 3) for q in (0.5, 0.95, 0.99)}
+
+            return {
+                "version": self.bundle.version,
+                "sample_rate": self.sample_rate,
+                "offered": self.offered,
+                "sampled": self.sampled,
+                "dropped": self.dropped,
+                "compared": self.compared,
+                "errors": self.errors,
+                "agreement": round(self.agreements / self.compared, 4) if self.compared else None,
+                "mean_confidence_delta": round(self.confidence_delta / self.compared, 4) if self.compared else None,
+                "primary_latency": latency(self.primary_latency),
+                "shadow_latency": latency(self.shadow_latency),
+                "top_disagreements": [
+                    {"primary": a, "shadow": b, "count": n} for (a, b), n in self.disagreements.most_common(10)
+                ],
+            }
+
+
+class ModelRegistry:
+    """
+    Versiones cargadas en el proceso y cuál está activa. Leer `active` no
+    toma locks: el cambio es una sola asignación de atributo.
+    """
+
+    def __init__(
+        self,
+        active: ModelBundle,
+        models_root: str = "trained_models",
+        num_threads: Optional[int] = None,
+        fold_scaler: bool = True,
+        warmup_batch_sizes: Tuple[int, ...] = (1,),
+    ):
+        self.active = active
+        self.models_root = models_root
+        self.num_threads = num_threads
+        self.fold_scaler = fold_scaler
+        self.warmup_batch_sizes = warmup_batch_sizes
+        self.bundles: Dict[str, ModelBundle] = {active.version: active}
+        self.shadow: Optional[ShadowEvaluator] = None
+        self.history: List[Dict[str, Any]] = []
+        self._loading: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    # ---- Carga en segundo plano ----
+    def load(self, version: str, backend: str = "keras", promote: bool = False) -> Dict[str, Any]:
+        """Empieza a cargar `version` en otro hilo; retorna su estado (repetir la llamada no la recarga)."""
+        retired = None
+        with self._lock:
+            if version in self.bundles:
+                if promote:
+                    retired = self._promote_locked(version)[1]
+                status = {"version": version, "state": "ready"}
+            elif version in self._loading and self._loading[version]["state"] == "loading":
+                return self._loading[version]
+            else:
+                paths = resolve_bundle(self.models_root, version, backend)
+                status = self._loading[version] = {"version": version, "state": "loading", "started_at": time.time()}
+        if retired is not None:
+            retired.stop()
+        if status["state"] == "ready":
+            return status
+        threading.Thread(
+            target=self._load, args=(version, paths, backend, promote), name=f"model-load-{version}", daemon=True
+        ).start()
+        logger.info(f"Cargando modelo {version} en segundo plano...")
+        return status
+
+    def _load(self, version: str, paths: Dict[str, str], backend: str, promote: bool):
+        try:
+            start = time.perf_counter()
+            classifier = SignClassifier(
+                paths["model_path"], paths["vocab_path"], paths["scaler_path"],
+                backend=backend, num_threads=self.num_threads, fold_scaler=self.fold_scaler,
+            )
+            bundle = ModelBundle(version, classifier, paths, backend)
+            bundle.load_seconds = time.perf_counter() - start
+            bundle.warmup_seconds = classifier.warm_up(self.warmup_batch_sizes)
+        except Exception as e:
+            logger.error(f"No se pudo cargar el modelo {version}: {e}")
+            with self._lock:
+                self._loading[version] = {"version": version, "state": "error", "error": str(e)}
+            return
+        with self._lock:
+            self.bundles[version] = bundle
+            self._loading[version] = {"version": version, "state": "ready"}
+            retired = self._promote_locked(version)[1] if promote else None
+        if retired is not None:
+            retired.stop()
+        info = bundle.describe()
+        logger.info(f"Modelo {version} listo (carga {info['load_ms']} ms, warm-up {info['warmup_ms']} ms).")
+
+    # ---- Cambio de versión ----
+    def promote(self, version: str) -> bool:
+        with self._lock:
+            promoted, retired = self._promote_locked(version)
+        if retired is not None:
+            retired.stop()
+        return promoted
+
+    def _promote_locked(self, version: str) -> Tuple[bool, Optional[ShadowEvaluator]]:
+        """
+        Cambia el activo; retorna (éxito, sombra retirada). La sombra se saca
+        del registro aquí, pero quien llama la detiene después de soltar el lock.
+        """
+        bundle = self.bundles.get(version)
+        if bundle is None:
+            return False, None
+        if bundle is self.active:
+            return True, None
+        previous, self.active = self.active, bundle
+        self.history.append({"from": previous.version, "to": version, "at": time.time()})
+        retired = None
+        if self.shadow is not None and self.shadow.bundle is bundle:
+            # El candidato promovido ya no tiene contra quién compararse
+            retired, self.shadow = self.shadow, None
+            retired.signal_stop()
+        logger.info(f"Modelo activo: {previous.version} -> {version}.")
+        return True, retired
+
+    def unload(self, version: str) -> bool:
+        """Libera una versión que no está activa ni en sombra."""
+        with self._lock:
+            bundle = self.bundles.get(version)
+            if bundle is None or bundle is self.active or (self.shadow and self.shadow.bundle is bundle):
+                return False
+            del self.bundles[version]
+            self._loading.pop(version, None)
+        return True
+
+    # ---- Modo sombra ----
+    def start_shadow(self, version: str, sample_rate: float = 0.1) -> bool:
+        with self._lock:
+            bundle = self.bundles.get(version)
+            if bundle is None or bundle is self.active:
+                return False
+            if self.shadow is not None and self.shadow.bundle is bundle:
+                self.shadow.sample_rate = min(1.0, max(0.0, sample_rate))
+                return True
+            previous, self.shadow = self.shadow, ShadowEvaluator(bundle, sample_rate)
+        if previous is not None:
+            previous.stop()
+        logger.info(f"Modelo {version} en sombra (muestreo {sample_rate:.0%}).")
+        return True
+
+    def stop_shadow(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            shadow, self.shadow = self.shadow, None
+        if shadow is None:
+            return None
+        shadow.stop()
+        return shadow.get_stats()
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            shadow = self.shadow
+            status = {
+                "active": self.active.version,
+                "versions": {version: bundle.describe() for version, bundle in self.bundles.items()},
+                "loading": {v: s for v, s in self._loading.items() if s["state"] != "ready"},
+                "history": list(self.history[-20:]),
+            }
+        status["shadow"] = shadow.get_stats() if shadow is not None else None
+        return status
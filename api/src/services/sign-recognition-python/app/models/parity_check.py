@@ -0,0 +1,82 @@
+# app/models/parity_check.py
+"""
+Compara un backend candidato (p. ej. TFLite int8) contra el modelo Keras
+sobre secuencias de landmarks grabadas.
+
+Uso:
+    python -m app.models.parity_check --candidate trained_models/model_2/best_colombian_model_int8.tflite \\
+        --sequences grabaciones/*.npy
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Any, Dict
+
+import numpy as np
+
+from app import config
+from app.models.sign_classifier import SignClassifier
+from app.utils.landmark_io import load_landmark_sequences
+
+
+def _run(classifier: SignClassifier, scaled: np.ndarray, batch_size: int):
+    probs = []
+    start = time.perf_counter()
+    for i in range(0, len(scaled), batch_size):
+        probs.append(classifier.predict_proba_scaled(scaled[i:i + batch_size]))
+    elapsed = time.perf_counter() - start
+    return np.concatenate(probs, axis=0), elapsed
+
+
+def check_parity(
+    reference: SignClassifier,
+    candidate: SignClassifier,
+    sequences: np.ndarray,
+    batch_size: int = 1,
+) -> Dict[str, Any]:
+    """Top-1 de acuerdo, diferencia de probabilidades y latencia de ambos backends."""
+    # Cada backend prepara su entrada (uno puede traer el scaler integrado en el grafo)
+    scaled = reference.scale_sequences(sequences)
+    ref_probs, ref_time = _run(reference, scaled, batch_size)
+    cand_probs, cand_time = _run(candidate, candidate.scale_sequences(sequences), batch_size)
+
+    ref_top = np.argmax(ref_probs, axis=-1)
+    cand_top = np.argmax(cand_probs, axis=-1)
+    calls = max(1, -(-len(scaled) // batch_size))
+    return {
+        "sequences": int(len(scaled)),
+        "batch_size": batch_size,
+        "top1_agreement": float(np.mean(ref_top == cand_top)) if len(scaled) else 0.0,
+        "max_abs_prob_diff": float(np.max(np.abs(ref_probs - cand_probs))) if len(scaled) else 0.0,
+        "mean_abs_prob_diff": float(np.mean(np.abs(ref_probs - cand_probs))) if len(scaled) else 0.0,
+        "reference_ms_per_call": round(1000 * ref_time / calls, 3),
+        "candidate_ms_per_call": round(1000 * cand_time / calls, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica la paridad entre backends de inferencia.")
+    parser.add_argument("--sequences", nargs="+", required=True, help="Secuencias grabadas (.npy/.npz)")
+    parser.add_argument("--reference", default=config.MODEL_PATH, help="Modelo .keras de referencia")
+    parser.add_argument("--candidate", required=True, help="Modelo candidato (.tflite o .keras)")
+    parser.add_argument("--candidate-backend", default="tflite", choices=("keras", "tflite"))
+    parser.add_argument("--vocab", default=config.VOCAB_PATH)
+    parser.add_argument("--scaler", default=config.SCALER_PATH)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--min-agreement", type=float, default=0.98)
+    args = parser.parse_args()
+
+    sequences = load_landmark_sequences(args.sequences)
+    reference = SignClassifier(args.reference, args.vocab, args.scaler, backend="keras")
+    candidate = SignClassifier(args.candidate, args.vocab, args.scaler, backend=args.candidate_backend)
+    report = check_parity(reference, candidate, sequences, batch_size=args.batch_size)
+    print(json.dumps(report, indent=2))
+
+    if report["top1_agreement"] < args.min_agreement:
+        print(f"[ERROR] Acuerdo top-1 por debajo de {args.min_agreement:.2%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
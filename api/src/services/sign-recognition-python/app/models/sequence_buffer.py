@@ -0,0 +1,82 @@
+# app/models/sequence_buffer.py
+import numpy as np
+from typing import Optional
+
+
+class ScaledSequenceBuffer:
+    """
+    Buffer circular preasignado (ventana x features, float32) que guarda cada
+    frame ya estandarizado al momento de llegar.
+
+    Cada frame se escribe dos veces (en `pos` y en `pos + window`), así la
+    ventana ordenada del más antiguo al más reciente siempre es un bloque
+    contiguo de memoria y `window_view()` no necesita copiar nada.
+    Sin media/escala (scaler integrado en el modelo) solo se copia el frame.
+    """
+
+    def __init__(
+        self,
+        window: int = 30,
+        num_features: int = 126,
+        mean: Optional[np.ndarray] = None,
+        scale: Optional[np.ndarray] = None,
+    ):
+        self.window = window
+        self.num_features = num_features
+        self._data = np.zeros((2 * window, num_features), dtype=np.float32)
+        self._mean = (
+            np.zeros(num_features, dtype=np.float32) if mean is None
+            else np.asarray(mean, dtype=np.float32).reshape(num_features)
+        )
+        self._inv_scale = (
+            np.ones(num_features, dtype=np.float32) if scale is None
+            else (1.0 / np.asarray(scale, dtype=np.float32)).reshape(num_features)
+        )
+        self._identity = mean is None and scale is None
+        self._pos = 0
+        self.count = 0
+
+    def append(self, frame: np.ndarray):
+        """Estandariza el frame en su lugar dentro del buffer: (x - media) / escala."""
+        row = self._data[self._pos]
+        if self._identity:
+            np.copyto(row, frame)
+        else:
+            np.subtract(frame, self._mean, out=row)
+            np.multiply(row, self._inv_scale, out=row)
+        self._data[self._pos + self.window] = row
+        self._pos = (self._pos + 1) % self.window
+        if self.count < self.window:
+            self.count += 1
+
+    def is_full(self) -> bool:
+        return self.count >= self.window
+
+    def window_view(self) -> np.ndarray:
+        """
+        Vista (1, ventana, features) de los últimos frames, sin copias.
+        La vista se sobrescribe con el siguiente `append`.
+        """
+        return self._data[self._pos:self._pos + self.window][np.newaxis]
+
+    def raw_frames(self) -> np.ndarray:
+        """Copia (frames, features) de lo guardado, del más antiguo al más reciente, sin estandarizar."""
+        frames = self._data[self._pos + self.window - self.count:self._pos + self.window].copy()
+        if not self._identity:
+            frames /= self._inv_scale
+            frames += self._mean
+        return frames
+
+    def load_frames(self, frames: np.ndarray):
+        """Reemplaza el contenido por `frames` sin estandarizar (p. ej. al cambiar a un modelo con otro scaler)."""
+        self.clear()
+        for frame in frames[-self.window:]:
+            self.append(frame)
+
+    def clear(self):
+        self._data.fill(0.0)
+        self._pos = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
@@ -1,49 +1,112 @@
-import tensorflow as tf
 import numpy as np
 import joblib
 import json
+import time
 from pathlib import Path
+from typing import Optional
+
+from app.models.sequence_buffer import ScaledSequenceBuffer
+from app.models.inference_backends import load_backend
+
+SEQUENCE_LENGTH = 30
+NUM_FEATURES = 126
 
 
 class SignClassifier:
-    def __init__(self, model_path: str, vocab_path: str, scaler_path: str):
+    def __init__(
+        self,
+        model_path: str,
+        vocab_path: str,
+        scaler_path: str,
+        backend: str = "keras",
+        num_threads: Optional[int] = None,
+        fold_scaler: bool = True,
+    ):
         self.model_path = Path(model_path)
         self.vocab_path = Path(vocab_path)
         self.scaler_path = Path(scaler_path)
 
-        print("[INFO] Cargando modelo .keras...")
-        self.model = tf.keras.models.load_model(self.model_path, compile=False)
         self.scaler = joblib.load(self.scaler_path)
+        # Media/escala del StandardScaler para escalar de forma vectorizada
+        mean = getattr(self.scaler, "mean_", None)
+        scale = getattr(self.scaler, "scale_", None)
+        self.scaler_mean = np.zeros(NUM_FEATURES, dtype=np.float32) if mean is None else mean.astype(np.float32)
+        self.scaler_scale = np.ones(NUM_FEATURES, dtype=np.float32) if scale is None else scale.astype(np.float32)
+
+        # "keras" usa TensorFlow completo; "tflite" el intérprete liviano.
+        # Con fold_scaler, Keras integra el scaler al inicio del grafo.
+        print(f"[INFO] Cargando modelo ({backend}) desde {self.model_path}...")
+        self.backend = load_backend(
+            backend,
+            self.model_path,
+            num_threads=num_threads,
+            scaler_mean=self.scaler_mean if fold_scaler else None,
+            scaler_scale=self.scaler_scale if fold_scaler else None,
+        )
+        # Si el grafo ya estandariza, las secuencias se entregan sin escalar
+        self.scaler_in_graph = self.backend.scaler_in_graph
 
         with open(self.vocab_path, "r", encoding="utf-8") as f:
             self.vocab = json.load(f)
         self.classes = list(self.vocab.values())
 
-        # Precompilamos la predicción para acelerar tiempo de inferencia
-        self.predict_fn = tf.function(self.model.__call__)
-
         print("[OK] Modelo cargado correctamente.")
 
     def preprocess(self, landmarks_vector: np.ndarray):
         # Escala los landmarks usando el scaler entrenado
         return self.scaler.transform([landmarks_vector])
 
+    def create_sequence_buffer(self) -> ScaledSequenceBuffer:
+        """
+        Buffer circular listo para `predict_scaled`: escala cada frame al
+        llegar, o solo lo copia si el scaler está integrado en el grafo.
+        """
+        if self.scaler_in_graph:
+            return ScaledSequenceBuffer(window=SEQUENCE_LENGTH, num_features=NUM_FEATURES)
+        return ScaledSequenceBuffer(
+            window=SEQUENCE_LENGTH,
+            num_features=NUM_FEATURES,
+            mean=self.scaler_mean,
+            scale=self.scaler_scale,
+        )
+
     def predict(self, sequence_array: np.ndarray):
-        if sequence_array is None or sequence_array.shape[-1] != 126:
+        if sequence_array is None or sequence_array.shape[-1] != NUM_FEATURES:
             return None, 0.0
 
-        # Escalar cada frame en la secuencia
-        seq_scaled = np.array(
-            [
-                self.scaler.transform(frame.reshape(1, -1))[0]
-                for frame in sequence_array[0]
-            ]
-        )
+        # Escalar toda la secuencia en una sola operación vectorizada
+        seq_scaled = self.scale_sequences(sequence_array.reshape(1, -1, NUM_FEATURES))
+        return self.predict_scaled(seq_scaled)
+
+    def predict_scaled(self, seq_scaled: np.ndarray):
+        """Predice sobre una secuencia (1, 30, 126) ya preparada con `scale_sequences`/el buffer."""
+        class_ids, confidences = self.backend.classify(seq_scaled)
+        return self.classes[int(class_ids[0])], float(confidences[0])
+
+    def predict_proba_scaled(self, batch_scaled: np.ndarray) -> np.ndarray:
+        """Probabilidades (B, num_clases) para un lote ya preparado."""
+        return self.backend.predict_proba(batch_scaled)
+
+    def scale_sequences(self, sequences: np.ndarray) -> np.ndarray:
+        """
+        Prepara secuencias crudas (..., 126) para el modelo: las estandariza
+        con la media/escala del scaler, salvo que el grafo ya lo haga.
+        """
+        if self.scaler_in_graph:
+            return np.asarray(sequences, dtype=np.float32)
+        return ((sequences - self.scaler_mean) / self.scaler_scale).astype(np.float32, copy=False)
 
-        seq_scaled = np.expand_dims(seq_scaled, axis=0)
+    def predict_batch(self, batch_scaled: np.ndarray):
+        """Predice un lote (B, 30, 126) ya preparado; retorna [(etiqueta, confianza), ...]."""
+        class_ids, confidences = self.backend.classify(batch_scaled)
+        return [(self.classes[int(c)], float(p)) for c, p in zip(class_ids, confidences)]
 
-        preds = self.predict_fn(tf.constant(seq_scaled, dtype=tf.float32))
-        class_id = int(np.argmax(preds))
-        confidence = float(np.max(preds))
-        label = self.classes[class_id]
-        return label, confidence
+    def warm_up(self, batch_sizes=(1,)) -> float:
+        """
+        Inferencia de prueba sobre ceros (B, 30, 126) para que el primer frame
+        real no pague el trazado de tf.function / la asignación de tensores.
+        """
+        start = time.perf_counter()
+        for batch_size in batch_sizes:
+            self.backend.classify(np.zeros((batch_size, SEQUENCE_LENGTH, NUM_FEATURES), dtype=np.float32))
+        return time.perf_counter() - start
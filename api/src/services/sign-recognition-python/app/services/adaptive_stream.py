@@ -0,0 +1,125 @@
+# app/services/adaptive_stream.py
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+STREAM_MODES = ("full", "thumbnail", "preview")
+
+
+class AdaptiveStreamController:
+    """
+    Ajusta por cliente la calidad JPEG, la escala y los FPS objetivo según
+    la latencia de envío, la profundidad de su cola y los frames descartados.
+
+    Modos:
+    - "full": video adaptativo dentro de los límites configurados.
+    - "thumbnail": miniaturas de baja calidad y pocos FPS.
+    - "preview": solo predicciones, sin frames.
+
+    Al congestionarse se degrada en orden calidad -> escala -> FPS; al
+    recuperarse se mejora en orden inverso. La calidad se mueve en pasos
+    fijos para que clientes con condiciones parecidas compartan la misma
+    codificación en caché.
+    """
+
+    def __init__(
+        self,
+        mode: str = "full",
+        min_quality: int = 30,
+        max_quality: int = 80,
+        quality_step: int = 10,
+        scales: Tuple[float, ...] = (1.0, 0.75, 0.5),
+        min_fps: float = 5.0,
+        max_fps: float = 30.0,
+        target_send_ms: float = 40.0,
+        evaluate_every: int = 10,
+    ):
+        self.min_quality = min_quality
+        self.max_quality = max_quality
+        self.quality_step = quality_step
+        self.scales = scales
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+        self.target_send = target_send_ms / 1000.0
+        self.evaluate_every = evaluate_every
+
+        self.quality = max_quality
+        self.scale_index = 0
+        self.target_fps = max_fps
+        self.mode = "full"
+        self.set_mode(mode)
+
+        self._send_times = deque(maxlen=evaluate_every)
+        self._last_dropped = 0
+        self._congested_signals = 0
+        self._last_sent_at = 0.0
+
+    # ---- Modo ----
+    def set_mode(self, mode: str):
+        if mode not in STREAM_MODES:
+            raise ValueError(f"Modo de stream no soportado: {mode}")
+        self.mode = mode
+        if mode == "thumbnail":
+            self.quality = self.min_quality
+            self.scale_index = len(self.scales) - 1
+            self.target_fps = self.min_fps
+
+    @property
+    def scale(self) -> float:
+        return self.scales[self.scale_index]
+
+    @property
+    def sends_frames(self) -> bool:
+        return self.mode != "preview"
+
+    # ---- Ritmo de envío ----
+    def should_send(self, now: Optional[float] = None) -> bool:
+        """Respeta los FPS objetivo del cliente; el resto de frames se omite."""
+        now = time.monotonic() if now is None else now
+        if now - self._last_sent_at < 1.0 / self.target_fps:
+            return False
+        self._last_sent_at = now
+        return True
+
+    def record_send(self, send_seconds: float, queue_depth: int, dropped_total: int):
+        """Registra un envío y, cada `evaluate_every` envíos, ajusta los parámetros."""
+        self._send_times.append(send_seconds)
+        if dropped_total > self._last_dropped or queue_depth > 1:
+            self._congested_signals += 1
+        self._last_dropped = dropped_total
+
+        if len(self._send_times) < self.evaluate_every or self.mode != "full":
+            return
+        avg_send = sum(self._send_times) / len(self._send_times)
+        congested = avg_send > self.target_send or self._congested_signals > self.evaluate_every // 3
+        relaxed = avg_send < self.target_send / 2 and self._congested_signals == 0
+        if congested:
+            self._degrade()
+        elif relaxed:
+            self._upgrade()
+        self._send_times.clear()
+        self._congested_signals = 0
+
+    def _degrade(self):
+        if self.quality > self.min_quality:
+            self.quality = max(self.min_quality, self.quality - self.quality_step)
+        elif self.scale_index < len(self.scales) - 1:
+            self.scale_index += 1
+        elif self.target_fps > self.min_fps:
+            self.target_fps = max(self.min_fps, self.target_fps * 0.75)
+
+    def _upgrade(self):
+        if self.target_fps < self.max_fps:
+            self.target_fps = min(self.max_fps, self.target_fps * 1.25)
+        elif self.scale_index > 0:
+            self.scale_index -= 1
+        elif self.quality < self.max_quality:
+            self.quality = min(self.max_quality, self.quality + self.quality_step)
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "quality": self.quality,
+            "scale": self.scale,
+            "target_fps": round(self.target_fps, 1),
+        }
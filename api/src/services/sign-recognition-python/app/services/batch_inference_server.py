@@ -0,0 +1,186 @@
+# app/services/batch_inference_server.py
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.model_registry import convert_scaled
+from app.models.sign_classifier import SignClassifier, SEQUENCE_LENGTH, NUM_FEATURES
+
+if TYPE_CHECKING:
+    from app.models.model_registry import ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingSequence:
+    __slots__ = ("sequence", "classifier", "future", "enqueued_at")
+
+    def __init__(self, sequence: np.ndarray, classifier: Optional[SignClassifier] = None):
+        self.sequence = sequence
+        # Clasificador para el que se escaló la secuencia (cambia al promover otra versión)
+        self.classifier = classifier
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class BatchInferenceServer:
+    """
+    Agrupa secuencias (1, 30, 126) de varios VideoProcessor en una sola
+    llamada (B, 30, 126) al modelo y devuelve a cada stream su resultado.
+
+    El lote se despacha cuando llega a `max_batch_size`, cuando ya enviaron
+    todos los streams registrados, o al vencer `max_wait_ms` desde la
+    primera secuencia en cola.
+    """
+
+    def __init__(
+        self,
+        classifier: SignClassifier,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 8.0,
+        model_registry: Optional["ModelRegistry"] = None,
+    ):
+        self.classifier = classifier
+        # Con registro, cada lote usa el modelo activo en ese momento
+        self.model_registry = model_registry
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.active_streams = 0
+
+        self._pending: Deque[_PendingSequence] = deque()
+        self._cond = threading.Condition()
+        self._batch = np.zeros((max_batch_size, SEQUENCE_LENGTH, NUM_FEATURES), dtype=np.float32)
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        # Métricas
+        self.batches_run = 0
+        self.sequences_run = 0
+        self.batch_size_counts: Dict[int, int] = {}
+        self.queue_waits = deque(maxlen=500)
+        self.batch_times = deque(maxlen=500)
+
+    # ---- Ciclo de vida ----
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="batch-inference", daemon=True)
+        self._thread.start()
+        logger.info(f"Servidor de inferencia por lotes iniciado (max_batch={self.max_batch_size}).")
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def register_stream(self):
+        with self._cond:
+            self.active_streams += 1
+
+    def unregister_stream(self):
+        with self._cond:
+            self.active_streams = max(0, self.active_streams - 1)
+            self._cond.notify_all()
+
+    # ---- API para los streams ----
+    def submit(self, seq_scaled: np.ndarray, classifier: Optional[SignClassifier] = None) -> Future:
+        """
+        Encola una secuencia ya escalada (para `classifier`, por defecto el
+        activo). El arreglo no se copia: el llamador no debe modificarlo
+        hasta que el Future se resuelva.
+        """
+        request = _PendingSequence(seq_scaled, classifier)
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("El servidor de inferencia por lotes no está iniciado.")
+            self._pending.append(request)
+            self._cond.notify_all()
+        return request.future
+
+    def predict_scaled(self, seq_scaled: np.ndarray, classifier: Optional[SignClassifier] = None) -> Tuple[str, float]:
+        """Mismo contrato que SignClassifier.predict_scaled, pero pasando por el lote."""
+        return self.submit(seq_scaled, classifier).result()
+
+    # ---- Worker ----
+    def _collect_batch(self) -> List[_PendingSequence]:
+        with self._cond:
+            while self._running and not self._pending:
+                self._cond.wait()
+            if not self._running:
+                return []
+
+            deadline = self._pending[0].enqueued_at + self.max_wait
+            while self._running:
+                expected = min(self.max_batch_size, max(1, self.active_streams))
+                if len(self._pending) >= expected:
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            size = min(len(self._pending), self.max_batch_size)
+            return [self._pending.popleft() for _ in range(size)]
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if not batch:
+                with self._cond:
+                    if not self._running:
+                        break
+                continue
+
+            start = time.perf_counter()
+            size = len(batch)
+            classifier = self.model_registry.active.classifier if self.model_registry else self.classifier
+            for i, request in enumerate(batch):
+                sequence = request.sequence
+                if request.classifier is not None and request.classifier is not classifier:
+                    # Secuencia escalada para la versión anterior (justo durante un cambio de modelo)
+                    sequence = convert_scaled(sequence, request.classifier, classifier)
+                np.copyto(self._batch[i], sequence.reshape(SEQUENCE_LENGTH, NUM_FEATURES))
+                self.queue_waits.append(start - request.enqueued_at)
+
+            try:
+                results = classifier.predict_batch(self._batch[:size])
+                for request, result in zip(batch, results):
+                    request.future.set_result(result)
+            except Exception as e:
+                logger.error(f"Error en inferencia por lotes: {e}")
+                for request in batch:
+                    request.future.set_exception(e)
+
+            self.batch_times.append(time.perf_counter() - start)
+            self.batches_run += 1
+            self.sequences_run += size
+            self.batch_size_counts[size] = self.batch_size_counts.get(size, 0) + 1
+
+        # Liberar a quien siga esperando
+        with self._cond:
+            while self._pending:
+                self._pending.popleft().future.set_exception(RuntimeError("Servidor de inferencia detenido."))
+
+    def get_stats(self) -> Dict[str, Any]:
+        waits = list(self.queue_waits)
+        times = list(self.batch_times)
+        return {
+            "active_streams": self.active_streams,
+            "batches_run": self.batches_run,
+            "sequences_run": self.sequences_run,
+            "avg_batch_size": round(self.sequences_run / self.batches_run, 2) if self.batches_run else 0.0,
+            "batch_size_counts": dict(self.batch_size_counts),
+            "avg_queue_wait_ms": round(1000 * sum(waits) / len(waits), 3) if waits else 0.0,
+            "max_queue_wait_ms": round(1000 * max(waits), 3) if waits else 0.0,
+            "avg_batch_ms": round(1000 * sum(times) / len(times), 3) if times else 0.0,
+        }
@@ -3,40 +3,182 @@ import numpy as np
 import mediapipe as mp
 import requests
 import logging
-from typing import Dict, Optional, Any
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional, Any, Tuple
+
+from app.services.hand_roi import roi_from_box, roi_to_frame, track_box
+from app.utils.landmark_io import MAX_HANDS, NUM_LANDMARKS
 
 logger = logging.getLogger(__name__)
 
 class CameraManager:
-    def __init__(self):
+    def __init__(
+        self,
+        use_grabber: bool = True,
+        hand_tracking: bool = False,
+        detection_scale: float = 1.0,
+        roi_margin: float = 0.25,
+        roi_max_side: int = 256,
+        redetect_interval: int = 10,
+        source_file: Optional[str] = None,
+        remote_detector=None,
+        esp32_url: Optional[str] = "http://192.168.126.15:81/",
+        local_index: Optional[int] = 0,
+        probe_timeout: float = 3.0,
+    ):
         self.capture = None
         self.is_esp32 = False
         self.esp32_url = None
+        # Fuente de archivo (clip MP4/MJPEG grabado), para benchmarks y pruebas sin cámara
+        self.file_path: Optional[str] = None
+        self.loop_file = True
+        self._file_frame_interval = 0.0
+        # Si se indica, `initialize` reproduce este clip en vez de buscar cámaras
+        self.source_file = source_file or None
+        # Fuentes que prueba `initialize` (None = no probar esa fuente)
+        self.default_esp32_url = esp32_url or None
+        self.default_local_index = local_index
+        self.probe_timeout = probe_timeout
+        # Con detector remoto (PooledHandDetector) MediaPipe corre en otro proceso
+        # y este CameraManager solo captura
+        self.remote_detector = remote_detector
         self.mp_hands = mp.solutions.hands
+        # En modo tracking el detector completo solo ve frames sueltos (re-detecciones):
+        # sin estado de tracking de MediaPipe entre ellos
         self.hands_detector = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=2,
+            static_image_mode=hand_tracking,
+            max_num_hands=MAX_HANDS,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
-        )
-        self.mp_drawing = mp.solutions.drawing_utils
+        ) if remote_detector is None else None
+        # Landmarks del último frame: (manos, 21, xyz) float32 preasignado
+        self.landmarks = np.zeros((MAX_HANDS, NUM_LANDMARKS, 3), dtype=np.float32)
+
+        # Modo tracking: detección sobre copia reducida y, mientras haya manos,
+        # solo sobre un recorte alrededor de los landmarks anteriores.
+        # El recorte cambia de posición y tamaño en cada frame, así que su detector
+        # trabaja en modo imagen estática (el tracking lo hace la caja, no MediaPipe).
+        self.hand_tracking = hand_tracking
+        self.detection_scale = detection_scale
+        self.roi_margin = roi_margin
+        self.roi_max_side = roi_max_side
+        self.redetect_interval = max(1, redetect_interval)
+        self.roi_detector = self.mp_hands.Hands(
+            static_image_mode=True,
+            max_num_hands=MAX_HANDS,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        ) if hand_tracking and remote_detector is None else None
+        self._track_box: Optional[Tuple[float, float, float, float]] = None
+        self._frames_since_full = 0
+        self.full_detections = 0
+        self.roi_detections = 0
+
         self.last_frame = None
 
+        # Modo grabber: un hilo drena la cámara y conserva solo el frame más reciente
+        self.use_grabber = use_grabber
+        self._grab_thread: Optional[threading.Thread] = None
+        # Cada hilo grabber tiene su propio Event: uno colgado nunca se reactiva
+        self._grab_stop: Optional[threading.Event] = None
+        self._grab_lock = threading.Lock()
+        self._latest_frame: Optional[np.ndarray] = None
+        self._latest_seq = 0
+        self._consumed_seq = 0
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self._capture_times = deque(maxlen=60)
+
     # Inicialización
     def initialize(self, auto_connect: bool = True) -> bool:
-        """Intenta conectar automáticamente una cámara (ESP32 o local)."""
+        """
+        Intenta conectar automáticamente una cámara (ESP32 o local). Ambas se
+        prueban en paralelo y con tiempo límite; gana la de mayor prioridad
+        (ESP32) que haya abierto dentro del plazo.
+        """
+        if self.source_file:
+            return self.connect_file(self.source_file)
         if auto_connect:
-            # Intenta ESP32
-            if self.connect_esp32("http://192.168.126.15:81/"):
-                logger.info("Conectado a cámara ESP32-CAM.")
-                return True
-            # Si falla, intenta cámara local
-            if self.connect_local(0):
-                logger.info("Cámara local inicializada.")
+            candidates = [("esp32", self.default_esp32_url), ("local", self.default_local_index)]
+            chosen = self._probe_sources([c for c in candidates if c[1] is not None])
+            if chosen is not None:
+                kind, target, cap = chosen
+                self.close()
+                self._adopt_capture(cap, is_esp32=(kind == "esp32"), url=target if kind == "esp32" else None)
+                if kind == "esp32":
+                    logger.info("Conectado a cámara ESP32-CAM.")
+                else:
+                    logger.info("Cámara local inicializada.")
                 return True
         logger.warning("No se detectó ninguna cámara disponible.")
         return False
 
+    @staticmethod
+    def _open_capture_async(target) -> Future:
+        """Abre la captura en un hilo daemon: un stream colgado no bloquea ni el arranque ni la salida."""
+        future: Future = Future()
+
+        def run():
+            try:
+                future.set_result(cv2.VideoCapture(target))
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name="camera-probe", daemon=True).start()
+        return future
+
+    @staticmethod
+    def _release_when_done(future: Future):
+        def release(done: Future):
+            if done.exception() is None:
+                done.result().release()
+        future.add_done_callback(release)
+
+    def _probe_sources(self, candidates: List[Tuple[str, Any]]) -> Optional[Tuple[str, Any, Any]]:
+        """Retorna (tipo, destino, captura abierta) de la primera fuente por prioridad, o None."""
+        deadline = time.monotonic() + self.probe_timeout
+        futures = [self._open_capture_async(target) for _, target in candidates]
+        chosen = None
+        for (kind, target), future in zip(candidates, futures):
+            if chosen is not None:
+                # Las de menor prioridad se liberan al terminar de abrir
+                self._release_when_done(future)
+                continue
+            try:
+                cap = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                logger.warning(f"Cámara {kind} ({target}) no respondió en {self.probe_timeout:.1f}s.")
+                self._release_when_done(future)
+                continue
+            except Exception as e:
+                logger.warning(f"Error abriendo cámara {kind} ({target}): {e}")
+                continue
+            if cap.isOpened():
+                chosen = (kind, target, cap)
+            else:
+                cap.release()
+        return chosen
+
+    def _adopt_capture(self, cap, is_esp32: bool = False, url: Optional[str] = None):
+        self.capture = cap
+        self.is_esp32 = is_esp32
+        self.esp32_url = url
+        self._start_grabber()
+
+    def warm_up(self, frame_size: Tuple[int, int] = (640, 480)) -> float:
+        """Corre la detección una vez sobre un frame en negro (inicializa el grafo de MediaPipe)."""
+        width, height = frame_size
+        start = time.perf_counter()
+        self.detect_hands_array(np.zeros((height, width, 3), dtype=np.uint8))
+        # Que el frame de prueba no cuente para el tracking ni las estadísticas
+        self._track_box = None
+        self.full_detections = 0
+        self.roi_detections = 0
+        return time.perf_counter() - start
+
     def connect_esp32(self, url: str) -> bool:
         """Conecta a stream ESP32-CAM (HTTP MJPEG)."""
         self.close()
@@ -44,17 +186,56 @@ class CameraManager:
         if not cap.isOpened():
             logger.warning(f"No se pudo abrir el stream MJPEG de la ESP32-CAM: {url}")
             return False
-        self.capture = cap
-        self.is_esp32 = True
-        self.esp32_url = url
+        self._adopt_capture(cap, is_esp32=True, url=url)
         logger.info(f"✅ ESP32-CAM conectada a stream {url}")
         return True
 
 
+    def connect_file(self, path: str, loop: bool = True, realtime: bool = True) -> bool:
+        """
+        Usa un video grabado (MP4/MJPEG) como cámara. Con `realtime` el grabber
+        entrega los frames al ritmo del clip; sin grabber se leen tan rápido
+        como se pidan (útil para medir throughput).
+        """
+        self.close()
+        cap = cv2.VideoCapture(str(path))
+        if not cap.isOpened():
+            logger.warning(f"No se pudo abrir el video: {path}")
+            return False
+        self.capture = cap
+        self.file_path = str(path)
+        self.loop_file = loop
+        clip_fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        self._file_frame_interval = 1.0 / clip_fps if realtime and clip_fps > 0 else 0.0
+        self._start_grabber()
+        logger.info(f"Video {path} abierto como fuente de cámara ({clip_fps:.1f} FPS).")
+        return True
+
+    def _read_capture(self, capture) -> Tuple[bool, Optional[np.ndarray]]:
+        ret, frame = capture.read()
+        if not ret and self.file_path is not None and self.loop_file:
+            # Fin del clip: se rebobina para repetirlo
+            capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = capture.read()
+        return ret, frame
+
     def get_frame(self) -> Optional[np.ndarray]:
-        """Obtiene un frame de la cámara (ESP32 o local)."""
+        """
+        Obtiene un frame de la cámara (ESP32 o local).
+        En modo grabber retorna de inmediato el frame más reciente, o None si
+        no ha llegado uno nuevo desde la última llamada.
+        """
+        if self._grab_thread is not None:
+            with self._grab_lock:
+                if self._latest_seq == self._consumed_seq:
+                    return None
+                self._consumed_seq = self._latest_seq
+                frame = self._latest_frame
+            self.last_frame = frame
+            return frame
+
         if self.capture is not None and self.capture.isOpened():
-            ret, frame = self.capture.read()
+            ret, frame = self._read_capture(self.capture)
             if ret:
                 self.last_frame = frame
                 return frame
@@ -70,10 +251,98 @@ class CameraManager:
         if not cap.isOpened():
             logger.warning("No se pudo abrir la cámara local.")
             return False
-        self.capture = cap
-        self.is_esp32 = False
+        self._adopt_capture(cap)
         return True
 
+    # ---- Grabber en segundo plano ----
+    def _start_grabber(self):
+        if not self.use_grabber or self.capture is None:
+            return
+        # Evita que OpenCV acumule frames viejos en su buffer interno
+        self.capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        with self._grab_lock:
+            self._latest_frame = None
+            self._latest_seq = 0
+            self._consumed_seq = 0
+            self._capture_times.clear()
+        self._grab_stop = threading.Event()
+        self._grab_thread = threading.Thread(
+            target=self._grab_loop, args=(self.capture, self._grab_stop), name="camera-grabber", daemon=True
+        )
+        self._grab_thread.start()
+
+    def _stop_grabber(self) -> bool:
+        """Detiene el grabber; False si sigue vivo (p. ej. una lectura de red colgada)."""
+        if self._grab_thread is None:
+            return True
+        self._grab_stop.set()
+        self._grab_thread.join(timeout=2.0)
+        stopped = not self._grab_thread.is_alive()
+        if not stopped:
+            # Liberará la captura él mismo al salir de read()
+            logger.warning("El hilo grabber no terminó a tiempo.")
+        self._grab_thread = None
+        self._grab_stop = None
+        return stopped
+
+    def _grab_loop(self, capture, stop: threading.Event):
+        """Lee continuamente la cámara; cada frame nuevo reemplaza al anterior. Libera la captura al salir."""
+        next_due = time.perf_counter()
+        failures, last_warning = 0, 0.0
+        try:
+            while not stop.is_set():
+                if self._file_frame_interval:
+                    # Clip grabado: se respeta su ritmo original, como una cámara en vivo
+                    next_due += self._file_frame_interval
+                    delay = next_due - time.perf_counter()
+                    if delay > 0:
+                        stop.wait(delay)
+                    else:
+                        next_due = time.perf_counter()
+                ret, frame = self._read_capture(capture)
+                if stop.is_set():
+                    # Detenido durante la lectura: el frame ya no es de esta sesión
+                    break
+                if not ret:
+                    failures += 1
+                    if time.monotonic() - last_warning >= 5.0:
+                        logger.warning(f"⚠️ No se pudo leer frame de la cámara ({failures} fallos seguidos).")
+                        last_warning = time.monotonic()
+                    stop.wait(0.1)
+                    continue
+                failures = 0
+                self._publish_frame(frame)
+        finally:
+            capture.release()
+
+    def _publish_frame(self, frame: np.ndarray):
+        now = time.perf_counter()
+        with self._grab_lock:
+            if self._latest_seq > self._consumed_seq:
+                # El frame anterior nunca fue consumido
+                self.frames_dropped += 1
+            self._latest_frame = frame
+            self._latest_seq += 1
+            self.frames_captured += 1
+            self._capture_times.append(now)
+
+    def get_capture_fps(self) -> float:
+        """FPS reales de captura (solo modo grabber)."""
+        with self._grab_lock:
+            if len(self._capture_times) < 2:
+                return 0.0
+            elapsed = self._capture_times[-1] - self._capture_times[0]
+            return (len(self._capture_times) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def get_capture_stats(self) -> Dict[str, Any]:
+        return {
+            "grabber": self._grab_thread is not None,
+            "frame_seq": self._latest_seq,
+            "frames_captured": self.frames_captured,
+            "frames_dropped": self.frames_dropped,
+            "capture_fps": round(self.get_capture_fps(), 2),
+        }
+
     def switch_camera(self, config: Dict[str, Any]) -> bool:
         """Permite cambiar entre cámaras (según configuración enviada)."""
         camera_type = config.get("type", "local")
@@ -81,28 +350,105 @@ class CameraManager:
             return self.connect_esp32(config.get("url", "http://192.168.126.15:81/"))
         elif camera_type == "local":
             return self.connect_local(config.get("index", 0))
+        elif camera_type == "file" and config.get("path"):
+            return self.connect_file(config["path"], loop=config.get("loop", True), realtime=config.get("realtime", True))
         return False
 
     def detect_hands(self, frame: np.ndarray):
         """
-        Detecta manos en un frame y retorna lista de landmarks normalizados.
+        Detecta manos en un frame y retorna lista de landmarks normalizados
+        (siempre relativos al frame completo, también en modo tracking).
         """
-        if frame is None:
+        landmarks, num_hands = self.detect_hands_array(frame)
+        if landmarks is None:
             return None
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = self.hands_detector.process(rgb)
-        landmarks_list = []
-
-        if result.multi_hand_landmarks:
-            for hand_landmarks in result.multi_hand_landmarks:
-                # Extrae coordenadas normalizadas
-                landmarks = [(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark]
-                landmarks_list.append(landmarks)
-                # Dibuja la mano
-                self.mp_drawing.draw_landmarks(
-                    frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS
-                )
-        return landmarks_list
+        return [[tuple(point) for point in landmarks[i].tolist()] for i in range(num_hands)]
+
+    def detect_hands_array(self, frame: np.ndarray) -> Tuple[Optional[np.ndarray], int]:
+        """
+        Detecta manos y llena `self.landmarks` (2, 21, 3) float32 en su lugar,
+        en coordenadas normalizadas del frame completo (también en modo tracking).
+        Retorna (landmarks, número de manos); las filas sin mano quedan en cero.
+        El arreglo se reutiliza en el siguiente frame. No dibuja sobre el frame
+        (ver FrameRenderer).
+        """
+        if frame is None:
+            return None, 0
+        if self.remote_detector is not None:
+            # El worker del pool aplica el mismo tracking y retorna el mismo formato
+            return self.remote_detector.detect(frame)
+        if self.hand_tracking:
+            hands, roi = self._detect_tracked(frame)
+        else:
+            hands, roi = self._run_detector(self.hands_detector, frame), None
+
+        num_hands = min(len(hands), MAX_HANDS)
+        for i in range(num_hands):
+            # Coordenadas normalizadas directo al arreglo preasignado
+            self.landmarks[i].reshape(-1)[:] = np.fromiter(
+                (c for lm in hands[i].landmark for c in (lm.x, lm.y, lm.z)),
+                dtype=np.float32,
+                count=NUM_LANDMARKS * 3,
+            )
+        self.landmarks[num_hands:] = 0.0
+
+        if roi is not None and num_hands:
+            # Del recorte al frame completo
+            roi_to_frame(self.landmarks[:num_hands], roi)
+        if self.hand_tracking:
+            self._update_track_box(num_hands)
+        return self.landmarks, num_hands
+
+    # ---- Tracking por ROI ----
+    def _run_detector(self, detector, image: np.ndarray) -> List:
+        """Ejecuta MediaPipe sobre `image`; landmarks normalizados a esa imagen."""
+        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        result = detector.process(rgb)
+        return list(result.multi_hand_landmarks or [])
+
+    def _roi_from_track(self, frame_w: int, frame_h: int) -> Optional[Tuple[int, int, int, int]]:
+        """Caja (px) expandida alrededor de los últimos landmarks."""
+        return roi_from_box(self._track_box, frame_w, frame_h, self.roi_margin)
+
+    def _detect_tracked(self, frame: np.ndarray) -> Tuple[List, Optional[Tuple[float, float, float, float]]]:
+        """
+        Retorna (manos, roi): `roi` = (x0, y0, ancho, alto) del recorte como
+        fracción del frame, o None si las manos salieron del frame completo.
+        """
+        frame_h, frame_w = frame.shape[:2]
+        hands: List = []
+
+        roi_px = None
+        if self._track_box is not None and self._frames_since_full < self.redetect_interval:
+            roi_px = self._roi_from_track(frame_w, frame_h)
+        if roi_px is not None:
+            x0, y0, x1, y1 = roi_px
+            crop = frame[y0:y1, x0:x1]
+            longest = max(crop.shape[:2])
+            if longest > self.roi_max_side:
+                crop = cv2.resize(crop, None, fx=self.roi_max_side / longest,
+                                  fy=self.roi_max_side / longest, interpolation=cv2.INTER_AREA)
+            hands = self._run_detector(self.roi_detector, crop)
+            if hands:
+                self.roi_detections += 1
+                self._frames_since_full += 1
+                return hands, (x0 / frame_w, y0 / frame_h, (x1 - x0) / frame_w, (y1 - y0) / frame_h)
+
+        # Re-detección periódica (o manos perdidas) sobre el frame completo reducido
+        image = frame
+        if self.detection_scale != 1.0:
+            image = cv2.resize(frame, None, fx=self.detection_scale, fy=self.detection_scale,
+                               interpolation=cv2.INTER_AREA)
+        hands = self._run_detector(self.hands_detector, image)
+        self.full_detections += 1
+        self._frames_since_full = 0
+        return hands, None
+
+    def _update_track_box(self, num_hands: int):
+        if num_hands == 0:
+            self._track_box = None
+            return
+        self._track_box = track_box(self.landmarks[:num_hands])
 
     # Estado
     def list_cameras(self) -> Dict[str, Any]:
@@ -119,15 +465,33 @@ class CameraManager:
         """Estado actual de conexión."""
         return {
             "connected": self.capture is not None or self.is_esp32,
-            "type": "esp32" if self.is_esp32 else "local",
+            "type": "esp32" if self.is_esp32 else ("file" if self.file_path else "local"),
             "esp32_url": self.esp32_url,
+            "file_path": self.file_path,
+            **self.get_capture_stats(),
+            **self.get_detection_stats(),
+        }
+
+    def get_detection_stats(self) -> Dict[str, Any]:
+        stats = {
+            "hand_tracking": self.hand_tracking,
+            "full_detections": self.full_detections,
+            "roi_detections": self.roi_detections,
         }
+        if self.remote_detector is not None:
+            stats["detection_pool"] = self.remote_detector.pool.get_stats()
+        return stats
 
     def close(self):
         """Libera recursos de cámara."""
-        if self.capture:
+        stopped = self._stop_grabber()
+        self._track_box = None
+        if self.capture and stopped:
+            # Si el grabber sigue vivo, la captura es suya: liberarla aquí sería usarla desde dos hilos
             self.capture.release()
         self.capture = None
         self.is_esp32 = False
         self.esp32_url = None
+        self.file_path = None
+        self._file_frame_interval = 0.0
         logger.info("Cámara cerrada correctamente.")
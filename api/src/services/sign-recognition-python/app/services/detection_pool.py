@@ -0,0 +1,292 @@
+# app/services/detection_pool.py
+"""
+Pool de procesos para la detección de manos con MediaPipe.
+
+Cada proceso worker tiene sus propios detectores `Hands` y atiende un
+subconjunto fijo de streams: un stream siempre va al mismo worker, así se
+conserva el estado de tracking de MediaPipe (y el del recorte ROI).
+
+Los frames viajan por memoria compartida: cada stream tiene un bloque para
+el frame y otro para los landmarks (2, 21, 3) float32. Por las colas solo
+pasan mensajes chicos (id de pedido, forma del frame, número de manos).
+"""
+import itertools
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.utils.landmark_io import MAX_HANDS, NUM_LANDMARKS
+
+logger = logging.getLogger(__name__)
+
+LANDMARKS_SHAPE = (MAX_HANDS, NUM_LANDMARKS, 3)
+LANDMARKS_BYTES = int(np.prod(LANDMARKS_SHAPE)) * 4
+
+
+def _attach_shm(name: str) -> shared_memory.SharedMemory:
+    """Abre un bloque creado por el proceso padre sin que el worker lo registre como propio."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: se quita del resource_tracker para que no lo borre al salir el worker
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def _detection_worker(requests, results, camera_options: Dict[str, Any]):
+    """Bucle del proceso worker: un CameraManager (solo detección) por stream asignado."""
+    from app.services.camera_manager import CameraManager
+
+    options = {**camera_options, "use_grabber": False, "source_file": None}
+    detectors: Dict[int, Any] = {}
+    blocks: Dict[int, Tuple[shared_memory.SharedMemory, shared_memory.SharedMemory]] = {}
+
+    def close_blocks(stream_id: int):
+        for shm in blocks.pop(stream_id, ()):
+            shm.close()
+
+    while True:
+        message = requests.get()
+        kind = message[0]
+        if kind == "stop":
+            break
+        if kind == "open":
+            _, stream_id, frame_name, landmarks_name = message
+            close_blocks(stream_id)
+            blocks[stream_id] = (_attach_shm(frame_name), _attach_shm(landmarks_name))
+            if stream_id not in detectors:
+                detectors[stream_id] = CameraManager(**options)
+            continue
+        if kind == "close":
+            _, stream_id = message
+            close_blocks(stream_id)
+            detector = detectors.pop(stream_id, None)
+            if detector is not None:
+                detector.close()
+            continue
+
+        # ("detect", request_id, stream_id, shape)
+        _, request_id, stream_id, shape = message
+        try:
+            frame_block, landmarks_block = blocks[stream_id]
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=frame_block.buf)
+            landmarks, num_hands = detectors[stream_id].detect_hands_array(frame)
+            out = np.ndarray(LANDMARKS_SHAPE, dtype=np.float32, buffer=landmarks_block.buf)
+            out[:] = landmarks
+            results.put((request_id, num_hands, None))
+        except Exception as e:
+            results.put((request_id, 0, str(e)))
+
+    for stream_id in list(blocks):
+        close_blocks(stream_id)
+
+
+class _StreamSlot:
+    """Bloques de memoria compartida de un stream y el worker al que está fijado."""
+
+    def __init__(self, stream_id: int, worker: int, frame_bytes: int):
+        self.stream_id = stream_id
+        self.worker = worker
+        self.frame_block = shared_memory.SharedMemory(create=True, size=max(1, frame_bytes))
+        self.landmarks_block = shared_memory.SharedMemory(create=True, size=LANDMARKS_BYTES)
+        self.landmarks = np.ndarray(LANDMARKS_SHAPE, dtype=np.float32, buffer=self.landmarks_block.buf)
+
+    def release(self):
+        for shm in (self.frame_block, self.landmarks_block):
+            shm.close()
+            shm.unlink()
+
+
+class DetectionPool:
+    """
+    N procesos con MediaPipe. `detect(stream_id, frame)` copia el frame a la
+    memoria compartida del stream, espera al worker y retorna
+    (landmarks (2, 21, 3), número de manos) igual que `detect_hands_array`.
+    """
+
+    def __init__(
+        self,
+        num_workers: int,
+        camera_options: Optional[Dict[str, Any]] = None,
+        timeout: float = 5.0,
+    ):
+        self.num_workers = max(1, int(num_workers))
+        self.camera_options = dict(camera_options or {})
+        self.timeout = timeout
+
+        self._context = multiprocessing.get_context("spawn")
+        self._requests = []
+        self._results = []
+        self._processes = []
+        self._dispatchers = []
+        self._futures: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._request_ids = itertools.count()
+        self._stream_ids = itertools.count(1)
+        self._streams: Dict[int, _StreamSlot] = {}
+        self._running = False
+
+        self.detections = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    # ---- Ciclo de vida ----
+    def start(self):
+        if self._running:
+            return
+        for index in range(self.num_workers):
+            requests = self._context.Queue()
+            results = self._context.Queue()
+            process = self._context.Process(
+                target=_detection_worker,
+                args=(requests, results, self.camera_options),
+                name=f"hand-detector-{index}",
+                daemon=True,
+            )
+            process.start()
+            dispatcher = threading.Thread(
+                target=self._dispatch, args=(results,), name=f"hand-detector-results-{index}", daemon=True
+            )
+            dispatcher.start()
+            self._requests.append(requests)
+            self._results.append(results)
+            self._processes.append(process)
+            self._dispatchers.append(dispatcher)
+        self._running = True
+        logger.info(f"Pool de detección de manos iniciado con {self.num_workers} procesos.")
+
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        for stream_id in list(self._streams):
+            self.unregister_stream(stream_id)
+        for requests in self._requests:
+            requests.put(("stop",))
+        for results in self._results:
+            results.put(None)  # despierta al dispatcher
+        for process in self._processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        self._requests, self._results, self._processes, self._dispatchers = [], [], [], []
+
+    def _dispatch(self, results):
+        while True:
+            message = results.get()
+            if message is None:
+                return
+            request_id, num_hands, error = message
+            with self._lock:
+                future = self._futures.pop(request_id, None)
+            if future is None:
+                continue  # el pedido ya había vencido
+            if error is not None:
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result(num_hands)
+
+    # ---- Streams ----
+    def register_stream(self, frame_bytes: int = 640 * 480 * 3) -> int:
+        """Asigna un stream al worker con menos streams; retorna su id."""
+        self.start()
+        with self._lock:
+            load = [0] * self.num_workers
+            for slot in self._streams.values():
+                load[slot.worker] += 1
+            worker = load.index(min(load))
+            stream_id = next(self._stream_ids)
+            slot = _StreamSlot(stream_id, worker, frame_bytes)
+            self._streams[stream_id] = slot
+        self._requests[worker].put(("open", stream_id, slot.frame_block.name, slot.landmarks_block.name))
+        return stream_id
+
+    def unregister_stream(self, stream_id: int):
+        with self._lock:
+            slot = self._streams.pop(stream_id, None)
+        if slot is None:
+            return
+        if self._running:
+            self._requests[slot.worker].put(("close", stream_id))
+        slot.release()
+
+    def _ensure_capacity(self, slot: _StreamSlot, nbytes: int, requests) -> _StreamSlot:
+        if slot.frame_block.size >= nbytes:
+            return slot
+        # Frame más grande que el bloque: se reemplaza (el worker conserva su detector)
+        grown = _StreamSlot(slot.stream_id, slot.worker, nbytes)
+        with self._lock:
+            self._streams[slot.stream_id] = grown
+        requests.put(("open", slot.stream_id, grown.frame_block.name, grown.landmarks_block.name))
+        slot.release()
+        return grown
+
+    # ---- Detección ----
+    def detect(self, stream_id: int, frame: np.ndarray) -> Tuple[Optional[np.ndarray], int]:
+        if frame is None:
+            return None, 0
+        with self._lock:
+            # El stream pudo darse de baja (remove_stream, stop al salir) con el pipeline a mitad de frame
+            slot = self._streams.get(stream_id)
+            if slot is None or not self._running:
+                return None, 0
+            requests = self._requests[slot.worker]
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        slot = self._ensure_capacity(slot, frame.nbytes, requests)
+        np.copyto(np.ndarray(frame.shape, dtype=np.uint8, buffer=slot.frame_block.buf), frame)
+
+        request_id = next(self._request_ids)
+        future: Future = Future()
+        with self._lock:
+            self._futures[request_id] = future
+        requests.put(("detect", request_id, stream_id, frame.shape))
+        try:
+            num_hands = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._futures.pop(request_id, None)
+            self.timeouts += 1
+            logger.warning(f"Detección de manos sin respuesta del worker {slot.worker} (stream {stream_id}).")
+            return slot.landmarks, 0
+        except RuntimeError as e:
+            self.errors += 1
+            logger.error(f"Error en el worker de detección: {e}")
+            return slot.landmarks, 0
+        self.detections += 1
+        # Vista sobre la memoria compartida: válida hasta la siguiente detección del stream
+        return slot.landmarks, num_hands
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            per_worker = [0] * self.num_workers
+            for slot in self._streams.values():
+                per_worker[slot.worker] += 1
+        return {
+            "workers": self.num_workers,
+            "alive": sum(p.is_alive() for p in self._processes),
+            "streams_per_worker": per_worker,
+            "detections": self.detections,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
+
+
+class PooledHandDetector:
+    """Cliente de un stream: misma firma que `CameraManager.detect_hands_array`."""
+
+    def __init__(self, pool: DetectionPool, frame_bytes: int = 640 * 480 * 3):
+        self.pool = pool
+        self.stream_id = pool.register_stream(frame_bytes)
+
+    def detect(self, frame: np.ndarray) -> Tuple[Optional[np.ndarray], int]:
+        return self.pool.detect(self.stream_id, frame)
+
+    def close(self):
+        self.pool.unregister_stream(self.stream_id)
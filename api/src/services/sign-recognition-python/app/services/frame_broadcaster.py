@@ -0,0 +1,180 @@
+# app/services/frame_broadcaster.py
+import asyncio
+import inspect
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ClientSubscription:
+    """
+    Cola acotada de un cliente. Los frames son descartables: si hay más de
+    `max_size` en cola se descarta el más antiguo. Los eventos (señas
+    confirmadas) nunca se descartan por frames, solo por su propio límite.
+    El fin del stream es una marca aparte (`close`): no ocupa lugar en la
+    cola ni desplaza nada, y `get` retorna None al vaciarla.
+    """
+
+    def __init__(self, max_size: int = 2, max_events: int = 256):
+        self.max_size = max_size
+        self.max_events = max_events
+        self.dropped = 0
+        self.events_dropped = 0
+        self.closed = False
+        self._items: Deque[Tuple[Any, bool]] = deque()
+        self._frames = 0
+        self._ready = asyncio.Event()
+
+    def push(self, item: Any, droppable: bool = True):
+        if droppable:
+            if self._frames >= self.max_size:
+                self._remove_oldest(droppable=True)
+            self._frames += 1
+        elif len(self._items) - self._frames >= self.max_events:
+            self._remove_oldest(droppable=False)
+        self._items.append((item, droppable))
+        self._ready.set()
+
+    def _remove_oldest(self, droppable: bool):
+        for i, (_, is_droppable) in enumerate(self._items):
+            if is_droppable == droppable:
+                del self._items[i]
+                if droppable:
+                    self._frames -= 1
+                    self.dropped += 1
+                else:
+                    self.events_dropped += 1
+                return
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    async def get(self) -> Any:
+        while not self._items:
+            if self.closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        item, droppable = self._items.popleft()
+        if droppable:
+            self._frames -= 1
+        return item
+
+
+class FrameBroadcaster:
+    """
+    Ejecuta el pipeline una sola vez por frame y reparte el resultado a
+    todos los clientes suscritos (fan-out). `process_frame` es una corrutina
+    que retorna (frame, predicción, confianza) o None.
+    """
+
+    def __init__(
+        self,
+        process_frame: Callable[[], Awaitable[Optional[tuple]]],
+        build_message: Callable[[tuple], Any],  # puede ser síncrona o corrutina
+        queue_size: int = 2,
+        frame_interval: float = 0.03,
+        idle_sleep: float = 0.05,
+    ):
+        self.process_frame = process_frame
+        self.build_message = build_message
+        self.queue_size = queue_size
+        self.frame_interval = frame_interval
+        self.idle_sleep = idle_sleep
+        self.subscribers: Set[ClientSubscription] = set()
+        self.frames_published = 0
+        self.keep_alive = False
+        self._has_subscribers = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    # ---- Suscripciones ----
+    def subscribe(self) -> ClientSubscription:
+        """Registra un cliente y retorna su cola."""
+        subscription = ClientSubscription(self.queue_size)
+        self.subscribers.add(subscription)
+        self._has_subscribers.set()
+        return subscription
+
+    def unsubscribe(self, subscription: ClientSubscription):
+        """Elimina un cliente; si no quedan, el productor queda en espera."""
+        self.subscribers.discard(subscription)
+        if not self.subscribers and not self.keep_alive:
+            self._has_subscribers.clear()
+
+    def set_keep_alive(self, keep_alive: bool):
+        """Mantiene el pipeline corriendo sin clientes (p. ej. con una sesión activa que persiste señas)."""
+        self.keep_alive = keep_alive
+        if keep_alive or self.subscribers:
+            self._has_subscribers.set()
+        else:
+            self._has_subscribers.clear()
+
+    def publish(self, message: Any):
+        """Entrega el frame a cada cliente sin bloquear al productor."""
+        for subscription in list(self.subscribers):
+            subscription.push(message)
+        self.frames_published += 1
+
+    def publish_event(self, message: Any):
+        """Entrega un evento que no debe perderse aunque el cliente vaya atrasado."""
+        for subscription in list(self.subscribers):
+            subscription.push(message, droppable=False)
+
+    def close_subscribers(self):
+        """Avisa a los clientes que el stream terminó: reciben `None` después de lo que tengan en cola."""
+        for subscription in list(self.subscribers):
+            subscription.close()
+
+    # ---- Productor ----
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        logger.info("Productor de frames iniciado.")
+        while True:
+            # Sin clientes (ni sesión activa) no se procesa nada
+            await self._has_subscribers.wait()
+            try:
+                result = await self.process_frame()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error procesando frame: {e}")
+                result = None
+
+            if result is None:
+                await asyncio.sleep(self.idle_sleep)
+                continue
+
+            try:
+                message = self.build_message(result)
+                if inspect.isawaitable(message):
+                    message = await message
+                self.publish(message)
+            except Exception as e:
+                logger.error(f"Error construyendo mensaje de video: {e}")
+            await asyncio.sleep(self.frame_interval)
+
+    def get_stats(self) -> dict:
+        return {
+            "clients": len(self.subscribers),
+            "frames_published": self.frames_published,
+            "dropped": sum(s.dropped for s in self.subscribers),
+            "events_dropped": sum(s.events_dropped for s in self.subscribers),
+        }
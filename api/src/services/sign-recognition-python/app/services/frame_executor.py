@@ -0,0 +1,266 @@
+# app/services/frame_executor.py
+import asyncio
+import atexit
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("thread", "process")
+
+# Pipeline propio de cada proceso worker (solo backend "process")
+_worker_pipeline = None
+
+# Clasificadores y servidores de lotes compartidos por todos los streams del proceso
+_shared_lock = threading.Lock()
+_shared_classifiers: Dict[tuple, Any] = {}
+_shared_servers: Dict[tuple, Any] = {}
+_shared_detection_pools: Dict[tuple, Any] = {}
+_shared_registries: Dict[tuple, Any] = {}
+
+
+def get_shared_classifier(
+    model_path: str,
+    vocab_path: str,
+    scaler_path: str,
+    backend: str = "keras",
+    num_threads: Optional[int] = None,
+    fold_scaler: bool = True,
+):
+    """Carga el modelo una sola vez por proceso."""
+    from app.models.sign_classifier import SignClassifier
+
+    key = (model_path, vocab_path, scaler_path, backend, fold_scaler)
+    with _shared_lock:
+        if key not in _shared_classifiers:
+            _shared_classifiers[key] = SignClassifier(
+                model_path=model_path,
+                vocab_path=vocab_path,
+                scaler_path=scaler_path,
+                backend=backend,
+                num_threads=num_threads,
+                fold_scaler=fold_scaler,
+            )
+        return _shared_classifiers[key]
+
+
+def get_shared_model_registry(
+    model_path: str,
+    vocab_path: str,
+    scaler_path: str,
+    backend: str = "keras",
+    num_threads: Optional[int] = None,
+    fold_scaler: bool = True,
+    models_root: str = "trained_models",
+    warmup_batch_sizes: tuple = (1,),
+):
+    """Registro de versiones del proceso; arranca con el modelo configurado como activo."""
+    from app.models.model_registry import ModelBundle, ModelRegistry
+
+    classifier = get_shared_classifier(model_path, vocab_path, scaler_path, backend, num_threads, fold_scaler)
+    key = (id(classifier), models_root)
+    with _shared_lock:
+        if key not in _shared_registries:
+            paths = {"model_path": model_path, "scaler_path": scaler_path, "vocab_path": vocab_path}
+            version = Path(model_path).parent.name or "inicial"
+            _shared_registries[key] = ModelRegistry(
+                ModelBundle(version, classifier, paths, backend),
+                models_root=models_root,
+                num_threads=num_threads,
+                fold_scaler=fold_scaler,
+                warmup_batch_sizes=warmup_batch_sizes,
+            )
+        return _shared_registries[key]
+
+
+def get_shared_inference_server(classifier, max_batch_size: int, max_wait_ms: float, model_registry=None):
+    """Un único BatchInferenceServer por clasificador dentro del proceso."""
+    from app.services.batch_inference_server import BatchInferenceServer
+
+    key = (id(classifier), max_batch_size, max_wait_ms)
+    with _shared_lock:
+        if key not in _shared_servers:
+            server = BatchInferenceServer(
+                classifier, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms, model_registry=model_registry
+            )
+            server.start()
+            _shared_servers[key] = server
+        return _shared_servers[key]
+
+
+def get_shared_detection_pool(num_workers: int, camera_options: Optional[Dict[str, Any]] = None):
+    """Un único pool de procesos MediaPipe por proceso; los streams se reparten entre sus workers."""
+    from app.services.detection_pool import DetectionPool
+
+    key = (num_workers, tuple(sorted((camera_options or {}).items())))
+    with _shared_lock:
+        if key not in _shared_detection_pools:
+            pool = DetectionPool(num_workers, camera_options=camera_options)
+            pool.start()
+            atexit.register(pool.stop)
+            _shared_detection_pools[key] = pool
+        return _shared_detection_pools[key]
+
+
+def create_video_processor(
+    model_path: str,
+    vocab_path: str,
+    scaler_path: str,
+    model_backend: str = "keras",
+    num_threads: Optional[int] = None,
+    fold_scaler: bool = True,
+    camera_options: Optional[Dict[str, Any]] = None,
+    inference_stride: int = 1,
+    motion_threshold: Optional[float] = None,
+    batch_inference: bool = False,
+    batch_max_size: int = 16,
+    batch_max_wait_ms: float = 8.0,
+    decoder_options: Optional[Dict[str, Any]] = None,
+    draw_overlay: bool = True,
+    export_landmarks: bool = False,
+    detection_workers: int = 0,
+    models_root: str = "trained_models",
+):
+    """Construye cámara + clasificador + VideoProcessor (se ejecuta dentro del worker)."""
+    from app.services.camera_manager import CameraManager
+    from app.services.detection_pool import PooledHandDetector
+    from app.services.sign_decoder import SignDecoder
+    from app.services.video_processor import VideoProcessor
+
+    # El registro arranca con el modelo configurado; promover otra versión no reinicia el pipeline
+    model_registry = get_shared_model_registry(
+        model_path, vocab_path, scaler_path, model_backend, num_threads, fold_scaler,
+        models_root=models_root,
+        warmup_batch_sizes=(1, batch_max_size) if batch_inference else (1,),
+    )
+    classifier = model_registry.active.classifier
+    inference_server = (
+        get_shared_inference_server(classifier, batch_max_size, batch_max_wait_ms, model_registry)
+        if batch_inference else None
+    )
+    remote_detector = None
+    if detection_workers > 0:
+        # MediaPipe en el pool de procesos; el stream queda fijado a un worker.
+        # El pool se comparte entre streams aunque cada uno tenga otra fuente de cámara.
+        from app.config import CAMERA_SOURCE_OPTIONS
+
+        detection_options = {k: v for k, v in (camera_options or {}).items() if k not in CAMERA_SOURCE_OPTIONS}
+        pool = get_shared_detection_pool(detection_workers, detection_options)
+        remote_detector = PooledHandDetector(pool)
+    return VideoProcessor(
+        CameraManager(**(camera_options or {}), remote_detector=remote_detector),
+        classifier,
+        inference_stride=inference_stride,
+        motion_threshold=motion_threshold,
+        inference_server=inference_server,
+        sign_decoder=SignDecoder(**(decoder_options or {})),
+        draw_overlay=draw_overlay,
+        export_landmarks=export_landmarks,
+        model_registry=model_registry,
+    )
+
+
+def _snapshot(pipeline) -> Dict[str, Any]:
+    """Estado liviano que acompaña cada frame de vuelta al event loop."""
+    return {
+        "camera_status": pipeline.get_camera_status(),
+        "fps": pipeline.performance.get_fps(),
+        "events": [event.to_dict() for event in pipeline.pop_committed_events()],
+        "landmarks": pipeline.get_landmarks_data(),
+    }
+
+
+def _invoke(pipeline, method: str, args: tuple, kwargs: dict):
+    if method == "process_next_frame":
+        return pipeline.process_next_frame(), _snapshot(pipeline)
+    return getattr(pipeline, method)(*args, **kwargs)
+
+
+def _init_process_worker(factory: Callable[[], Any]):
+    global _worker_pipeline
+    _worker_pipeline = factory()
+
+
+def _process_worker_call(method: str, args: tuple, kwargs: dict):
+    return _invoke(_worker_pipeline, method, args, kwargs)
+
+
+class FrameExecutor:
+    """
+    Ejecuta captura + inferencia fuera del event loop de asyncio.
+    Todas las llamadas pasan por un único worker, así el pipeline nunca
+    se usa desde dos hilos a la vez.
+    """
+
+    def __init__(self, factory: Callable[[], Any], backend: str = "thread"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend de ejecución no soportado: {backend}")
+        self.factory = factory
+        self.backend = backend
+        self.camera_status: Dict[str, Any] = {"connected": False, "type": None, "esp32_url": None}
+        self.fps = 0.0
+        # Landmarks del último frame (solo si el pipeline los exporta)
+        self.landmarks: Optional[List] = None
+        self._events: List[Dict[str, Any]] = []
+        self._pipeline = None
+        self._executor: Optional[Executor] = None
+
+    def start(self):
+        if self._executor is not None:
+            return
+        if self.backend == "process":
+            # spawn evita heredar hilos/estado de TensorFlow del proceso padre
+            self._executor = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_process_worker,
+                initargs=(self.factory,),
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix="frame-worker",
+                initializer=self._init_thread_worker,
+            )
+        logger.info(f"Ejecutor de frames iniciado (backend={self.backend}).")
+
+    def _init_thread_worker(self):
+        self._pipeline = self.factory()
+
+    def _thread_call(self, method: str, args: tuple, kwargs: dict):
+        return _invoke(self._pipeline, method, args, kwargs)
+
+    async def call(self, method: str, *args, **kwargs):
+        """Ejecuta un método de VideoProcessor en el worker y espera el resultado sin bloquear el loop."""
+        self.start()
+        loop = asyncio.get_running_loop()
+        if self.backend == "process":
+            return await loop.run_in_executor(self._executor, _process_worker_call, method, args, kwargs)
+        return await loop.run_in_executor(self._executor, self._thread_call, method, args, kwargs)
+
+    async def process_next_frame(self):
+        """Procesa el siguiente frame en el worker; retorna (frame, predicción, confianza) o None."""
+        result, snapshot = await self.call("process_next_frame")
+        self.camera_status = snapshot["camera_status"]
+        self.fps = snapshot["fps"]
+        self.landmarks = snapshot["landmarks"]
+        self._events.extend(snapshot["events"])
+        return result
+
+    def pop_events(self) -> List[Dict[str, Any]]:
+        """Señas confirmadas (como dict) recibidas del worker desde la última llamada."""
+        events, self._events = self._events, []
+        return events
+
+    async def refresh_camera_status(self) -> Dict[str, Any]:
+        self.camera_status = await self.call("get_camera_status")
+        return self.camera_status
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,86 @@
+# app/services/frame_renderer.py
+"""
+Etapa de dibujo, separada de la detección: se ejecuta solo si algún
+consumidor quiere video anotado.
+
+Dibuja sobre el frame en su lugar (el frame capturado pertenece al
+pipeline), sin copias ni overlays de tamaño completo:
+- manos: líneas y puntos a partir del arreglo de landmarks (2, 21, 3)
+- banner: se oscurece solo la franja superior, sobre una vista del frame
+"""
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Conexiones de la mano (mismo grafo que mediapipe.solutions.hands.HAND_CONNECTIONS)
+HAND_CONNECTIONS: Tuple[Tuple[int, int], ...] = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+# Modos de overlay por cliente de /ws/video
+OVERLAY_MODES = ("server", "client", "none")
+
+
+def landmarks_to_list(landmarks: np.ndarray, num_hands: int, decimals: int = 4) -> List[List[List[float]]]:
+    """Landmarks como datos JSON (manos x 21 x xyz, normalizados al frame completo)."""
+    return np.round(landmarks[:num_hands], decimals).tolist()
+
+
+class FrameRenderer:
+    def __init__(
+        self,
+        banner_height: int = 40,
+        banner_alpha: float = 0.6,
+        line_color: Tuple[int, int, int] = (255, 255, 255),
+        point_color: Tuple[int, int, int] = (0, 0, 255),
+        text_color: Tuple[int, int, int] = (0, 255, 255),
+    ):
+        self.banner_height = banner_height
+        self.banner_alpha = banner_alpha
+        self.line_color = line_color
+        self.point_color = point_color
+        self.text_color = text_color
+        # Puntos en píxeles, reutilizado entre frames
+        self._points = np.zeros((2, 21, 2), dtype=np.int32)
+        self.frames_rendered = 0
+
+    def render(
+        self,
+        frame: np.ndarray,
+        text: str,
+        confidence: Optional[float] = None,
+        landmarks: Optional[np.ndarray] = None,
+        num_hands: int = 0,
+    ) -> np.ndarray:
+        """Dibuja manos y banner sobre `frame` (en su lugar) y lo retorna."""
+        if landmarks is not None and num_hands > 0:
+            self._draw_hands(frame, landmarks, num_hands)
+        self._draw_banner(frame, text, confidence)
+        self.frames_rendered += 1
+        return frame
+
+    def _draw_hands(self, frame: np.ndarray, landmarks: np.ndarray, num_hands: int):
+        height, width = frame.shape[:2]
+        points = self._points[:num_hands]
+        np.multiply(landmarks[:num_hands, :, 0], width, out=points[..., 0], casting="unsafe")
+        np.multiply(landmarks[:num_hands, :, 1], height, out=points[..., 1], casting="unsafe")
+        for hand in points:
+            for start, end in HAND_CONNECTIONS:
+                cv2.line(frame, tuple(hand[start].tolist()), tuple(hand[end].tolist()), self.line_color, 2)
+            for point in hand.tolist():
+                cv2.circle(frame, tuple(point), 3, self.point_color, -1)
+
+    def _draw_banner(self, frame: np.ndarray, text: str, confidence: Optional[float]):
+        # Oscurecer la franja equivale a mezclar con negro: banner *= (1 - alpha)
+        banner = frame[:self.banner_height]
+        cv2.convertScaleAbs(banner, dst=banner, alpha=1.0 - self.banner_alpha)
+
+        display_text = f"{text}"
+        if confidence is not None and confidence > 0:
+            display_text += f" ({confidence*100:.1f}%)"
+        cv2.putText(frame, display_text, (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.7, self.text_color, 2)
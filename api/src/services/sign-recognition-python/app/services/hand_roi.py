@@ -0,0 +1,47 @@
+# app/services/hand_roi.py
+"""
+Geometría del tracking por ROI de CameraManager, sin MediaPipe: caja de las
+manos, recorte expandido alrededor de ella y vuelta de los landmarks del
+recorte a coordenadas normalizadas del frame completo.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+
+Box = Tuple[float, float, float, float]
+
+
+def track_box(landmarks: np.ndarray) -> Box:
+    """Caja (x0, y0, x1, y1) normalizada que contiene los landmarks (manos, 21, 3)."""
+    xy = landmarks[..., :2].reshape(-1, 2)
+    lo, hi = xy.min(axis=0), xy.max(axis=0)
+    return float(lo[0]), float(lo[1]), float(hi[0]), float(hi[1])
+
+
+def roi_from_box(box: Box, frame_w: int, frame_h: int, margin: float = 0.25) -> Optional[Tuple[int, int, int, int]]:
+    """Recorte cuadrado (px) alrededor de `box` con `margin` por lado; None si queda demasiado chico."""
+    bx0, by0, bx1, by1 = box
+    side = max((bx1 - bx0) * frame_w, (by1 - by0) * frame_h)
+    pad = side * margin
+    cx, cy = (bx0 + bx1) * 0.5 * frame_w, (by0 + by1) * 0.5 * frame_h
+    half = side * 0.5 + pad
+    x0, x1 = int(max(0, cx - half)), int(min(frame_w, cx + half))
+    y0, y1 = int(max(0, cy - half)), int(min(frame_h, cy + half))
+    if x1 - x0 < 16 or y1 - y0 < 16:
+        return None
+    return x0, y0, x1, y1
+
+
+def roi_to_frame(landmarks: np.ndarray, roi: Box) -> np.ndarray:
+    """
+    Landmarks normalizados al recorte -> normalizados al frame completo, en su
+    lugar. `roi` = (x0, y0, ancho, alto) del recorte como fracción del frame;
+    z usa la misma escala que x, como en MediaPipe.
+    """
+    x0, y0, w, h = roi
+    landmarks[..., 0] *= w
+    landmarks[..., 0] += x0
+    landmarks[..., 1] *= h
+    landmarks[..., 1] += y0
+    landmarks[..., 2] *= w
+    return landmarks
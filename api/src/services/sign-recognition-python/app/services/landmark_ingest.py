@@ -0,0 +1,154 @@
+# app/services/landmark_ingest.py
+"""
+Reconocimiento a partir de landmarks enviados por el cliente (/ws/landmarks).
+
+Sin cámara, JPEG ni MediaPipe en el servidor: cada conexión tiene su buffer
+de secuencia y su decodificador, y la inferencia se agrupa con la de las
+demás conexiones en el BatchInferenceServer compartido. La parte por frame
+(normalización + buffer) corre en el event loop y cuesta microsegundos; la
+espera del lote se hace con `await`, sin ocupar hilos por conexión.
+"""
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.services.sign_decoder import SignDecoder, SignEvent
+from app.utils.landmark_io import MAX_HANDS, NUM_LANDMARKS
+
+if TYPE_CHECKING:
+    from app.models.model_registry import ModelRegistry
+    from app.services.batch_inference_server import BatchInferenceServer
+    from app.utils.performance_monitor import PerformanceMonitor
+
+logger = logging.getLogger(__name__)
+
+NO_HANDS = "NO_HANDS_DETECTED"
+LOADING = "LOADING_SEQUENCE"
+
+
+class LandmarkIngestor:
+    """Estado de una conexión: misma política de inferencia y decodificación que VideoProcessor."""
+
+    def __init__(
+        self,
+        model_registry: "ModelRegistry",
+        inference_server: "BatchInferenceServer",
+        inference_stride: int = 1,
+        motion_threshold: Optional[float] = None,
+        decoder_options: Optional[Dict[str, Any]] = None,
+        monitor: Optional["PerformanceMonitor"] = None,
+    ):
+        from app.services.video_processor import normalize_landmarks
+
+        self._normalize = normalize_landmarks
+        self.model_registry = model_registry
+        self._bundle = model_registry.active
+        self.classifier = self._bundle.classifier
+        self.inference_server = inference_server
+        inference_server.register_stream()
+        self.monitor = monitor
+
+        self.sequence_buffer = self.classifier.create_sequence_buffer()
+        self._features = np.zeros((MAX_HANDS, NUM_LANDMARKS, 3), dtype=np.float32)
+        self.decoder = SignDecoder(**(decoder_options or {}))
+
+        self.inference_stride = max(1, int(inference_stride))
+        self.motion_threshold = motion_threshold
+        self.frames_since_inference = 0
+        self._last_inferred_input = np.zeros(MAX_HANDS * NUM_LANDMARKS * 3, dtype=np.float32)
+        self._force_inference = True
+        self.current_prediction: Tuple[str, float] = ("", 0.0)
+
+        self.frames = 0
+        self.inferences = 0
+        self.inferences_skipped = 0
+        self.last_inference_time = 0.0
+
+    async def process(
+        self, landmarks: np.ndarray, num_hands: int, timestamp: Optional[float] = None
+    ) -> Tuple[str, float, bool, Optional[SignEvent]]:
+        """Un frame del cliente -> (predicción, confianza, si corrió el modelo, seña confirmada o None)."""
+        timestamp = timestamp or time.time()
+        self.frames += 1
+        if num_hands == 0:
+            # Sin manos no se toca la secuencia; al volver se fuerza una inferencia
+            self._force_inference = True
+            self.current_prediction = (NO_HANDS, 0.0)
+            return NO_HANDS, 0.0, False, self.decoder.update(NO_HANDS, 0.0, timestamp)
+
+        if not np.isfinite(landmarks).all():
+            raise ValueError("Landmarks con valores no finitos")
+        x_input = self._normalize(landmarks, num_hands, self._features)
+        self.sequence_buffer.append(x_input)
+        if not self.sequence_buffer.is_full():
+            return LOADING, 0.0, False, None
+
+        self._sync_model()
+        if not self._should_infer(x_input):
+            self.frames_since_inference += 1
+            self.inferences_skipped += 1
+            label, confidence = self.current_prediction
+            return label, confidence, False, None
+
+        # La vista del buffer sigue válida durante la espera: la conexión procesa un frame a la vez
+        sequence = self.sequence_buffer.window_view()
+        start = time.perf_counter()
+        try:
+            label, confidence = await asyncio.wrap_future(self.inference_server.submit(sequence, self.classifier))
+        except Exception as e:
+            logger.error(f"Error en inferencia de landmarks: {e}")
+            label, confidence = "ERROR_PREDICCION", 0.0
+        self.last_inference_time = time.perf_counter() - start
+        if self.monitor is not None:
+            self.monitor.record_stage("landmark_inference", self.last_inference_time)
+            self.monitor.increment("landmark_inferences")
+        shadow = self.model_registry.shadow
+        if shadow is not None:
+            shadow.offer(sequence, self.classifier, label, confidence, self.last_inference_time)
+
+        self.current_prediction = (label, confidence)
+        self._last_inferred_input[:] = x_input
+        self.frames_since_inference = 0
+        self._force_inference = False
+        self.inferences += 1
+        return label, confidence, True, self.decoder.update(label, confidence, timestamp)
+
+    def _should_infer(self, x_input: np.ndarray) -> bool:
+        if self._force_inference or self.frames_since_inference + 1 >= self.inference_stride:
+            return True
+        if self.motion_threshold is not None:
+            return float(np.abs(x_input - self._last_inferred_input).mean()) >= self.motion_threshold
+        return False
+
+    def _sync_model(self):
+        """Adopta la versión activa del registro (ver VideoProcessor._sync_model)."""
+        bundle = self.model_registry.active
+        if bundle is self._bundle:
+            return
+        raw = self.sequence_buffer.raw_frames()
+        self.classifier = bundle.classifier
+        self.sequence_buffer = self.classifier.create_sequence_buffer()
+        self.sequence_buffer.load_frames(raw)
+        self._bundle = bundle
+        self._force_inference = True
+
+    def reset(self):
+        self.sequence_buffer.clear()
+        self.decoder.reset()
+        self.current_prediction = ("", 0.0)
+        self._force_inference = True
+
+    def close(self):
+        self.inference_server.unregister_stream()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "model_version": self._bundle.version,
+            "frames": self.frames,
+            "inferences": self.inferences,
+            "inferences_skipped": self.inferences_skipped,
+            "last_inference_ms": round(self.last_inference_time * 1000, 2),
+        }
@@ -0,0 +1,66 @@
+# app/services/landmark_protocol.py
+"""
+Formato binario de /ws/landmarks: el cliente (navegador con MediaPipe Hands,
+dispositivo de borde) envía landmarks en vez de video.
+
+Cada frame = cabecera + manos x 21 x (x, y, z) float32, en las mismas
+coordenadas normalizadas que entrega MediaPipe (las de `multiHandLandmarks`).
+Un mensaje puede traer varios frames seguidos.
+
+Cabecera (little-endian, 20 bytes):
+    magic     4s       b"SLL1"
+    seq       uint32   número de frame del cliente
+    ts        float64  marca de tiempo de captura (segundos; 0 = usar la del servidor)
+    num_hands uint8    manos que siguen (0, 1 o 2)
+    (3 bytes de relleno: los floats quedan alineados a 4)
+"""
+import struct
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from app.utils.landmark_io import MAX_HANDS, NUM_LANDMARKS
+
+LANDMARK_MAGIC = b"SLL1"
+LANDMARK_HEADER = struct.Struct("<4sIdB3x")
+HAND_BYTES = NUM_LANDMARKS * 3 * 4
+
+
+def pack_landmark_frame(seq: int, timestamp: float, landmarks: np.ndarray) -> bytes:
+    """
+    Empaqueta un frame; útil para clientes Python y pruebas de carga.
+    `landmarks` puede ser (manos, 21, 3), una sola mano (21, 3) o plano;
+    un arreglo vacío es un frame sin manos. ValueError si la forma no cuadra.
+    """
+    landmarks = np.ascontiguousarray(landmarks, dtype="<f4")
+    if landmarks.size % (NUM_LANDMARKS * 3):
+        raise ValueError(f"Se esperaban manos de {NUM_LANDMARKS}x3 valores, se recibió {landmarks.shape}")
+    landmarks = landmarks.reshape(-1, NUM_LANDMARKS, 3)
+    num_hands = landmarks.shape[0]
+    if num_hands > MAX_HANDS:
+        raise ValueError(f"Se admiten hasta {MAX_HANDS} manos, se recibieron {num_hands}")
+    header = LANDMARK_HEADER.pack(LANDMARK_MAGIC, seq & 0xFFFFFFFF, timestamp, num_hands)
+    return header + landmarks.tobytes()
+
+
+def unpack_landmark_frames(data: bytes) -> Iterator[Tuple[int, float, int, np.ndarray]]:
+    """
+    Recorre los frames de un mensaje: (seq, ts, num_hands, landmarks (manos, 21, 3)).
+    Los landmarks son vistas sobre `data`, sin copias. ValueError si el mensaje está mal formado.
+    """
+    offset, size = 0, len(data)
+    while offset < size:
+        if size - offset < LANDMARK_HEADER.size:
+            raise ValueError("Frame de landmarks truncado (cabecera)")
+        magic, seq, timestamp, num_hands = LANDMARK_HEADER.unpack_from(data, offset)
+        if magic != LANDMARK_MAGIC:
+            raise ValueError("Frame de landmarks con magic inválido")
+        if num_hands > MAX_HANDS:
+            raise ValueError(f"Se admiten hasta {MAX_HANDS} manos, llegaron {num_hands}")
+        offset += LANDMARK_HEADER.size
+        end = offset + num_hands * HAND_BYTES
+        if end > size:
+            raise ValueError("Frame de landmarks truncado (datos)")
+        landmarks = np.frombuffer(data, dtype="<f4", count=num_hands * NUM_LANDMARKS * 3, offset=offset)
+        yield seq, timestamp, num_hands, landmarks.reshape(num_hands, NUM_LANDMARKS, 3)
+        offset = end
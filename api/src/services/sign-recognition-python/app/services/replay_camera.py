@@ -0,0 +1,150 @@
+# app/services/replay_camera.py
+"""
+Fuente de landmarks pre-extraídos que reemplaza a CameraManager dentro de
+VideoProcessor: reproduce secuencias grabadas (.npy/.npz, frames (T, 126)),
+sesiones grabadas (.lmk) o landmarks sintéticos, sin cámara ni MediaPipe.
+Sirve para medir el resto del pipeline (escalado, inferencia, decodificación, dibujo) en cualquier
+máquina.
+"""
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.utils.landmark_io import MAX_HANDS, NUM_FEATURES, NUM_LANDMARKS
+
+logger = logging.getLogger(__name__)
+
+
+def synthetic_landmarks(num_frames: int = 300, seed: int = 0) -> np.ndarray:
+    """
+    Frames (T, 126) con dos manos que se mueven suavemente (paseo aleatorio),
+    ya relativos a la muñeca como los produce VideoProcessor.
+    """
+    rng = np.random.default_rng(seed)
+    base = rng.normal(0.0, 0.05, size=(MAX_HANDS, NUM_LANDMARKS, 3)).astype(np.float32)
+    drift = np.cumsum(rng.normal(0.0, 0.002, size=(num_frames, MAX_HANDS, NUM_LANDMARKS, 3)), axis=0)
+    frames = (base + drift).astype(np.float32)
+    frames[:, :, 0, :] = 0.0  # la muñeca es el origen de cada mano
+    return frames.reshape(num_frames, NUM_FEATURES)
+
+
+def load_landmark_frames(paths: Union[str, Path, Iterable[Union[str, Path]]]) -> np.ndarray:
+    """Concatena frames (T, 126) grabados (.npy/.npz/.lmk); las secuencias (N, 30, 126) se aplanan en orden."""
+    if isinstance(paths, (str, Path)):
+        paths = [paths]
+    frames: List[np.ndarray] = []
+    for path in paths:
+        path = Path(path)
+        if path.suffix == ".npz":
+            with np.load(path) as data:
+                arrays = [data[key] for key in data.files]
+        elif path.suffix == ".lmk":
+            from app.utils.landmark_store import LandmarkSession
+            arrays = [LandmarkSession(path).landmarks]
+        else:
+            arrays = [np.load(path)]
+        for array in arrays:
+            frames.append(np.asarray(array, dtype=np.float32).reshape(-1, NUM_FEATURES))
+    if not frames:
+        return np.empty((0, NUM_FEATURES), dtype=np.float32)
+    return np.concatenate(frames, axis=0)
+
+
+class LandmarkReplayCamera:
+    """
+    Misma interfaz que usa VideoProcessor de CameraManager. `get_frame`
+    entrega siempre el mismo frame en negro (para dibujo y JPEG) y
+    `detect_hands_array` el siguiente frame de landmarks, en bucle.
+    """
+
+    # Sin detector: VideoProcessor lo consulta al cerrar
+    remote_detector = None
+
+    def __init__(
+        self,
+        frames: np.ndarray,
+        frame_size: Tuple[int, int] = (640, 480),
+        loop: bool = True,
+    ):
+        frames = np.asarray(frames, dtype=np.float32)
+        if frames.ndim != 2 or frames.shape[1] != NUM_FEATURES:
+            raise ValueError(f"Se esperaban frames (T, {NUM_FEATURES}), se recibió {frames.shape}")
+        self.frames = frames.reshape(-1, MAX_HANDS, NUM_LANDMARKS, 3)
+        # Manos presentes por frame: una mano ausente viene toda en cero
+        self.hands_per_frame = np.count_nonzero(np.any(self.frames != 0.0, axis=(2, 3)), axis=1)
+        self.loop = loop
+        width, height = frame_size
+        self.blank = np.zeros((height, width, 3), dtype=np.uint8)
+        self.landmarks = np.zeros((MAX_HANDS, NUM_LANDMARKS, 3), dtype=np.float32)
+        self.position = 0
+        self.frames_captured = 0
+        self.is_open = False
+
+    # ---- Interfaz de CameraManager ----
+    def initialize(self, auto_connect: bool = True) -> bool:
+        self.is_open = len(self.frames) > 0
+        return self.is_open
+
+    def warm_up(self, frame_size: Tuple[int, int] = (640, 480)) -> float:
+        # No hay grafo de MediaPipe que inicializar
+        return 0.0
+
+    def switch_camera(self, config: Dict[str, Any]) -> bool:
+        return False
+
+    def list_cameras(self) -> Dict[str, Any]:
+        return {"local": [], "esp32": None}
+
+    def get_frame(self) -> Optional[np.ndarray]:
+        if not self.is_open:
+            return None
+        if self.position >= len(self.frames):
+            if not self.loop:
+                return None
+            self.position = 0
+        # Frame compartido: el dibujo lo ensucia, así que se limpia antes de entregarlo
+        self.blank[:] = 0
+        return self.blank
+
+    def detect_hands_array(self, frame: np.ndarray) -> Tuple[Optional[np.ndarray], int]:
+        if frame is None:
+            return None, 0
+        index = self.position
+        self.position += 1
+        self.frames_captured += 1
+        num_hands = int(self.hands_per_frame[index])
+        self.landmarks[:] = self.frames[index]
+        if num_hands == 1 and not self.landmarks[0].any():
+            # La única mano grabada está en la segunda fila
+            self.landmarks[0], self.landmarks[1] = self.landmarks[1].copy(), 0.0
+        return self.landmarks, num_hands
+
+    def detect_hands(self, frame: np.ndarray):
+        landmarks, num_hands = self.detect_hands_array(frame)
+        if landmarks is None:
+            return None
+        return [[tuple(point) for point in landmarks[i].tolist()] for i in range(num_hands)]
+
+    def get_capture_stats(self) -> Dict[str, Any]:
+        return {
+            "grabber": False,
+            "frame_seq": self.frames_captured,
+            "frames_captured": self.frames_captured,
+            "frames_dropped": 0,
+            "capture_fps": 0.0,
+        }
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "connected": self.is_open,
+            "type": "replay",
+            "esp32_url": None,
+            "file_path": None,
+            **self.get_capture_stats(),
+        }
+
+    def close(self):
+        self.is_open = False
+        self.position = 0
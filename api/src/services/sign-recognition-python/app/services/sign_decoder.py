@@ -0,0 +1,143 @@
+# app/services/sign_decoder.py
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional, Tuple
+
+# Etiquetas que no son señas: liberan la seña activa en vez de votar
+NON_SIGN_LABELS = frozenset({"", None, "NO_HANDS_DETECTED", "LOADING_SEQUENCE", "ERROR_PREDICCION"})
+
+DECODER_MODES = ("majority", "ema")
+
+
+@dataclass
+class SignEvent:
+    """Seña confirmada ("emitida") por el decodificador temporal."""
+    label: str
+    confidence: float
+    start_time: float
+    commit_time: float
+    votes: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class SignDecoder:
+    """
+    Convierte la secuencia de predicciones por frame en eventos de seña:
+
+    1. Suavizado: voto mayoritario sobre las últimas N predicciones, o EMA
+       de la confianza por clase.
+    2. Histéresis: una seña candidata entra con `enter_threshold` y solo se
+       suelta cuando baja de `exit_threshold`.
+    3. Duración mínima: la candidata debe sostenerse `min_hold` segundos.
+
+    Una seña confirmada no se vuelve a emitir hasta que se libere (otra seña,
+    confianza baja o ausencia de manos sostenida), así se evita el parpadeo
+    entre clases vecinas y las escrituras repetidas. La ausencia de manos
+    libera la seña solo tras `release_frames` frames seguidos sin seña y al
+    menos `min_hold` segundos: un parpadeo del detector no la vuelve a emitir.
+    """
+
+    def __init__(
+        self,
+        mode: str = "majority",
+        window: int = 7,
+        ema_alpha: float = 0.3,
+        enter_threshold: float = 0.8,
+        exit_threshold: float = 0.6,
+        min_hold: float = 0.3,
+        release_frames: int = 3,
+    ):
+        if mode not in DECODER_MODES:
+            raise ValueError(f"Modo de decodificación no soportado: {mode}")
+        self.mode = mode
+        self.window = window
+        self.ema_alpha = ema_alpha
+        self.enter_threshold = enter_threshold
+        self.exit_threshold = min(exit_threshold, enter_threshold)
+        self.min_hold = min_hold
+        self.release_frames = max(1, int(release_frames))
+        self.events_committed = 0
+        self.reset()
+
+    def reset(self):
+        self._history = deque(maxlen=self.window)
+        self._ema: Dict[str, float] = {}
+        self._candidate: Optional[str] = None
+        self._candidate_since = 0.0
+        self._active: Optional[str] = None
+        self._non_sign_frames = 0
+        self._non_sign_since = 0.0
+
+    # ---- Suavizado ----
+    def _smooth_majority(self, label: str, confidence: float) -> Tuple[Optional[str], float, int]:
+        self._history.append((label, confidence))
+        votes = Counter(l for l, _ in self._history)
+        winner, count = votes.most_common(1)[0]
+        # Se exige mayoría sobre la ventana completa, no solo sobre lo observado
+        if count * 2 <= self.window:
+            return None, 0.0, count
+        mean_conf = sum(c for l, c in self._history if l == winner) / count
+        return winner, mean_conf, count
+
+    def _smooth_ema(self, label: str, confidence: float) -> Tuple[Optional[str], float, int]:
+        alpha = self.ema_alpha
+        for key in list(self._ema):
+            self._ema[key] *= (1.0 - alpha)
+            if self._ema[key] < 1e-3 and key != label:
+                del self._ema[key]
+        self._ema[label] = self._ema.get(label, 0.0) + alpha * confidence
+        winner = max(self._ema, key=self._ema.get)
+        return winner, self._ema[winner], 1
+
+    # ---- API ----
+    def update(self, label: Optional[str], confidence: float, timestamp: Optional[float] = None) -> Optional[SignEvent]:
+        """Alimenta una predicción; retorna un SignEvent cuando se confirma una seña nueva."""
+        now = time.time() if timestamp is None else timestamp
+
+        if label in NON_SIGN_LABELS:
+            # Sin seña: la candidata se pierde, pero la activa solo se libera si la ausencia se sostiene
+            self._candidate = None
+            if self._non_sign_frames == 0:
+                self._non_sign_since = now
+            self._non_sign_frames += 1
+            if self._non_sign_frames >= self.release_frames and now - self._non_sign_since >= self.min_hold:
+                self.reset()
+            return None
+        self._non_sign_frames = 0
+
+        if self.mode == "ema":
+            winner, score, votes = self._smooth_ema(label, confidence)
+        else:
+            winner, score, votes = self._smooth_majority(label, confidence)
+
+        # Histéresis sobre la seña activa
+        if self._active is not None and (winner != self._active or score < self.exit_threshold):
+            self._active = None
+
+        # Histéresis sobre la candidata: se mantiene mientras no baje de exit_threshold
+        if self._candidate is not None and (winner != self._candidate or score < self.exit_threshold):
+            self._candidate = None
+
+        if self._candidate is None:
+            if winner is None or winner == self._active or score < self.enter_threshold:
+                return None
+            self._candidate = winner
+            self._candidate_since = now
+
+        if now - self._candidate_since < self.min_hold:
+            return None
+
+        # Confirmar la seña
+        self._active = winner
+        self._candidate = None
+        self.events_committed += 1
+        return SignEvent(
+            label=winner,
+            confidence=round(float(score), 4),
+            start_time=self._candidate_since,
+            commit_time=now,
+            votes=votes,
+        )
@@ -0,0 +1,185 @@
+# app/services/stream_registry.py
+"""
+Registro de streams de video con nombre (p. ej. una ESP32-CAM por mesa de
+un aula), todos en el mismo proceso.
+
+Cada stream tiene su propio FrameExecutor (cámara, tracking de manos,
+buffer de secuencia y decodificador) y su propio FrameBroadcaster; el
+modelo, el servidor de lotes y el pool de MediaPipe se comparten entre
+streams (ver `frame_executor.get_shared_*`).
+"""
+import asyncio
+import logging
+import re
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from app.services.frame_broadcaster import FrameBroadcaster
+from app.services.frame_executor import FrameExecutor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STREAM = "default"
+STREAM_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class VideoStream:
+    """Un stream: su pipeline en un worker propio, su productor de frames y el overlay de sus clientes."""
+
+    def __init__(
+        self,
+        stream_id: str,
+        executor: FrameExecutor,
+        build_message: Callable[["VideoStream", tuple], Any],
+        on_event: Callable[["VideoStream", Dict[str, Any]], None],
+        source: Optional[Dict[str, Any]] = None,
+        queue_size: int = 2,
+    ):
+        self.stream_id = stream_id
+        self.executor = executor
+        # None = fuente por defecto (se prueban ESP32 y cámara local)
+        self.source = source
+        self.on_event = on_event
+        # Overlay pedido por cada cliente de video ("server", "client" o "none")
+        self.overlays: Dict[Any, str] = {}
+        self.render_options = {"draw_overlay": False, "export_landmarks": False}
+        self.broadcaster = FrameBroadcaster(
+            self._process_frame,
+            lambda result: build_message(self, result),
+            queue_size=queue_size,
+            frame_interval=0.0,
+            idle_sleep=0.005,  # con grabber, None solo significa "aún no hay frame nuevo"
+        )
+
+    async def _process_frame(self):
+        """Procesa un frame en el worker y despacha las señas confirmadas en él."""
+        result = await self.executor.process_next_frame()
+        for event in self.executor.pop_events():
+            self.on_event(self, event)
+        return result
+
+    # ---- Clientes ----
+    async def set_overlay(self, client: Any, overlay: str):
+        self.overlays[client] = overlay
+        await self.update_render_options()
+
+    async def remove_client(self, client: Any):
+        self.overlays.pop(client, None)
+        await self.update_render_options()
+
+    async def update_render_options(self):
+        """
+        El pipeline dibuja solo si algún cliente quiere frames anotados y exporta
+        landmarks solo si alguno los dibuja por su cuenta. Con clientes mixtos,
+        los frames salen anotados para todos.
+        """
+        wanted = {
+            "draw_overlay": "server" in self.overlays.values(),
+            "export_landmarks": "client" in self.overlays.values(),
+        }
+        if wanted == self.render_options:
+            return
+        self.render_options.update(wanted)
+        try:
+            await self.executor.call("set_render_options", wanted["draw_overlay"], wanted["export_landmarks"])
+        except Exception as e:
+            logger.error(f"Error actualizando opciones de dibujo del stream {self.stream_id}: {e}")
+
+    # ---- Ciclo de vida ----
+    def start(self):
+        self.executor.start()
+        self.broadcaster.start()
+
+    async def connect(self) -> bool:
+        """Abre la cámara del stream; retorna si quedó conectada."""
+        await self.executor.call("initialize_camera", True)
+        return bool((await self.executor.refresh_camera_status()).get("connected"))
+
+    async def stop(self):
+        await self.broadcaster.stop()
+        self.broadcaster.close_subscribers()
+        try:
+            await self.executor.call("close")
+        except Exception as e:
+            logger.error(f"Error cerrando el pipeline del stream {self.stream_id}: {e}")
+        self.executor.shutdown()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "camera_status": self.executor.camera_status,
+            "fps": self.executor.fps,
+            "render_options": self.render_options,
+            "video_broadcast": self.broadcaster.get_stats(),
+        }
+
+
+class StreamRegistry:
+    """
+    Streams por id. `create_stream(stream_id, source)` construye el
+    VideoStream (lo define main con la configuración del servicio).
+    """
+
+    def __init__(
+        self,
+        create_stream: Callable[[str, Optional[Dict[str, Any]]], VideoStream],
+        max_streams: int = 16,
+    ):
+        self.create_stream = create_stream
+        self.max_streams = max(1, max_streams)
+        self.streams: Dict[str, VideoStream] = {}
+        self.keep_alive = False
+        self._running = False
+
+    def __iter__(self) -> Iterator[VideoStream]:
+        return iter(list(self.streams.values()))
+
+    def __len__(self) -> int:
+        return len(self.streams)
+
+    def get(self, stream_id: str) -> Optional[VideoStream]:
+        return self.streams.get(stream_id)
+
+    def add(self, stream_id: str, source: Optional[Dict[str, Any]] = None) -> VideoStream:
+        """Registra un stream (y lo arranca si el registro ya está corriendo); la cámara se abre con `connect`."""
+        if not STREAM_ID_PATTERN.match(stream_id or ""):
+            raise ValueError(f"Id de stream inválido: {stream_id!r}")
+        if stream_id in self.streams:
+            raise ValueError(f"El stream {stream_id} ya existe")
+        if len(self.streams) >= self.max_streams:
+            raise ValueError(f"Se alcanzó el máximo de streams ({self.max_streams})")
+        stream = self.create_stream(stream_id, source)
+        stream.broadcaster.set_keep_alive(self.keep_alive)
+        self.streams[stream_id] = stream
+        if self._running:
+            stream.start()
+        logger.info(f"Stream {stream_id} registrado (fuente={source or 'por defecto'}).")
+        return stream
+
+    async def remove(self, stream_id: str) -> bool:
+        """Detiene el stream y desconecta a sus clientes; el stream por defecto no se puede quitar."""
+        if stream_id == DEFAULT_STREAM:
+            raise ValueError("El stream por defecto no se puede quitar")
+        stream = self.streams.pop(stream_id, None)
+        if stream is None:
+            return False
+        await stream.stop()
+        logger.info(f"Stream {stream_id} eliminado.")
+        return True
+
+    def start(self):
+        self._running = True
+        for stream in self:
+            stream.start()
+
+    async def stop(self):
+        self._running = False
+        await asyncio.gather(*(stream.stop() for stream in self), return_exceptions=True)
+
+    def set_keep_alive(self, keep_alive: bool):
+        """Mantiene todos los pipelines corriendo sin clientes (p. ej. con una sesión activa)."""
+        self.keep_alive = keep_alive
+        for stream in self:
+            stream.broadcaster.set_keep_alive(keep_alive)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {stream.stream_id: stream.get_stats() for stream in self}
@@ -0,0 +1,188 @@
+# app/services/video_file_recognizer.py
+"""
+Reconocimiento offline de videos grabados (subidos o en disco).
+
+Lee el video frame a frame (sin ritmo de tiempo real), detecta manos con
+MediaPipe, acumula las ventanas de 30 frames en lotes grandes para el
+modelo y pasa las predicciones, en orden, por el mismo SignDecoder del
+modo en vivo. Los tiempos de las señas son segundos dentro del video.
+
+La memoria es fija sin importar la duración: un frame decodificado, el
+buffer circular de la secuencia, el lote (B, 30, 126) y una lista acotada
+de pasos pendientes.
+"""
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.models.sign_classifier import SignClassifier, SEQUENCE_LENGTH, NUM_FEATURES
+from app.services.sign_decoder import SignDecoder
+
+logger = logging.getLogger(__name__)
+
+NO_HANDS = "NO_HANDS_DETECTED"
+STREAM_FORMATS = ("ndjson", "sse")
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+
+def format_stream_message(message: Dict[str, Any], fmt: str = "ndjson") -> str:
+    """Una línea NDJSON, o un evento SSE con el tipo de mensaje como `event`."""
+    data = json.dumps(message)
+    if fmt == "sse":
+        return f"event: {message.get('type', 'message')}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+class VideoFileRecognizer:
+    """
+    Un reconocedor por trabajo (tiene su propio grafo de MediaPipe y su
+    decodificador); el clasificador se puede compartir entre trabajos.
+    """
+
+    def __init__(
+        self,
+        classifier: SignClassifier,
+        camera_options: Optional[Dict[str, Any]] = None,
+        decoder_options: Optional[Dict[str, Any]] = None,
+        batch_size: int = 64,
+        inference_stride: int = 1,
+        frame_step: int = 1,
+        progress_interval: float = 1.0,
+    ):
+        # MediaPipe se importa recién al crear un trabajo (no al importar el módulo en main)
+        from app.services.camera_manager import CameraManager
+        from app.services.video_processor import normalize_landmarks
+
+        self.classifier = classifier
+        self._normalize = normalize_landmarks
+        options = dict(camera_options or {})
+        options.pop("source_file", None)
+        options["use_grabber"] = False
+        self.camera = CameraManager(**options)
+        self.decoder = SignDecoder(**(decoder_options or {}))
+        self.batch_size = max(1, int(batch_size))
+        self.inference_stride = max(1, int(inference_stride))
+        # Procesar 1 de cada N frames (los demás solo se saltan con grab(), sin decodificar)
+        self.frame_step = max(1, int(frame_step))
+        self.progress_interval = progress_interval
+
+        self._sequence = classifier.create_sequence_buffer()
+        self._features = np.zeros((2, 21, 3), dtype=np.float32)
+        self._batch = np.zeros((self.batch_size, SEQUENCE_LENGTH, NUM_FEATURES), dtype=np.float32)
+        self._batch_count = 0
+        # Pasos en orden temporal: (segundo del video, índice en el lote o None = sin manos)
+        self._pending: List[Tuple[float, Optional[int]]] = []
+        self.stop_event = threading.Event()
+
+        self.frames_read = 0
+        self.frames_processed = 0
+        self.windows_classified = 0
+        self.batches_run = 0
+        self.signs_committed = 0
+
+    def stop(self):
+        """Cancela el trabajo (p. ej. el cliente se desconectó)."""
+        self.stop_event.set()
+
+    def recognize(self, path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Procesa el video y va entregando mensajes:
+        - {"type": "started", ...} con FPS y total de frames
+        - {"type": "sign_committed", ...} por cada seña confirmada
+        - {"type": "progress", ...} cada `progress_interval` segundos
+        - {"type": "done", ...} con el resumen (o "cancelled")
+        """
+        capture = cv2.VideoCapture(str(path))
+        if not capture.isOpened():
+            raise ValueError(f"No se pudo abrir el video: {path}")
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        total_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        started = time.perf_counter()
+        last_progress = started
+        yield {"type": "started", "fps": fps, "total_frames": total_frames, "batch_size": self.batch_size}
+
+        try:
+            frame_index = -1
+            while not self.stop_event.is_set():
+                # Saltar frames sin decodificarlos
+                end_of_video = False
+                for _ in range(self.frame_step - 1):
+                    if not capture.grab():
+                        end_of_video = True
+                        break
+                    frame_index += 1
+                if end_of_video:
+                    break
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                frame_index += 1
+                self.frames_read = frame_index + 1
+
+                yield from self._process_frame(frame, frame_index / fps)
+
+                now = time.perf_counter()
+                if now - last_progress >= self.progress_interval:
+                    last_progress = now
+                    yield self._progress(frame_index / fps, total_frames, now - started)
+
+            yield from self._flush()
+            elapsed = time.perf_counter() - started
+            summary = self._progress(self.frames_read / fps, total_frames, elapsed)
+            summary["type"] = "cancelled" if self.stop_event.is_set() else "done"
+            summary["signs_committed"] = self.signs_committed
+            summary["batches_run"] = self.batches_run
+            yield summary
+        finally:
+            capture.release()
+            self.camera.close()
+
+    # ---- Internos ----
+    def _process_frame(self, frame: np.ndarray, timestamp: float) -> Iterator[Dict[str, Any]]:
+        self.frames_processed += 1
+        landmarks, num_hands = self.camera.detect_hands_array(frame)
+        if landmarks is None or num_hands == 0:
+            # Igual que en vivo: sin manos no se toca la secuencia y el decodificador suelta la seña
+            if not self._pending or self._pending[-1][1] is not None:
+                self._pending.append((timestamp, None))
+        else:
+            self._sequence.append(self._normalize(landmarks, num_hands, self._features))
+            if self._sequence.is_full() and self.frames_processed % self.inference_stride == 0:
+                self._batch[self._batch_count] = self._sequence.window_view()[0]
+                self._pending.append((timestamp, self._batch_count))
+                self._batch_count += 1
+
+        # Se clasifica al llenar el lote; los pasos pendientes también están acotados
+        if self._batch_count >= self.batch_size or len(self._pending) >= 4 * self.batch_size:
+            yield from self._flush()
+
+    def _flush(self) -> Iterator[Dict[str, Any]]:
+        predictions = []
+        if self._batch_count:
+            predictions = self.classifier.predict_batch(self._batch[:self._batch_count])
+            self.batches_run += 1
+            self.windows_classified += self._batch_count
+        for timestamp, slot in self._pending:
+            label, confidence = (NO_HANDS, 0.0) if slot is None else predictions[slot]
+            event = self.decoder.update(label, confidence, timestamp)
+            if event is not None:
+                self.signs_committed += 1
+                yield {"type": "sign_committed", **event.to_dict()}
+        self._pending.clear()
+        self._batch_count = 0
+
+    def _progress(self, video_time: float, total_frames: int, elapsed: float) -> Dict[str, Any]:
+        return {
+            "type": "progress",
+            "frames": self.frames_read,
+            "total_frames": total_frames,
+            "video_time": round(video_time, 3),
+            "windows_classified": self.windows_classified,
+            "elapsed": round(elapsed, 3),
+            "frames_per_s": round(self.frames_processed / elapsed, 2) if elapsed > 0 else 0.0,
+        }
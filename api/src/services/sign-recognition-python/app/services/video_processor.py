@@ -2,26 +2,89 @@ import time
 import logging
 import cv2
 import numpy as np
-from collections import deque
-from typing import Tuple, Dict, Any, Optional
+from typing import Tuple, Dict, Any, List, Optional, TYPE_CHECKING
 
 from app.services.camera_manager import CameraManager
+from app.services.frame_renderer import FrameRenderer, landmarks_to_list
 from app.models.sign_classifier import SignClassifier
+from app.services.sign_decoder import SignDecoder, SignEvent
 from app.utils.performance_monitor import PerformanceMonitor
 
+if TYPE_CHECKING:
+    from app.models.model_registry import ModelBundle, ModelRegistry
+    from app.services.batch_inference_server import BatchInferenceServer
+    from app.utils.landmark_store import LandmarkRecorder
+
 logger = logging.getLogger(__name__)
 
+
+def normalize_landmarks(landmarks: np.ndarray, num_hands: int, out: np.ndarray) -> np.ndarray:
+    """
+    Resta la muñeca de cada mano en `out` (2, 21, 3) (la fila de la muñeca
+    queda en cero; manos ausentes, en cero) y retorna la vista plana (126,).
+    """
+    np.subtract(landmarks[:num_hands], landmarks[:num_hands, :1], out=out[:num_hands])
+    out[num_hands:] = 0.0
+    return out.reshape(126)
+
+
 class VideoProcessor:
-    def __init__(self, camera_manager: CameraManager, classifier: SignClassifier, show_video: bool = False):
+    def __init__(
+        self,
+        camera_manager: CameraManager,
+        classifier: SignClassifier,
+        show_video: bool = False,
+        inference_stride: int = 1,
+        motion_threshold: Optional[float] = None,
+        inference_server: Optional["BatchInferenceServer"] = None,
+        sign_decoder: Optional[SignDecoder] = None,
+        draw_overlay: bool = True,
+        export_landmarks: bool = False,
+        model_registry: Optional["ModelRegistry"] = None,
+    ):
         self.camera_manager = camera_manager
         self.classifier = classifier
+        # Con registro de modelos, se sigue a la versión activa (cambio en caliente)
+        self.model_registry = model_registry
+        self._model_bundle: Optional["ModelBundle"] = model_registry.active if model_registry else None
+        # Con servidor de lotes, la inferencia se agrupa con la de otros streams
+        self.inference_server = inference_server
+        self._bind_predictor()
+        if inference_server is not None:
+            inference_server.register_stream()
         self.show_video = show_video
+        # Dibujo separado de la detección: solo si alguien mira el video anotado
+        self.renderer = FrameRenderer()
+        self.draw_overlay = draw_overlay
+        # Landmarks como datos, para que el navegador dibuje las manos
+        self.export_landmarks = export_landmarks
+        self._landmarks: Optional[np.ndarray] = None
+        self._num_hands = 0
         self.performance = PerformanceMonitor()
         self.current_prediction = ("", 0.0)
         self.last_inference_time = 0.0
-        self.sequence_buffer = deque(maxlen=30)  # Buffer para secuencias de frames
+        # Buffer circular con los últimos 30 frames ya escalados
+        self.sequence_buffer = classifier.create_sequence_buffer()
+        # Features del frame actual (2 manos x 21 puntos x xyz), reutilizadas en cada frame
+        self._features = np.zeros((2, 21, 3), dtype=np.float32)
         self.initialized = False
 
+        # Política de inferencia: cada K frames, o antes si los landmarks se movieron lo suficiente
+        self.inference_stride = max(1, int(inference_stride))
+        self.motion_threshold = motion_threshold
+        self.frames_since_inference = 0
+        self._last_inferred_input = np.zeros(126, dtype=np.float32)
+        self._force_inference = True
+        self.inferences_run = 0
+        self.inferences_skipped = 0
+
+        # Decodificador temporal: convierte predicciones por frame en señas confirmadas
+        self.sign_decoder = sign_decoder or SignDecoder()
+        self._committed_events: List[SignEvent] = []
+
+        # Grabación de landmarks de la sesión activa (ver app/utils/landmark_store.py)
+        self.recorder: Optional["LandmarkRecorder"] = None
+
     # ---- Cámara ----
     def initialize_camera(self, auto_connect: bool = True) -> bool:
         """Intenta conectar una cámara (ESP32 o local)."""
@@ -51,6 +114,87 @@ class VideoProcessor:
     def close(self):
         """Cierra cámara y limpia recursos."""
         self.camera_manager.close()
+        if self.camera_manager.remote_detector is not None:
+            self.camera_manager.remote_detector.close()
+            self.camera_manager.remote_detector = None
+        if self.inference_server is not None:
+            self.inference_server.unregister_stream()
+            self.inference_server = None
+            self._bind_predictor()
+        self.stop_recording()
+
+    # ---- Versiones del modelo ----
+    def _bind_predictor(self):
+        if self.inference_server is not None:
+            server, classifier = self.inference_server, self.classifier
+            self._predict_scaled = lambda seq: server.predict_scaled(seq, classifier)
+        else:
+            self._predict_scaled = self.classifier.predict_scaled
+
+    def _sync_model(self):
+        """Adopta la versión activa del registro; reescala la secuencia en curso si cambió el scaler."""
+        bundle = self.model_registry.active
+        if bundle is self._model_bundle:
+            return
+        raw = self.sequence_buffer.raw_frames()
+        self.classifier = bundle.classifier
+        self.sequence_buffer = self.classifier.create_sequence_buffer()
+        self.sequence_buffer.load_frames(raw)
+        self._model_bundle = bundle
+        self._bind_predictor()
+        self._force_inference = True
+        logger.info(f"Stream usando el modelo {bundle.version}.")
+
+    def load_model(self, version: str, backend: Optional[str] = None, promote: bool = False) -> Dict[str, Any]:
+        """Carga una versión en segundo plano (no bloquea el pipeline)."""
+        return self.model_registry.load(version, backend or self._model_bundle.backend, promote)
+
+    def promote_model(self, version: str) -> bool:
+        return self.model_registry.promote(version)
+
+    def unload_model(self, version: str) -> bool:
+        return self.model_registry.unload(version)
+
+    def start_shadow(self, version: str, sample_rate: float = 0.1) -> bool:
+        return self.model_registry.start_shadow(version, sample_rate)
+
+    def stop_shadow(self) -> Optional[Dict[str, Any]]:
+        return self.model_registry.stop_shadow()
+
+    def get_model_status(self) -> Dict[str, Any]:
+        return self.model_registry.get_status()
+
+    # ---- Grabación de landmarks ----
+    def start_recording(self, path: str, chunk_frames: int = 1024) -> Dict[str, Any]:
+        """Graba cada frame que entra al buffer de secuencia en `path` (.lmk); continúa el archivo si existe."""
+        from app.utils.landmark_store import LandmarkRecorder
+
+        self.stop_recording()
+        self.recorder = LandmarkRecorder(path, chunk_frames=chunk_frames)
+        logger.info(f"Grabando landmarks en {path} (desde el frame {self.recorder.frames}).")
+        return self.recorder.get_stats()
+
+    def stop_recording(self) -> Optional[Dict[str, Any]]:
+        if self.recorder is None:
+            return None
+        recorder, self.recorder = self.recorder, None
+        recorder.close()
+        logger.info(f"Grabación de landmarks cerrada: {recorder.frames} frames en {recorder.path}.")
+        return recorder.get_stats()
+
+    def warm_up(self) -> Dict[str, float]:
+        """Calienta modelo y detector antes del primer frame real; retorna los tiempos (ms)."""
+        batch_sizes = (1,)
+        if self.inference_server is not None:
+            batch_sizes = (1, self.inference_server.max_batch_size)
+        model_time = self.classifier.warm_up(batch_sizes)
+        detector_time = self.camera_manager.warm_up()
+        timings = {
+            "model_warmup_ms": round(model_time * 1000, 1),
+            "detector_warmup_ms": round(detector_time * 1000, 1),
+        }
+        logger.info(f"Warm-up completado: {timings}")
+        return timings
 
     # ---- Procesamiento ----
     def process_next_frame(self) -> Optional[Tuple[np.ndarray, str, float]]:
@@ -58,68 +202,82 @@ class VideoProcessor:
         Captura un frame, obtiene landmarks y realiza inferencia.
         Retorna: (frame procesado, predicción, confianza)
         """
+        performance = self.performance
+        capture_start = time.perf_counter()
         frame = self.camera_manager.get_frame()
         if frame is None:
             return None
+        performance.record_stage("capture", time.perf_counter() - capture_start)
 
-        self.performance.start_frame()
+        performance.start_frame()
+        performance.increment("frames")
 
-        # Detección de manos y landmarks
-        landmarks_vector = self.camera_manager.detect_hands(frame)
+        # Detección de manos y landmarks (2, 21, 3) en arreglo preasignado
+        with performance.stage("hand_detection"):
+            landmarks, num_hands = self.camera_manager.detect_hands_array(frame)
+        self._landmarks, self._num_hands = landmarks, num_hands
 
-        if landmarks_vector is None or len(landmarks_vector) == 0:
+        if landmarks is None or num_hands == 0:
+            performance.increment("no_hands_frames")
+            # Sin manos no se ejecuta el modelo; al volver se fuerza una inferencia
+            self._force_inference = True
             self.current_prediction = ("NO_HANDS_DETECTED", 0.0)
+            self._decode("NO_HANDS_DETECTED", 0.0)
             processed = self._annotate_frame(frame, "Sin manos detectadas")
             self.performance.end_frame()
             return processed, "NO_HANDS_DETECTED", 0.0
-        
-        flattened = []
-        
-        if len(landmarks_vector) == 1:
-            #Solo una mano
-            hand = np.array(landmarks_vector[0])
-            wrist = hand[0]
-            hand_norm = hand - wrist
-            hand_norm[0] = [0.0, 0.0, 0.0]
-            flattened.extend(hand_norm.flatten())
-            flattened.extend([0.0] * 63) #Rellenar para la segunda mano
-        elif len(landmarks_vector) == 2:
-            lh = np.array(landmarks_vector[0])
-            rh = np.array(landmarks_vector[1])
-            lh_wrist = lh[0]
-            rh_wrist = rh[0]
-            lh_norm = lh - lh_wrist
-            rh_norm = rh - rh_wrist
-            lh_norm[0] = [0.0, 0.0, 0.0]
-            rh_norm[0] = [0.0, 0.0, 0.0]
-            flattened.extend(lh_norm.flatten())
-            flattened.extend(rh_norm.flatten())
-        else:
-            # Sin manos detectadas
-            flattened = [0.0] * 126
-            
-        x_input = np.array(flattened[:126])
-        
-        #Guardar en buffer de secuencia
-        self.sequence_buffer.append(x_input)
-        if len(self.sequence_buffer) < 30:
+
+        with performance.stage("scaling"):
+            # Normalización relativa a la muñeca, en su lugar; manos ausentes quedan en cero
+            x_input = self._normalize_landmarks(landmarks, num_hands)
+            #Guardar en buffer de secuencia (se escala al insertar)
+            self.sequence_buffer.append(x_input)
+        if not self.sequence_buffer.is_full():
+            if self.recorder is not None:
+                self.recorder.append(x_input, time.time(), "LOADING_SEQUENCE", 0.0, num_hands)
             processed = self._annotate_frame(frame, "Cargando secuencia...")
             self.performance.end_frame()
             return processed, "LOADING_SEQUENCE", 0.0
         
-        sequence_array = np.array(self.sequence_buffer).reshape(1, 30, 126)
-        
-        # Clasificación de seña con modelo TensorFlow
-        start_inf = time.perf_counter()
-        try:
-            prediction, confidence = self.classifier.predict(sequence_array)
-        except Exception as e:
-            logger.error(f"Error en inferencia: {e}")
-            prediction, confidence = "ERROR_PREDICCION", 0.0
-        self.last_inference_time = time.perf_counter() - start_inf
-
-        # Actualiza predicción actual
-        self.current_prediction = (prediction, confidence)
+        if self.model_registry is not None:
+            self._sync_model()
+        inferred = self._should_infer(x_input)
+        if inferred:
+            # Vista contigua (1, 30, 126) sin copias
+            sequence_scaled = self.sequence_buffer.window_view()
+
+            # Clasificación de seña con modelo TensorFlow
+            start_inf = time.perf_counter()
+            try:
+                prediction, confidence = self._predict_scaled(sequence_scaled)
+            except Exception as e:
+                logger.error(f"Error en inferencia: {e}")
+                prediction, confidence = "ERROR_PREDICCION", 0.0
+            self.last_inference_time = time.perf_counter() - start_inf
+            performance.record_stage("inference", self.last_inference_time)
+            performance.increment("inferences")
+            shadow = self.model_registry.shadow if self.model_registry is not None else None
+            if shadow is not None:
+                # Muestra para el candidato en sombra (copia y cola propias; no frena el pipeline)
+                shadow.offer(sequence_scaled, self.classifier, prediction, confidence, self.last_inference_time)
+
+            # Actualiza predicción actual
+            self.current_prediction = (prediction, confidence)
+            self._last_inferred_input[:] = x_input
+            self.frames_since_inference = 0
+            self._force_inference = False
+            self.inferences_run += 1
+            # Solo las inferencias nuevas votan en el decodificador
+            self._decode(prediction, confidence)
+        else:
+            # Entre inferencias se reporta la última predicción
+            prediction, confidence = self.current_prediction
+            self.frames_since_inference += 1
+            self.inferences_skipped += 1
+            performance.increment("inferences_skipped")
+
+        if self.recorder is not None:
+            self.recorder.append(x_input, time.time(), prediction, confidence, num_hands, inferred)
 
         # Dibujar información en frame
         processed_frame = self._annotate_frame(frame, prediction, confidence)
@@ -132,27 +290,90 @@ class VideoProcessor:
 
         return processed_frame, prediction, confidence
 
+    def set_render_options(self, draw_overlay: Optional[bool] = None, export_landmarks: Optional[bool] = None):
+        """Activa/desactiva el dibujo en el servidor y la exportación de landmarks."""
+        if draw_overlay is not None:
+            self.draw_overlay = bool(draw_overlay)
+        if export_landmarks is not None:
+            self.export_landmarks = bool(export_landmarks)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Snapshot de etapas/contadores del pipeline más los gauges de la cámara."""
+        capture = self.camera_manager.get_capture_stats()
+        self.performance.set_gauge("camera_frames_dropped", capture["frames_dropped"])
+        self.performance.set_gauge("camera_capture_fps", capture["capture_fps"])
+        shadow = self.model_registry.shadow if self.model_registry is not None else None
+        if shadow is not None:
+            stats = shadow.get_stats()
+            self.performance.set_gauge("shadow_compared", stats["compared"])
+            if stats["agreement"] is not None:
+                self.performance.set_gauge("shadow_agreement", stats["agreement"])
+                self.performance.set_gauge("shadow_p95_ms", stats["shadow_latency"]["p95_ms"])
+        return self.performance.snapshot()
+
+    def get_landmarks_data(self) -> Optional[List[List[List[float]]]]:
+        """Landmarks del último frame como listas (o None si la exportación está apagada)."""
+        if not self.export_landmarks or self._landmarks is None:
+            return None
+        return landmarks_to_list(self._landmarks, self._num_hands)
+
     def reset_classifier(self):
         """Reinicia el estado interno del clasificador (por compatibilidad futura)."""
         self.current_prediction = ("", 0.0)
+        self._force_inference = True
+        self.sign_decoder.reset()
         logger.info("Clasificador reiniciado correctamente.")
 
     def get_current_prediction(self) -> Tuple[str, float]:
         """Retorna la última predicción y confianza."""
         return self.current_prediction
 
+    def pop_committed_events(self) -> List[SignEvent]:
+        """Retorna y vacía las señas confirmadas desde la última llamada."""
+        events, self._committed_events = self._committed_events, []
+        return events
+
+    def get_inference_stats(self) -> Dict[str, Any]:
+        stats = {
+            "inference_stride": self.inference_stride,
+            "motion_threshold": self.motion_threshold,
+            "inferences_run": self.inferences_run,
+            "inferences_skipped": self.inferences_skipped,
+            "last_inference_ms": round(self.last_inference_time * 1000, 2),
+            "draw_overlay": self.draw_overlay,
+            "frames_rendered": self.renderer.frames_rendered,
+        }
+        if self._model_bundle is not None:
+            stats["model_version"] = self._model_bundle.version
+        if self.inference_server is not None:
+            stats["batch"] = self.inference_server.get_stats()
+        return stats
+
     # ---- Utilidades internas ----
+    def _normalize_landmarks(self, landmarks: np.ndarray, num_hands: int) -> np.ndarray:
+        """Features relativas a la muñeca, como vista plana (126,) lista para el buffer de secuencia."""
+        return normalize_landmarks(landmarks, num_hands, self._features)
+
+    def _decode(self, prediction: str, confidence: float):
+        event = self.sign_decoder.update(prediction, confidence)
+        if event is not None:
+            self._committed_events.append(event)
+
+    def _should_infer(self, x_input: np.ndarray) -> bool:
+        """Decide si este frame ejecuta el modelo o reutiliza la última predicción."""
+        if self._force_inference:
+            return True
+        if self.frames_since_inference + 1 >= self.inference_stride:
+            return True
+        if self.motion_threshold is not None:
+            motion = float(np.abs(x_input - self._last_inferred_input).mean())
+            if motion >= self.motion_threshold:
+                return True
+        return False
+
     def _annotate_frame(self, frame: np.ndarray, text: str, confidence: Optional[float] = None) -> np.ndarray:
-        """Dibuja texto informativo sobre el frame."""
-        annotated = frame.copy()
-        overlay = np.zeros_like(annotated, dtype=np.uint8)
-        cv2.rectangle(overlay, (0, 0), (annotated.shape[1], 40), (0, 0, 0), -1)
-        alpha = 0.6
-        cv2.addWeighted(overlay, alpha, annotated, 1 - alpha, 0, annotated)
-
-        display_text = f"{text}"
-        if confidence is not None and confidence > 0:
-            display_text += f" ({confidence*100:.1f}%)"
-
-        cv2.putText(annotated, display_text, (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-        return annotated
+        """Dibuja manos y texto informativo sobre el frame (en su lugar), si hace falta."""
+        if not (self.draw_overlay or self.show_video):
+            return frame
+        with self.performance.stage("render"):
+            return self.renderer.render(frame, text, confidence, self._landmarks, self._num_hands)
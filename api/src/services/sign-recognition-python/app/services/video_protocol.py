@@ -0,0 +1,145 @@
+# app/services/video_protocol.py
+"""
+Formatos de envío de /ws/video.
+
+- "json" (legado): un mensaje de texto por frame con el JPEG en base64
+  dentro de un data URI, junto con la predicción y las métricas.
+- "binary": cada frame viaja como mensaje binario = cabecera + JPEG crudo.
+  Predicciones y métricas van aparte, como mensajes JSON de texto livianos
+  enviados a menor frecuencia (o al cambiar la predicción).
+
+Cabecera binaria (little-endian, 20 bytes):
+    magic  4s   b"SLV1"
+    seq    uint32   número de frame
+    ts     float64  marca de tiempo del frame procesado (segundos epoch)
+    length uint32   bytes de JPEG que siguen
+"""
+import asyncio
+import base64
+import json
+import logging
+import struct
+import time
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+import cv2
+import numpy as np
+
+if TYPE_CHECKING:
+    from app.utils.performance_monitor import PerformanceMonitor
+
+logger = logging.getLogger(__name__)
+
+PROTOCOLS = ("json", "binary")
+BINARY_MAGIC = b"SLV1"
+BINARY_HEADER = struct.Struct("<4sIdI")
+DEFAULT_JPEG_QUALITY = 70
+
+
+def pack_binary_frame(seq: int, timestamp: float, jpeg: bytes) -> bytes:
+    return BINARY_HEADER.pack(BINARY_MAGIC, seq & 0xFFFFFFFF, timestamp, len(jpeg)) + jpeg
+
+
+def encode_jpeg(frame: np.ndarray, quality: int = DEFAULT_JPEG_QUALITY, scale: float = 1.0) -> bytes:
+    if scale != 1.0:
+        frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+    if not ok:
+        raise ValueError("cv2.imencode no pudo codificar el frame")
+    return buffer.tobytes()
+
+
+class FramePacket:
+    """
+    Resultado de un frame compartido por todos los clientes. Cada
+    representación (JPEG, JSON legado, binario) se calcula una sola vez,
+    la primera vez que un cliente la pide, y queda en caché.
+    """
+
+    def __init__(
+        self,
+        seq: int,
+        frame: np.ndarray,
+        prediction: str,
+        confidence: float,
+        metrics: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[float] = None,
+        landmarks: Optional[List] = None,
+        monitor: Optional["PerformanceMonitor"] = None,
+    ):
+        self.seq = seq
+        self.frame = frame
+        self.prediction = prediction
+        self.confidence = float(confidence)
+        self.metrics = metrics or {}
+        self.timestamp = time.time() if timestamp is None else timestamp
+        # Manos x 21 x xyz normalizados, para clientes que dibujan el overlay
+        self.landmarks = landmarks
+        # Si se pasa, registra la duración de cada codificación JPEG
+        self.monitor = monitor
+        self._cache: Dict[Any, Any] = {}
+
+    async def _cached(self, key, compute):
+        # Si otro cliente ya lo está calculando, se espera el mismo resultado
+        future = self._cache.get(key)
+        if future is None:
+            future = asyncio.ensure_future(compute())
+            self._cache[key] = future
+        # shield: si se cancela el envío de un cliente, la tarea compartida sigue para los demás
+        return await asyncio.shield(future)
+
+    def _encode_jpeg(self, quality: int, scale: float) -> bytes:
+        start = time.perf_counter()
+        jpeg = encode_jpeg(self.frame, quality, scale)
+        if self.monitor is not None:
+            self.monitor.record_stage("jpeg_encode", time.perf_counter() - start)
+            self.monitor.increment("jpeg_encodes")
+        return jpeg
+
+    async def jpeg(self, quality: int = DEFAULT_JPEG_QUALITY, scale: float = 1.0) -> bytes:
+        async def compute():
+            return await asyncio.to_thread(self._encode_jpeg, quality, scale)
+        return await self._cached(("jpeg", quality, scale), compute)
+
+    async def binary_frame(self, quality: int = DEFAULT_JPEG_QUALITY, scale: float = 1.0) -> bytes:
+        async def compute():
+            return pack_binary_frame(self.seq, self.timestamp, await self.jpeg(quality, scale))
+        return await self._cached(("binary", quality, scale), compute)
+
+    async def legacy_json(self, quality: int = DEFAULT_JPEG_QUALITY, scale: float = 1.0) -> str:
+        """Mensaje "video_frame" original (data URI base64 + métricas)."""
+        async def compute():
+            try:
+                jpeg = await self.jpeg(quality, scale)
+                frame_uri = f"data:image/jpeg;base64,{base64.b64encode(jpeg).decode('utf-8')}"
+            except Exception as e:
+                logger.warning(f"Error codificando frame a JPEG: {e}")
+                frame_uri = None
+            return json.dumps({
+                "type": "video_frame",
+                "frame": frame_uri,
+                "prediction": self.prediction,
+                "confidence": self.confidence,
+                **self._landmarks_field(),
+                **self.metrics,
+            })
+        return await self._cached(("legacy_json", quality, scale), compute)
+
+    def _landmarks_field(self) -> Dict[str, Any]:
+        return {"landmarks": self.landmarks} if self.landmarks is not None else {}
+
+    def metadata_json(self) -> str:
+        """Predicción + métricas sin imagen, para el canal de texto del modo binario."""
+        cached = self._cache.get("metadata")
+        if cached is None:
+            cached = json.dumps({
+                "type": "frame_metadata",
+                "seq": self.seq,
+                "timestamp": self.timestamp,
+                "prediction": self.prediction,
+                "confidence": self.confidence,
+                **self._landmarks_field(),
+                **self.metrics,
+            })
+            self._cache["metadata"] = cached
+        return cached
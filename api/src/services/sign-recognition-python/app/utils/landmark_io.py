@@ -0,0 +1,52 @@
+# app/utils/landmark_io.py
+from pathlib import Path
+from typing import Iterable, List, Union
+
+import numpy as np
+
+SEQUENCE_LENGTH = 30
+# Forma de los landmarks de MediaPipe Hands; aquí para no importar MediaPipe donde no hace falta
+MAX_HANDS = 2
+NUM_LANDMARKS = 21
+NUM_FEATURES = MAX_HANDS * NUM_LANDMARKS * 3
+
+
+def to_windows(frames: np.ndarray, window: int = SEQUENCE_LENGTH, step: int = 1) -> np.ndarray:
+    """
+    Convierte frames (T, 126) en ventanas (N, ventana, 126) sin copiar memoria.
+    Si ya vienen como secuencias (N, ventana, 126) se retornan tal cual.
+    """
+    frames = np.asarray(frames, dtype=np.float32)
+    if frames.ndim == 3:
+        return frames
+    if frames.ndim != 2 or frames.shape[1] != NUM_FEATURES:
+        raise ValueError(f"Se esperaban frames (T, {NUM_FEATURES}), se recibió {frames.shape}")
+    if len(frames) < window:
+        return np.empty((0, window, NUM_FEATURES), dtype=np.float32)
+    windows = np.lib.stride_tricks.sliding_window_view(frames, window, axis=0)
+    # sliding_window_view deja la ventana al final: (N, 126, ventana) -> (N, ventana, 126)
+    return windows.transpose(0, 2, 1)[::step]
+
+
+def load_landmark_sequences(paths: Union[str, Path, Iterable[Union[str, Path]]], step: int = 1) -> np.ndarray:
+    """
+    Carga secuencias de landmarks grabadas (.npy o .npz, sin escalar).
+    Acepta arreglos (T, 126) de frames o (N, 30, 126) de secuencias.
+    """
+    if isinstance(paths, (str, Path)):
+        paths = [paths]
+
+    sequences: List[np.ndarray] = []
+    for path in paths:
+        path = Path(path)
+        if path.suffix == ".npz":
+            with np.load(path) as data:
+                arrays = [data[key] for key in data.files]
+        else:
+            arrays = [np.load(path, mmap_mode="r")]
+        for array in arrays:
+            sequences.append(np.ascontiguousarray(to_windows(array, step=step)))
+
+    if not sequences:
+        return np.empty((0, SEQUENCE_LENGTH, NUM_FEATURES), dtype=np.float32)
+    return np.concatenate(sequences, axis=0)
@@ -0,0 +1,334 @@
+# app/utils/landmark_store.py
+"""
+Grabación compacta de landmarks por sesión, para re-evaluar sesiones con
+otro modelo o reproducir una predicción equivocada sin guardar video.
+
+Un archivo `.lmk` por sesión y stream (`<raíz>/<session_id>/<stream_id>.lmk`),
+solo de anexado y mapeado en memoria:
+- cabecera fija (HEADER_DTYPE) con el número de frames confirmados
+- registros fijos (RECORD_DTYPE): landmarks (126,) float32 ya relativos a la
+  muñeca, timestamp, predicción vigente y confianza
+
+El archivo crece por bloques de `chunk_frames` registros. Se graban solo los
+frames que entran al buffer de secuencia (con manos), así las ventanas de 30
+frames consecutivos son exactamente las que vio el modelo en vivo.
+Los lectores solo confían en el contador de la cabecera, que se actualiza
+después de escribir cada registro.
+
+Uso (re-evaluar una sesión con el modelo configurado):
+    python -m app.utils.landmark_store recordings/landmarks/42/default.lmk --batch-size 256
+"""
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.utils.landmark_io import NUM_FEATURES, SEQUENCE_LENGTH, to_windows
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SIGNLMK1"
+FORMAT_VERSION = 1
+LABEL_BYTES = 32
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u4"),
+    ("record_size", "<u4"),
+    ("chunk_frames", "<u4"),
+    ("reserved", "<u4"),
+    ("frames", "<u8"),
+    ("created", "<f8"),
+    ("padding", "V24"),
+])
+HEADER_SIZE = HEADER_DTYPE.itemsize  # 64 bytes
+
+# 552 bytes por frame; los landmarks van primero y quedan alineados a 8 bytes
+RECORD_DTYPE = np.dtype([
+    ("landmarks", "<f4", (NUM_FEATURES,)),
+    ("timestamp", "<f8"),
+    ("confidence", "<f4"),
+    ("num_hands", "u1"),
+    ("inferred", "u1"),  # 1 si en este frame corrió el modelo (si no, es la predicción anterior)
+    ("label", f"S{LABEL_BYTES}"),
+    ("reserved", "V2"),
+])
+
+
+class LandmarkRecorder:
+    """
+    Anexa frames a un archivo `.lmk` (lo crea o continúa uno existente).
+    No es thread-safe: se usa desde el worker del pipeline.
+    """
+
+    def __init__(self, path: Union[str, Path], chunk_frames: int = 1024):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.chunk_frames = max(1, int(chunk_frames))
+        if not self.path.exists() or self.path.stat().st_size < HEADER_SIZE:
+            self._create()
+        self._header = np.memmap(self.path, dtype=HEADER_DTYPE, mode="r+", shape=(1,))
+        _check_header(self._header[0], self.path)
+        # Al continuar un archivo se descarta lo escrito después del último frame confirmado
+        self.frames = int(self._header["frames"][0])
+        self.capacity = 0
+        self._records: Optional[np.memmap] = None
+        self._map(self._capacity_on_disk())
+
+    def _create(self):
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header["magic"] = MAGIC
+        header["version"] = FORMAT_VERSION
+        header["record_size"] = RECORD_DTYPE.itemsize
+        header["chunk_frames"] = self.chunk_frames
+        header["created"] = time.time()
+        with open(self.path, "wb") as f:
+            f.write(header.tobytes())
+
+    def _capacity_on_disk(self) -> int:
+        return (self.path.stat().st_size - HEADER_SIZE) // RECORD_DTYPE.itemsize
+
+    def _map(self, capacity: int):
+        if self._records is not None:
+            self._records.flush()
+            self._records = None
+        if capacity > 0:
+            self._records = np.memmap(
+                self.path, dtype=RECORD_DTYPE, mode="r+", offset=HEADER_SIZE, shape=(capacity,)
+            )
+        self.capacity = capacity
+
+    def _grow(self):
+        """Agrega un bloque de `chunk_frames` registros al final del archivo y lo vuelve a mapear."""
+        capacity = self.capacity + self.chunk_frames
+        with open(self.path, "r+b") as f:
+            f.truncate(HEADER_SIZE + capacity * RECORD_DTYPE.itemsize)
+        self._map(capacity)
+
+    def append(
+        self,
+        landmarks: np.ndarray,
+        timestamp: float,
+        label: str = "",
+        confidence: float = 0.0,
+        num_hands: int = 0,
+        inferred: bool = False,
+    ):
+        """Graba un frame (126,) float32; la escritura va directo al mapeo, sin buffers intermedios."""
+        if self.frames >= self.capacity:
+            self._grow()
+        record = self._records[self.frames]
+        record["landmarks"] = landmarks
+        record["timestamp"] = timestamp
+        record["confidence"] = confidence
+        record["num_hands"] = num_hands
+        record["inferred"] = inferred
+        record["label"] = label.encode("utf-8")[:LABEL_BYTES]
+        self.frames += 1
+        # El contador va después del registro: un lector nunca ve un frame a medio escribir
+        self._header["frames"][0] = self.frames
+
+    def flush(self):
+        """Baja a disco lo escrito (msync); sin esto lo asegura igual el sistema operativo."""
+        if self._records is not None:
+            self._records.flush()
+        self._header.flush()
+
+    def close(self):
+        self.flush()
+        self._records = None
+        self._header = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "frames": self.frames,
+            "capacity": self.capacity,
+            "bytes": HEADER_SIZE + self.capacity * RECORD_DTYPE.itemsize,
+        }
+
+
+def _check_header(header, path: Path):
+    if bytes(header["magic"]) != MAGIC:
+        raise ValueError(f"{path} no es un archivo de landmarks")
+    if int(header["version"]) != FORMAT_VERSION or int(header["record_size"]) != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path}: versión de formato no soportada ({int(header['version'])})")
+
+
+class LandmarkSession:
+    """
+    Lectura de un archivo `.lmk` sin copias: todo lo que retorna son vistas
+    sobre el mapeo de solo lectura (válidas mientras viva el objeto).
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        header = np.fromfile(self.path, dtype=HEADER_DTYPE, count=1)
+        if len(header) == 0:
+            raise ValueError(f"{path} está vacío")
+        _check_header(header[0], self.path)
+        self.created = float(header["created"][0])
+        capacity = (self.path.stat().st_size - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        self.num_frames = min(int(header["frames"][0]), capacity)
+        if self.num_frames > 0:
+            self.records = np.memmap(
+                self.path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(self.num_frames,)
+            )
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def __len__(self) -> int:
+        return self.num_frames
+
+    # ---- Columnas (vistas con el paso del registro) ----
+    @property
+    def landmarks(self) -> np.ndarray:
+        """(T, 126) float32."""
+        return self.records["landmarks"]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self.records["timestamp"]
+
+    @property
+    def confidences(self) -> np.ndarray:
+        return self.records["confidence"]
+
+    def labels(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        return [label.decode("utf-8", "replace") for label in self.records["label"][start:stop]]
+
+    # ---- Recortes ----
+    def time_range(self, start: Optional[float] = None, end: Optional[float] = None) -> Tuple[int, int]:
+        """Índices [inicio, fin) de los frames con timestamp dentro de [start, end)."""
+        timestamps = self.timestamps
+        first = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+        last = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side="left"))
+        return first, last
+
+    def windows(self, start: int = 0, stop: Optional[int] = None, step: int = 1) -> np.ndarray:
+        """
+        Ventanas (N, 30, 126) de frames consecutivos entre `start` y `stop`,
+        sin copiar: cada ventana `i` termina en el frame `start + i * step + 29`.
+        """
+        return to_windows(self.landmarks[start:stop], step=step)
+
+    def replay(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[float, np.ndarray, str, float]]:
+        """Frames en orden: (timestamp, landmarks (126,), predicción grabada, confianza)."""
+        stop = self.num_frames if stop is None else min(stop, self.num_frames)
+        for i in range(start, stop):
+            record = self.records[i]
+            yield float(record["timestamp"]), record["landmarks"], record["label"].decode("utf-8", "replace"), float(record["confidence"])
+
+    # ---- Re-evaluación ----
+    def rescore(self, classifier, batch_size: int = 256, start: int = 0, stop: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Pasa todas las ventanas por `classifier` en lotes y compara con lo
+        grabado en el frame final de cada ventana (solo donde corrió el modelo).
+        """
+        windows = self.windows(start, stop)
+        first = start + SEQUENCE_LENGTH - 1
+        labels: List[str] = []
+        confidences = np.zeros(len(windows), dtype=np.float32)
+        for i in range(0, len(windows), batch_size):
+            # La vista del lote va directo al escalado del modelo (única copia, la propia del escalado)
+            batch = classifier.scale_sequences(windows[i:i + batch_size])
+            for j, (label, confidence) in enumerate(classifier.predict_batch(batch)):
+                labels.append(label)
+                confidences[i + j] = confidence
+
+        recorded = self.records[first:first + len(windows)]
+        inferred = recorded["inferred"].astype(bool)
+        recorded_labels = self.labels(first, first + len(windows))
+        matches = sum(1 for k in np.flatnonzero(inferred) if labels[k] == recorded_labels[k])
+        return {
+            "windows": len(windows),
+            "labels": labels,
+            "confidences": confidences,
+            "timestamps": recorded["timestamp"],
+            "compared": int(inferred.sum()),
+            "agreement": matches / int(inferred.sum()) if inferred.any() else None,
+        }
+
+
+class LandmarkStore:
+    """Carpeta raíz de grabaciones: `<raíz>/<session_id>/<stream_id>.lmk`."""
+
+    SUFFIX = ".lmk"
+
+    def __init__(self, root: Union[str, Path], chunk_frames: int = 1024):
+        self.root = Path(root)
+        self.chunk_frames = chunk_frames
+
+    def path_for(self, session_id: int, stream_id: str = "default") -> Path:
+        return self.root / str(session_id) / f"{stream_id}{self.SUFFIX}"
+
+    def recorder(self, session_id: int, stream_id: str = "default") -> LandmarkRecorder:
+        return LandmarkRecorder(self.path_for(session_id, stream_id), self.chunk_frames)
+
+    def open(self, session_id: int, stream_id: str = "default") -> LandmarkSession:
+        return LandmarkSession(self.path_for(session_id, stream_id))
+
+    def sessions(self) -> Dict[str, List[str]]:
+        """{session_id: [stream_id, ...]} de lo grabado en disco."""
+        if not self.root.is_dir():
+            return {}
+        return {
+            entry.name: sorted(p.stem for p in entry.glob(f"*{self.SUFFIX}"))
+            for entry in sorted(self.root.iterdir())
+            if entry.is_dir()
+        }
+
+
+def main():
+    from app import config
+    from app.models.model_registry import resolve_bundle
+    from app.services.frame_executor import get_shared_classifier
+
+    parser = argparse.ArgumentParser(description="Re-evalúa una sesión grabada (.lmk) con el modelo configurado u otra versión.")
+    parser.add_argument("path", help="Archivo .lmk")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--start", type=float, default=None, help="Timestamp inicial")
+    parser.add_argument("--end", type=float, default=None, help="Timestamp final")
+    parser.add_argument("--output", default=None, help="JSON con las predicciones por ventana")
+    parser.add_argument("--model-version", default=None, help="Versión dentro de SIGN_MODEL_DIR (por defecto el modelo configurado)")
+    args = parser.parse_args()
+
+    session = LandmarkSession(args.path)
+    start, stop = session.time_range(args.start, args.end)
+    if args.model_version:
+        paths = resolve_bundle(config.MODEL_DIR, args.model_version, config.MODEL_BACKEND)
+    else:
+        paths = {
+            "model_path": config.model_path_for_backend(config.MODEL_BACKEND),
+            "vocab_path": config.VOCAB_PATH,
+            "scaler_path": config.SCALER_PATH,
+        }
+    classifier = get_shared_classifier(
+        paths["model_path"], paths["vocab_path"], paths["scaler_path"],
+        config.MODEL_BACKEND, config.TFLITE_THREADS, config.FOLD_SCALER,
+    )
+    began = time.perf_counter()
+    result = session.rescore(classifier, args.batch_size, start, stop)
+    elapsed = time.perf_counter() - began
+    logger.info(
+        f"{result['windows']} ventanas en {elapsed:.2f} s; coincidencia con lo grabado: {result['agreement']}"
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "path": args.path,
+                "agreement": result["agreement"],
+                "predictions": [
+                    {"timestamp": float(t), "label": label, "confidence": round(float(c), 4)}
+                    for t, label, c in zip(result["timestamps"], result["labels"], result["confidences"])
+                ],
+            }, f)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -1,8 +1,9 @@
 # app/utils/performance_monitor.py
 import time
 import logging
+import threading
 from collections import deque
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 try:
     import psutil
@@ -11,15 +12,108 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """
+    Histograma log-lineal al estilo HDR, en microsegundos: 16 sub-buckets por
+    potencia de 2 (error relativo < ~6%), registro O(1) y memoria fija.
+    """
+
+    SUB_BITS = 5
+    HALF = 1 << (SUB_BITS - 1)
+
+    def __init__(self, max_seconds: float = 60.0):
+        self.max_value = int(max_seconds * 1e6)
+        self.counts = [0] * (self._index(self.max_value) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max_seen = 0.0
+
+    @classmethod
+    def _index(cls, value: int) -> int:
+        bucket = max(0, value.bit_length() - cls.SUB_BITS)
+        return (value >> bucket) + bucket * cls.HALF
+
+    @classmethod
+    def _upper_value(cls, index: int) -> int:
+        if index < 2 * cls.HALF:
+            return index
+        bucket = index // cls.HALF - 1
+        sub = index - bucket * cls.HALF
+        return ((sub + 1) << bucket) - 1
+
+    def record(self, seconds: float):
+        value = min(self.max_value, max(0, int(seconds * 1e6)))
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max_seen:
+            self.max_seen = seconds
+
+    def quantile(self, q: float) -> float:
+        """Valor (segundos) bajo el cual cae la fracción `q` de las muestras."""
+        if self.count == 0:
+            return 0.0
+        target = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return self._upper_value(index) / 1e6
+        return self.max_seen
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "max": self.max_seen,
+            "quantiles": {q: self.quantile(q) for q in QUANTILES},
+        }
+
+
+class _StageTimer:
+    """Context manager reutilizable: `with monitor.stage("inference"): ...`."""
+
+    __slots__ = ("monitor", "name", "start")
+
+    def __init__(self, monitor: "PerformanceMonitor", name: str):
+        self.monitor = monitor
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.monitor.record_stage(self.name, time.perf_counter() - self.start)
+        return False
+
+
 class PerformanceMonitor:
-    def __init__(self, window_size: int = 60):
+    def __init__(self, window_size: int = 60, system_sample_interval: float = 1.0):
         self.window_size = window_size
         self.frame_times = deque(maxlen=window_size)
+        self._frame_time_sum = 0.0
         self.start_time = None
         self.last_metrics_time = 0.0
         self.metrics_interval = 5.0  # seg
         self.last_metrics = {}
 
+        # Etapas con nombre, contadores y gauges
+        self._lock = threading.Lock()
+        self._timers: Dict[str, _StageTimer] = {}
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.gauges: Dict[str, float] = {}
+
+        # Uso de CPU/RAM muestreado como máximo una vez por intervalo
+        self.system_sample_interval = system_sample_interval
+        self._system_usage: Optional[Dict[str, float]] = None
+        self._system_sampled_at = 0.0
+
     def start_frame(self):
         """Marca inicio de procesamiento de frame."""
         self.start_time = time.perf_counter()
@@ -29,24 +123,69 @@ class PerformanceMonitor:
         if self.start_time is None:
             return
         duration = time.perf_counter() - self.start_time
+        # Suma móvil: se descuenta el valor que sale de la ventana
+        if len(self.frame_times) == self.window_size:
+            self._frame_time_sum -= self.frame_times[0]
         self.frame_times.append(duration)
+        self._frame_time_sum += duration
+        self.record_stage("frame", duration)
         self.start_time = None
 
     def get_fps(self) -> float:
-        """Calcula FPS promedio."""
+        """Calcula FPS promedio (O(1), sobre la ventana de los últimos frames)."""
         if not self.frame_times:
             return 0.0
-        avg_time = sum(self.frame_times) / len(self.frame_times)
+        avg_time = self._frame_time_sum / len(self.frame_times)
         return 1.0 / avg_time if avg_time > 0 else 0.0
 
+    # ---- Etapas, contadores y gauges ----
+    def stage(self, name: str) -> _StageTimer:
+        """Temporizador de una etapa: `with monitor.stage("mediapipe"): ...`."""
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = _StageTimer(self, name)
+        return timer
+
+    def record_stage(self, name: str, seconds: float):
+        """Registra una duración medida por fuera (p. ej. codificación en otro hilo)."""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def increment(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_gauge(self, name: str, value: float):
+        self.gauges[name] = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copia serializable (se puede enviar desde el proceso worker)."""
+        with self._lock:
+            snapshot = {
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "stages": {name: h.snapshot() for name, h in self.histograms.items()},
+            }
+        if self.frame_times:
+            snapshot["fps"] = self.get_fps()
+        return snapshot
+
+    # ---- Sistema ----
     def get_system_usage(self) -> Optional[Dict[str, float]]:
-        """Devuelve uso actual de CPU y RAM (si psutil disponible)."""
+        """Devuelve uso de CPU y RAM (si psutil disponible), muestreado cada `system_sample_interval` seg."""
         if psutil is None:
             return None
-        return {
-            "cpu_percent": psutil.cpu_percent(interval=None),
-            "ram_percent": psutil.virtual_memory().percent
-        }
+        now = time.monotonic()
+        if self._system_usage is None or now - self._system_sampled_at >= self.system_sample_interval:
+            self._system_usage = {
+                "cpu_percent": psutil.cpu_percent(interval=None),
+                "ram_percent": psutil.virtual_memory().percent
+            }
+            self._system_sampled_at = now
+        return self._system_usage
 
     def maybe_log_metrics(self):
         """Imprime métricas cada cierto tiempo."""
@@ -60,3 +199,52 @@ class PerformanceMonitor:
             logger.info(msg)
             self.last_metrics_time = now
             self.last_metrics = {"fps": fps, **(sys_usage or {})}
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def format_prometheus(sources: List[Tuple[Dict[str, Any], Dict[str, Any]]], prefix: str = "sign_") -> str:
+    """
+    Convierte snapshots de `PerformanceMonitor.snapshot()` al formato de texto
+    de Prometheus. `sources` = [(snapshot, etiquetas)], p. ej. el pipeline y el
+    servidor; las métricas con el mismo nombre se agrupan en una sola familia.
+    """
+    families: Dict[str, Tuple[str, List[str]]] = {}
+
+    def add(metric: str, kind: str, sample: str):
+        families.setdefault(metric, (kind, []))[1].append(sample)
+
+    for snapshot, labels in sources:
+        if "fps" in snapshot:
+            metric = f"{prefix}fps"
+            add(metric, "gauge", f"{metric}{_format_labels(labels)} {snapshot['fps']:.6g}")
+
+        for name, value in sorted(snapshot.get("counters", {}).items()):
+            metric = f"{prefix}{name}_total"
+            add(metric, "counter", f"{metric}{_format_labels(labels)} {value}")
+
+        for name, value in sorted(snapshot.get("gauges", {}).items()):
+            metric = f"{prefix}{name}"
+            add(metric, "gauge", f"{metric}{_format_labels(labels)} {value:.6g}")
+
+        metric = f"{prefix}stage_seconds"
+        for name, data in sorted(snapshot.get("stages", {}).items()):
+            stage_labels = {**labels, "stage": name}
+            for q, value in data["quantiles"].items():
+                add(metric, "summary", f"{metric}{_format_labels({**stage_labels, 'quantile': q})} {value:.6g}")
+            add(metric, "summary", f"{metric}_sum{_format_labels(stage_labels)} {data['sum']:.6g}")
+            add(metric, "summary", f"{metric}_count{_format_labels(stage_labels)} {data['count']}")
+
+    lines: List[str] = []
+    for metric, (kind, samples) in families.items():
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
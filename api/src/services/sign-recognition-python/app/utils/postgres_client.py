@@ -1,33 +1,94 @@
+import asyncio
 import asyncpg
-from typing import Optional, List, Dict
+from collections import deque
+from typing import Any, Callable, Optional, List, Dict, Tuple
 import logging
 
+INSERT_TRANSLATION_SQL = "INSERT INTO translations (sessionId, textOutput, confidence) VALUES ($1, $2, $3)"
+INSERT_SYSTEM_LOG_SQL = "INSERT INTO system_logs (sessionId, eventType, message, severity) VALUES ($1, $2, $3, $4)"
+
+
 class PostgresClient:
-    def __init__(self):
-        self.connection = None
-        self.db_config = {
+    def __init__(
+        self,
+        min_pool_size: int = 1,
+        max_pool_size: int = 10,
+        flush_size: int = 100,
+        flush_interval: float = 1.0,
+        max_pending: int = 10000,
+        enqueue_timeout: Optional[float] = 5.0,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 30.0,
+        db_config: Optional[Dict[str, Any]] = None,
+        pool_factory: Optional[Callable] = None,
+    ):
+        self.pool: Optional[asyncpg.Pool] = None
+        self.db_config = db_config or {
             'host': 'localhost',
             'port': 5432,
             'database': 'TraductionSigns',
             'user': 'postgres',
             'password': 'admin'
         }
-        
-    #Definir conexion a BD:
+        # Mismo contrato que asyncpg.create_pool (p. ej. la base en memoria de las pruebas de carga)
+        self.pool_factory = pool_factory or asyncpg.create_pool
+        self.min_pool_size = min_pool_size
+        self.max_pool_size = max_pool_size
+
+        # Buffer de escritura diferida: se vacía en bloque por tamaño o por tiempo
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        # Las variantes con await esperan lugar (backpressure) hasta este tiempo; None = sin límite
+        self.enqueue_timeout = enqueue_timeout
+        # Lotes fallidos vuelven al frente y se reintentan con espera exponencial
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._failed_attempts = 0
+        self._retry_at = 0.0
+        self._translations: Optional[deque] = None
+        self._system_logs: Optional[deque] = None
+        self._flush_needed: Optional[asyncio.Event] = None
+        self._space_freed: Optional[asyncio.Event] = None
+        # (buffer, registros) que `flush` está escribiendo: siguen ocupando lugar hasta terminar
+        self._in_flight: List[Tuple[deque, deque]] = []
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flusher_task: Optional[asyncio.Task] = None
+        self.records_written = 0
+        self.records_dropped = 0
+        self.flush_failures = 0
+
+    #Definir pool de conexiones a BD:
     async def postgres_connection(self):
-        if not self.connection:
-            try: 
-                self.connection= await asyncpg.connect(**self.db_config)
-                logging.info("Conexión a la base de datos Postgres establecida")
+        self._ensure_buffers()
+        if not self.pool:
+            try:
+                self.pool = await self.pool_factory(
+                    min_size=self.min_pool_size,
+                    max_size=self.max_pool_size,
+                    **self.db_config
+                )
+                logging.info("Pool de conexiones a la base de datos Postgres establecido")
             except Exception as e:
                 logging.error(f"Error al conectar a la base de datos: {e}")
                 raise
-            
+
+    def _ensure_buffers(self):
+        # Las colas se crean dentro del event loop que las va a usar
+        if self._translations is None:
+            self._translations = deque()
+            self._system_logs = deque()
+            self._flush_needed = asyncio.Event()
+            self._space_freed = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+        if self._flusher_task is None or self._flusher_task.done():
+            self._flusher_task = asyncio.create_task(self._flusher())
+
     # Crear una nueva sesión en la base de datos
     async def create_session(self) -> int:
         await self.postgres_connection()
         try:
-            result = await self.connection.fetchrow(
+            result = await self.pool.fetchrow(
                 "INSERT INTO sessions (start_time, end_time) VALUES (NOW(), NOW() + INTERVAL '1 hour') RETURNING id"
             )
             session_id = result['id']
@@ -35,13 +96,15 @@ class PostgresClient:
             return session_id
         except Exception as e:
             logging.error(f"Error al crear una nueva sesión: {e}")
-            raise   
-    
+            raise
+
     # Finalizar una sesión en la base de datos
     async def end_session(self, session_id: int):
         await self.postgres_connection()
         try:
-            await self.connection.execute(
+            # Lo pendiente de la sesión se escribe antes de cerrarla
+            await self.flush()
+            await self.pool.execute(
                 "UPDATE sessions SET end_time = NOW() WHERE id = $1",
                 session_id
             )
@@ -49,38 +112,190 @@ class PostgresClient:
         except Exception as e:
             logging.error(f"Error al finalizar la sesión {session_id}: {e}")
             raise
-        
-    # Guardar la traducción en la base de datos
-    async def save_translation(self, session_id: int, text_output: str, confidence: float):
-        await self.postgres_connection()
+
+    # ---- Escritura diferida ----
+    def _enqueue_nowait(self, buffer: deque, record: Tuple) -> bool:
+        """
+        Nunca espera: con el buffer lleno (p. ej. BD caída) se descarta el registro
+        más antiguo. Retorna False si hubo que descartar.
+        """
+        kept = True
+        if len(buffer) >= self.max_pending:
+            buffer.popleft()
+            self.records_dropped += 1
+            kept = False
+        buffer.append(record)
+        if len(buffer) >= self.flush_size:
+            self._flush_needed.set()
+        return kept
+
+    def _backlog(self, buffer: deque) -> int:
+        return len(buffer) + sum(len(records) for source, records in self._in_flight if source is buffer)
+
+    async def _enqueue(self, buffer: deque, record: Tuple) -> bool:
+        """
+        Backpressure: con el buffer lleno espera a que `flush` libere lugar, hasta
+        `enqueue_timeout`; vencido el plazo se descarta lo más antiguo como en `_enqueue_nowait`.
+        """
+        if self._backlog(buffer) >= self.max_pending:
+            self._flush_needed.set()
+            try:
+                await asyncio.wait_for(self._wait_for_space(buffer), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                logging.warning("Buffer de la base de datos lleno: se descarta el registro más antiguo.")
+        return self._enqueue_nowait(buffer, record)
+
+    async def _wait_for_space(self, buffer: deque):
+        while self._backlog(buffer) >= self.max_pending:
+            self._space_freed.clear()
+            await self._space_freed.wait()
+
+    def _requeue(self, buffer: deque, records: deque):
+        """Devuelve un lote no escrito al frente del buffer, respetando el máximo."""
+        buffer.extendleft(reversed(records))
+        while len(buffer) > self.max_pending:
+            buffer.popleft()
+            self.records_dropped += 1
+
+    # Guardar la traducción en la base de datos (se escribe en bloque; espera si el buffer está lleno)
+    async def save_translation(self, session_id: int, text_output: str, confidence: float) -> bool:
+        self._ensure_buffers()
+        return await self._enqueue(self._translations, (session_id, text_output, float(confidence)))
+
+    def save_translation_nowait(self, session_id: int, text_output: str, confidence: float) -> bool:
+        """Versión sin await para el bucle de frames; si el buffer está lleno, descarta el más antiguo y retorna False."""
+        self._ensure_buffers()
+        return self._enqueue_nowait(self._translations, (session_id, text_output, float(confidence)))
+
+    # Registrar un evento del sistema en la base de datos (se escribe en bloque)
+    async def log_system_event(self, session_id: int, event_type: str, message: str, severity: str = "INFO") -> bool:
+        self._ensure_buffers()
+        return await self._enqueue(self._system_logs, (session_id, event_type, message, severity))
+
+    def log_system_event_nowait(self, session_id: int, event_type: str, message: str, severity: str = "INFO") -> bool:
+        self._ensure_buffers()
+        return self._enqueue_nowait(self._system_logs, (session_id, event_type, message, severity))
+
+    @staticmethod
+    def _drain(buffer: deque) -> deque:
+        records = deque(buffer)
+        buffer.clear()
+        return records
+
+    @staticmethod
+    def _is_connection_error(error: Exception) -> bool:
+        """Errores de conexión (reintentar todo) frente a errores de una fila (descartar solo esa)."""
+        return isinstance(error, asyncpg.PostgresConnectionError) or not isinstance(error, asyncpg.PostgresError)
+
+    async def flush(self):
+        """
+        Escribe en bloque todo lo pendiente (executemany dentro de una transacción).
+        Si el lote falla, vuelve al frente del buffer; en el reintento se escribe
+        fila por fila para que una fila inválida no arrastre a las demás.
+        """
+        if self._translations is None:
+            return
+        async with self._flush_lock:
+            if not self._translations and not self._system_logs:
+                return
+            if not self.pool:
+                try:
+                    await self.postgres_connection()
+                except Exception:
+                    # Sin BD los registros quedan en el buffer y se reintenta luego
+                    self._schedule_retry()
+                    return
+
+            pending = [
+                (INSERT_TRANSLATION_SQL, self._translations, self._drain(self._translations)),
+                (INSERT_SYSTEM_LOG_SQL, self._system_logs, self._drain(self._system_logs)),
+            ]
+            self._in_flight = [(buffer, records) for _, buffer, records in pending]
+            try:
+                await self._write(pending)
+            finally:
+                self._in_flight = []
+                # Los que esperan lugar vuelven a mirar (si el lote falló, siguen esperando)
+                self._space_freed.set()
+
+    async def _write(self, pending: List[Tuple[str, deque, deque]]):
+        written = 0
         try:
-            await self.connection.execute(
-                "INSERT INTO translations (sessionId, textOutput, confidence) VALUES ($1, $2, $3)",
-                session_id, text_output, confidence
-            )
-            logging.info(f"Traducción guardada para la sesión {session_id}: '{text_output}' (confianza: {confidence:.2f})")
+            async with self.pool.acquire() as connection:
+                if self._failed_attempts == 0:
+                    async with connection.transaction():
+                        for sql, _, records in pending:
+                            if records:
+                                await connection.executemany(sql, records)
+                    for _, _, records in pending:
+                        written += len(records)
+                        records.clear()
+                else:
+                    for sql, _, records in pending:
+                        while records:
+                            try:
+                                await connection.execute(sql, *records[0])
+                                written += 1
+                            except Exception as e:
+                                if self._is_connection_error(e):
+                                    raise
+                                self.records_dropped += 1
+                                logging.error(f"Registro descartado por la base de datos {records[0]}: {e}")
+                            records.popleft()
         except Exception as e:
-            logging.error(f"Error al guardar la traducción para la sesión {session_id}: {e}")
-            raise    
-        
-    # Registrar un evento del sistema en la base de datos
-    async def log_system_event(self, session_id: int, event_type: str, message: str, severity: str = "INFO"):
-        await self.postgres_connection()
-        try:
-            await self.connection.execute(
-                "INSERT INTO system_logs (sessionId, eventType, message, severity) VALUES ($1, $2, $3, $4)",
-                session_id, event_type, message, severity
+            for _, buffer, records in reversed(pending):
+                self._requeue(buffer, records)
+            self.records_written += written
+            self._schedule_retry()
+            logging.error(
+                f"Error en escritura en bloque a la base de datos (intento {self._failed_attempts}); "
+                f"se reintenta en {self._retry_at - asyncio.get_running_loop().time():.1f} s: {e}"
             )
-            logging.info(f"Evento del sistema registrado para la sesión {session_id}: {event_type} - {message}")
-        except Exception as e:
-            logging.error(f"Error al registrar el evento del sistema para la sesión {session_id}: {e}")
-            raise
+            return
+
+        self.records_written += written
+        self._failed_attempts = 0
+        self._retry_at = 0.0
+        logging.info(f"Escritura en bloque: {written} registros")
+
+    def _schedule_retry(self):
+        self._failed_attempts += 1
+        self.flush_failures += 1
+        delay = min(self.max_retry_delay, self.retry_delay * 2 ** (self._failed_attempts - 1))
+        self._retry_at = asyncio.get_running_loop().time() + delay
+
+    async def _flusher(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_needed.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_needed.clear()
+            backoff = self._retry_at - asyncio.get_running_loop().time()
+            if backoff > 0:
+                await asyncio.sleep(backoff)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Error en el flusher de la base de datos: {e}")
+
+    def get_buffer_stats(self) -> Dict[str, int]:
+        return {
+            "pending_translations": len(self._translations) if self._translations else 0,
+            "pending_system_logs": len(self._system_logs) if self._system_logs else 0,
+            "records_written": self.records_written,
+            "records_dropped": self.records_dropped,
+            "flush_failures": self.flush_failures,
+        }
 
     # Obtener traducciones de una sesión (método adicional si lo necesitas)
     async def get_session_translations(self, session_id: int) -> List[Dict]:
         await self.postgres_connection()
         try:
-            rows = await self.connection.fetch(
+            await self.flush()
+            rows = await self.pool.fetch(
                 "SELECT id, textOutput, confidence, created_at FROM translations WHERE sessionId = $1 ORDER BY created_at DESC",
                 session_id
             )
@@ -88,12 +303,25 @@ class PostgresClient:
         except Exception as e:
             logging.error(f" Error obteniendo traducciones: {e}")
             return []
-        
+
     async def close_connection(self):
-        if self.connection:
+        # Detener el flusher y escribir lo pendiente antes de cerrar el pool
+        if self._flusher_task is not None:
+            self._flusher_task.cancel()
             try:
-                await self.connection.close()
-                logging.info("Conexión a la base de datos Postgres cerrada")
+                await self._flusher_task
+            except asyncio.CancelledError:
+                pass
+            self._flusher_task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logging.error(f"Error escribiendo pendientes al cerrar: {e}")
+        if self.pool:
+            try:
+                await self.pool.close()
+                self.pool = None
+                logging.info("Pool de conexiones a la base de datos Postgres cerrado")
             except Exception as e:
                 logging.error(f"Error al cerrar la conexión a la base de datos: {e}")
-                raise
\ No newline at end of file
+                raise
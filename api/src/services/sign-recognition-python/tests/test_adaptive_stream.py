@@ -0,0 +1,59 @@
+import pytest
+
+from app.services.adaptive_stream import AdaptiveStreamController
+
+
+def make_controller(**kwargs):
+    options = dict(min_quality=30, max_quality=50, quality_step=10, scales=(1.0, 0.5), min_fps=10.0, max_fps=20.0)
+    options.update(kwargs)
+    return AdaptiveStreamController(**options)
+
+
+def evaluate(controller, send_ms, queue_depth=0, dropped=0):
+    """Un ciclo completo de `evaluate_every` envíos con la misma latencia."""
+    for _ in range(controller.evaluate_every):
+        controller.record_send(send_ms / 1000.0, queue_depth, dropped)
+    return controller.quality, controller.scale, controller.target_fps
+
+
+def test_degrades_quality_then_scale_then_fps():
+    controller = make_controller()
+    steps = [evaluate(controller, 100) for _ in range(5)]
+    assert steps == [(40, 1.0, 20.0), (30, 1.0, 20.0), (30, 0.5, 20.0), (30, 0.5, 15.0), (30, 0.5, 11.25)]
+    assert evaluate(controller, 100)[2] == 10.0  # no baja del mínimo
+
+
+def test_upgrades_in_reverse_order():
+    controller = make_controller()
+    for _ in range(6):
+        evaluate(controller, 100)
+    steps = [evaluate(controller, 1) for _ in range(5)]
+    assert steps == [(30, 0.5, 12.5), (30, 0.5, 15.625), (30, 0.5, 19.53125), (30, 0.5, 20.0), (30, 1.0, 20.0)]
+    assert [evaluate(controller, 1)[0] for _ in range(3)] == [40, 50, 50]
+
+
+def test_queue_depth_and_drops_count_as_congestion():
+    controller = make_controller()
+    assert evaluate(controller, 1, queue_depth=2)[0] == 40
+    dropped = 0
+    for _ in range(controller.evaluate_every):
+        dropped += 1
+        controller.record_send(0.001, 0, dropped)
+    assert controller.quality == 30
+
+
+def test_thumbnail_and_preview_modes_do_not_adapt():
+    controller = make_controller(mode="thumbnail")
+    assert (controller.quality, controller.scale, controller.target_fps) == (30, 0.5, 10.0)
+    assert evaluate(controller, 1) == (30, 0.5, 10.0)
+    controller.set_mode("preview")
+    assert not controller.sends_frames
+    with pytest.raises(ValueError):
+        controller.set_mode("4k")
+
+
+def test_should_send_respects_target_fps():
+    controller = make_controller(max_fps=10.0)
+    assert controller.should_send(now=1.0)
+    assert not controller.should_send(now=1.05)
+    assert controller.should_send(now=1.1)
@@ -0,0 +1,112 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("joblib")
+
+from app.models.model_registry import convert_scaled  # noqa: E402
+from app.models.sign_classifier import NUM_FEATURES, SEQUENCE_LENGTH, SignClassifier  # noqa: E402
+from app.services.batch_inference_server import BatchInferenceServer  # noqa: E402
+
+
+def make_classifier(mean=0.0, scale=1.0, in_graph=False):
+    """SignClassifier sin modelo: `predict_batch` retorna la media de cada secuencia como confianza."""
+    classifier = SignClassifier.__new__(SignClassifier)
+    classifier.scaler_in_graph = in_graph
+    classifier.scaler_mean = np.full(NUM_FEATURES, mean, dtype=np.float32)
+    classifier.scaler_scale = np.full(NUM_FEATURES, scale, dtype=np.float32)
+    classifier.batches = []
+
+    def predict_batch(batch):
+        classifier.batches.append(batch.copy())
+        return [("SEÑA", float(sequence.mean())) for sequence in batch]
+
+    classifier.predict_batch = predict_batch
+    return classifier
+
+
+def sequence(value):
+    return np.full((1, SEQUENCE_LENGTH, NUM_FEATURES), value, dtype=np.float32)
+
+
+def collecting_server(max_batch_size=16, max_wait_ms=8.0, streams=0):
+    """Servidor sin hilo worker, para llamar a `_collect_batch` directamente."""
+    server = BatchInferenceServer(make_classifier(), max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    server._running = True
+    for _ in range(streams):
+        server.register_stream()
+    return server
+
+
+def test_batch_dispatched_once_every_stream_submitted():
+    server = collecting_server(max_wait_ms=10_000, streams=2)
+    server.submit(sequence(1))
+    server.submit(sequence(2))
+    start = time.perf_counter()
+    assert len(server._collect_batch()) == 2
+    assert time.perf_counter() - start < 0.5
+
+
+def test_batch_dispatched_at_deadline_with_missing_streams():
+    server = collecting_server(max_wait_ms=20, streams=3)
+    server.submit(sequence(1))
+    start = time.perf_counter()
+    assert len(server._collect_batch()) == 1
+    assert time.perf_counter() - start >= 0.015
+
+
+def test_batch_capped_at_max_batch_size():
+    server = collecting_server(max_batch_size=2, streams=5)
+    for value in range(5):
+        server.submit(sequence(value))
+    assert len(server._collect_batch()) == 2
+    assert len(server._pending) == 3
+
+
+def test_late_stream_joins_batch_before_deadline():
+    server = collecting_server(max_wait_ms=10_000, streams=2)
+    server.submit(sequence(1))
+    threading.Timer(0.02, server.submit, args=(sequence(2),)).start()
+    assert len(server._collect_batch()) == 2
+
+
+def test_results_routed_back_to_each_stream():
+    server = BatchInferenceServer(make_classifier(), max_wait_ms=50)
+    server.register_stream()
+    server.register_stream()
+    server.start()
+    try:
+        futures = [server.submit(sequence(value)) for value in (1.0, 2.0)]
+        assert [f.result(timeout=1.0)[1] for f in futures] == [1.0, 2.0]
+    finally:
+        server.stop()
+    assert server.batch_size_counts == {2: 1}
+
+
+def test_convert_scaled_between_scalers():
+    raw = np.random.default_rng(0).normal(size=(1, SEQUENCE_LENGTH, NUM_FEATURES)).astype(np.float32)
+    old, new = make_classifier(mean=1.0, scale=2.0), make_classifier(mean=-0.5, scale=0.5)
+    converted = convert_scaled(old.scale_sequences(raw), old, new)
+    np.testing.assert_allclose(converted, new.scale_sequences(raw), rtol=1e-5, atol=1e-5)
+    # Grafo con scaler integrado: la secuencia llega cruda
+    in_graph = make_classifier(in_graph=True)
+    np.testing.assert_allclose(convert_scaled(old.scale_sequences(raw), old, in_graph), raw, rtol=1e-5, atol=1e-5)
+    same = old.scale_sequences(raw)
+    assert convert_scaled(same, old, make_classifier(mean=1.0, scale=2.0)) is same
+
+
+def test_sequence_scaled_for_previous_model_is_converted_on_swap():
+    old, new = make_classifier(mean=1.0, scale=2.0), make_classifier(mean=0.0, scale=1.0)
+    registry = SimpleNamespace(active=SimpleNamespace(classifier=new))
+    server = BatchInferenceServer(old, max_wait_ms=1, model_registry=registry)
+    server.start()
+    try:
+        raw = sequence(3.0)
+        label, confidence = server.submit(old.scale_sequences(raw), old).result(timeout=1.0)
+    finally:
+        server.stop()
+    assert not old.batches
+    assert confidence == pytest.approx(3.0)
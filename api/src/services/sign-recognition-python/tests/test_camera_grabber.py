@@ -0,0 +1,63 @@
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("mediapipe")
+
+from app.services.camera_manager import CameraManager  # noqa: E402
+
+
+class StuckCapture:
+    """Captura cuya lectura queda colgada hasta `unblock` (como un stream de red caído)."""
+
+    def __init__(self):
+        self.reading = threading.Event()
+        self.unblock = threading.Event()
+        self.released = threading.Event()
+        self.reads_after_release = 0
+
+    def set(self, *args):
+        return True
+
+    def read(self):
+        if self.released.is_set():
+            self.reads_after_release += 1
+        self.reading.set()
+        self.unblock.wait()
+        return True, np.zeros((4, 4, 3), dtype=np.uint8)
+
+    def release(self):
+        self.released.set()
+
+
+def make_camera():
+    return CameraManager(remote_detector=object(), esp32_url=None, local_index=None)
+
+
+def test_stuck_grabber_owns_its_capture_and_never_revives(monkeypatch):
+    monkeypatch.setattr(threading.Thread, "join", lambda self, timeout=None: None)
+    camera = make_camera()
+    stuck = StuckCapture()
+    camera._adopt_capture(stuck)
+    stuck.reading.wait(1.0)
+    old_thread = camera._grab_thread
+
+    camera.close()
+    assert not stuck.released.is_set()  # close no libera mientras read() sigue en curso
+
+    fresh = StuckCapture()
+    camera._adopt_capture(fresh)
+    fresh.reading.wait(1.0)
+
+    stuck.unblock.set()
+    assert stuck.released.wait(1.0)
+    monkeypatch.undo()
+    old_thread.join(1.0)
+    assert not old_thread.is_alive()
+    assert stuck.reads_after_release == 0
+    assert camera._latest_seq == 0  # el frame del hilo viejo no se publicó
+
+    fresh.unblock.set()
+    camera.close()
+    assert fresh.released.is_set()
@@ -0,0 +1,16 @@
+import numpy as np
+
+from app.services.detection_pool import DetectionPool
+
+FRAME = np.zeros((4, 4, 3), dtype=np.uint8)
+
+
+def test_detect_unknown_stream_returns_no_hands():
+    pool = DetectionPool(num_workers=1)
+    assert pool.detect(42, FRAME) == (None, 0)
+
+
+def test_detect_after_stop_returns_no_hands():
+    pool = DetectionPool(num_workers=1)
+    pool._streams[1] = object()  # stream que quedó registrado con el pool ya detenido
+    assert pool.detect(1, FRAME) == (None, 0)
@@ -0,0 +1,55 @@
+import asyncio
+
+from app.services.frame_broadcaster import ClientSubscription, FrameBroadcaster
+
+
+def drain(subscription):
+    async def scenario():
+        items = []
+        while True:
+            item = await asyncio.wait_for(subscription.get(), 1.0)
+            if item is None:
+                return items
+            items.append(item)
+
+    return asyncio.run(scenario())
+
+
+def test_frames_drop_oldest_but_events_survive():
+    subscription = ClientSubscription(max_size=2)
+    subscription.push("frame-1")
+    subscription.push("event", droppable=False)
+    subscription.push("frame-2")
+    subscription.push("frame-3")
+    subscription.close()
+    assert drain(subscription) == ["event", "frame-2", "frame-3"]
+    assert subscription.dropped == 1 and subscription.events_dropped == 0
+
+
+def test_close_never_evicts_a_queued_event():
+    subscription = ClientSubscription(max_size=2, max_events=1)
+    subscription.push("event", droppable=False)
+    subscription.close()
+    assert drain(subscription) == ["event"]
+    assert subscription.events_dropped == 0
+
+
+def test_event_overflow_counted_apart_from_frames():
+    subscription = ClientSubscription(max_size=2, max_events=1)
+    subscription.push("event-1", droppable=False)
+    subscription.push("event-2", droppable=False)
+    assert subscription.dropped == 0 and subscription.events_dropped == 1
+
+
+def test_close_subscribers_wakes_waiting_client():
+    async def scenario():
+        broadcaster = FrameBroadcaster(process_frame=None, build_message=None)
+        subscription = broadcaster.subscribe()
+        waiter = asyncio.ensure_future(subscription.get())
+        await asyncio.sleep(0)
+        broadcaster.close_subscribers()
+        return await asyncio.wait_for(waiter, 1.0), broadcaster.get_stats()
+
+    item, stats = asyncio.run(scenario())
+    assert item is None
+    assert stats["dropped"] == 0 and stats["events_dropped"] == 0
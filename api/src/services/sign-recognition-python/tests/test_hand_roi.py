@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from app.services.hand_roi import roi_from_box, roi_to_frame, track_box
+
+FRAME_W, FRAME_H = 640, 480
+
+
+def hand(x0, y0, x1, y1, seed=0):
+    rng = np.random.default_rng(seed)
+    points = np.empty((1, 21, 3), dtype=np.float32)
+    points[0, :, 0] = rng.uniform(x0, x1, 21)
+    points[0, :, 1] = rng.uniform(y0, y1, 21)
+    points[0, :, 2] = rng.uniform(-0.1, 0.1, 21)
+    points[0, 0, :2], points[0, 1, :2] = (x0, y0), (x1, y1)
+    return points
+
+
+def test_track_box_contains_all_hands():
+    landmarks = np.concatenate([hand(0.1, 0.2, 0.3, 0.4), hand(0.5, 0.1, 0.7, 0.6, seed=1)])
+    assert track_box(landmarks) == pytest.approx((0.1, 0.1, 0.7, 0.6))
+
+
+def test_roi_is_square_with_margin_and_clipped():
+    x0, y0, x1, y1 = roi_from_box((0.4, 0.4, 0.5, 0.5), FRAME_W, FRAME_H, margin=0.25)
+    # Lado = el mayor de la caja en px (64) + 25 % por lado
+    assert (x1 - x0, y1 - y0) == (96, 96)
+    assert roi_from_box((0.0, 0.0, 0.1, 0.9), FRAME_W, FRAME_H)[:2] == (0, 0)
+    assert roi_from_box((0.5, 0.5, 0.505, 0.505), FRAME_W, FRAME_H) is None
+
+
+def test_crop_landmarks_map_back_to_full_frame():
+    original = hand(0.3, 0.35, 0.45, 0.55)
+    x0, y0, x1, y1 = roi_from_box(track_box(original), FRAME_W, FRAME_H)
+    roi = (x0 / FRAME_W, y0 / FRAME_H, (x1 - x0) / FRAME_W, (y1 - y0) / FRAME_H)
+    # Lo que MediaPipe entregaría sobre el recorte: normalizado a su ancho y alto
+    in_crop = original.copy()
+    in_crop[..., 0] = (original[..., 0] - roi[0]) / roi[2]
+    in_crop[..., 1] = (original[..., 1] - roi[1]) / roi[3]
+    in_crop[..., 2] = original[..., 2] / roi[2]
+    assert in_crop[..., :2].min() >= 0.0 and in_crop[..., :2].max() <= 1.0
+
+    mapped = roi_to_frame(in_crop, roi)
+    assert mapped is in_crop
+    np.testing.assert_allclose(mapped, original, atol=1e-6)
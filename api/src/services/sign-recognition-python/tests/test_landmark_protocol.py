@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from app.services.landmark_protocol import (
+    HAND_BYTES,
+    LANDMARK_HEADER,
+    pack_landmark_frame,
+    unpack_landmark_frames,
+)
+
+
+def hands(count, value=0.5):
+    return np.full((count, 21, 3), value, dtype=np.float32)
+
+
+def test_round_trip_several_frames_in_one_message():
+    message = pack_landmark_frame(1, 10.0, hands(2, 0.25)) + pack_landmark_frame(2, 0.0, hands(0))
+    frames = list(unpack_landmark_frames(message))
+    assert [(seq, ts, n) for seq, ts, n, _ in frames] == [(1, 10.0, 2), (2, 0.0, 0)]
+    np.testing.assert_array_equal(frames[0][3], hands(2, 0.25))
+    assert frames[1][3].shape == (0, 21, 3)
+
+
+def test_single_hand_without_leading_axis():
+    message = pack_landmark_frame(3, 1.0, hands(1)[0])
+    assert len(message) == LANDMARK_HEADER.size + HAND_BYTES
+    (_, _, num_hands, landmarks), = unpack_landmark_frames(message)
+    assert num_hands == 1
+    np.testing.assert_array_equal(landmarks, hands(1))
+
+
+@pytest.mark.parametrize("landmarks", [hands(3), np.zeros((21, 2), dtype=np.float32)])
+def test_pack_rejects_bad_shapes(landmarks):
+    with pytest.raises(ValueError):
+        pack_landmark_frame(0, 0.0, landmarks)
+
+
+def test_unpack_rejects_malformed_messages():
+    message = pack_landmark_frame(1, 0.0, hands(1))
+    with pytest.raises(ValueError, match="truncado"):
+        list(unpack_landmark_frames(message[:-4]))
+    with pytest.raises(ValueError, match="truncado"):
+        list(unpack_landmark_frames(message[:LANDMARK_HEADER.size - 1]))
+    with pytest.raises(ValueError, match="magic"):
+        list(unpack_landmark_frames(b"XXXX" + message[4:]))
+    too_many = bytearray(pack_landmark_frame(1, 0.0, hands(0)))
+    too_many[16] = 3
+    with pytest.raises(ValueError, match="manos"):
+        list(unpack_landmark_frames(bytes(too_many)))
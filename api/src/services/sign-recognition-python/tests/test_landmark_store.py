@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from app.utils.landmark_io import NUM_FEATURES
+from app.utils.landmark_store import HEADER_SIZE, RECORD_DTYPE, LandmarkRecorder, LandmarkSession
+
+
+def landmarks(value: float) -> np.ndarray:
+    return np.full(NUM_FEATURES, value, dtype=np.float32)
+
+
+def test_append_grows_by_chunks(tmp_path):
+    path = tmp_path / "s" / "default.lmk"
+    recorder = LandmarkRecorder(path, chunk_frames=2)
+    for i in range(3):
+        recorder.append(landmarks(i), 100.0 + i, "A", 0.9, num_hands=1)
+    assert recorder.capacity == 4
+    recorder.close()
+    assert path.stat().st_size == HEADER_SIZE + 4 * RECORD_DTYPE.itemsize
+
+
+def test_reopen_continues_after_last_committed_frame(tmp_path):
+    path = tmp_path / "default.lmk"
+    recorder = LandmarkRecorder(path, chunk_frames=2)
+    for i in range(3):
+        recorder.append(landmarks(i), float(i), "A", 0.5, num_hands=1)
+    recorder.close()
+
+    recorder = LandmarkRecorder(path, chunk_frames=2)
+    assert recorder.frames == 3
+    for i in range(3, 5):
+        recorder.append(landmarks(i), float(i), "B", 0.8, num_hands=2, inferred=True)
+    recorder.close()
+
+    session = LandmarkSession(path)
+    assert len(session) == 5
+    np.testing.assert_array_equal(session.timestamps, np.arange(5, dtype=np.float64))
+    np.testing.assert_array_equal(session.landmarks[:, 0], np.arange(5, dtype=np.float32))
+    assert session.labels() == ["A", "A", "A", "B", "B"]
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / "other.lmk"
+    path.write_bytes(b"x" * (HEADER_SIZE + 10))
+    with pytest.raises(ValueError):
+        LandmarkRecorder(path)
@@ -0,0 +1,51 @@
+import asyncio
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+from app.benchmarks.loadtest_db import InMemoryPool
+from app.benchmarks.mjpeg_server import FrameSource, create_handler, read_stamp, stamp_frame
+
+
+def test_stamp_round_trip():
+    frame = np.full((96, 128, 3), 120, dtype=np.uint8)
+    assert read_stamp(stamp_frame(frame, 123456789)) == 123456789
+
+
+@pytest.fixture
+def mjpeg_server():
+    source = FrameSource([np.zeros((48, 64, 3), dtype=np.uint8)], fps=50.0, stamp=False)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), create_handler(source))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield source, f"http://127.0.0.1:{server.server_address[1]}"
+    source.stop()
+    server.shutdown()
+    server.server_close()
+
+
+def test_capture_waits_for_the_first_frame(mjpeg_server):
+    source, url = mjpeg_server
+    source._running = True  # productor "iniciado" pero sin frames todavía
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(f"{url}/capture", timeout=5)
+    assert error.value.code == 503
+
+    source.start()
+    with urllib.request.urlopen(f"{url}/capture", timeout=5) as response:
+        body = response.read()
+    assert response.status == 200 and body[:2] == b"\xff\xd8"
+
+
+def test_memory_pool_rejects_unsupported_queries():
+    async def scenario():
+        pool = InMemoryPool(latency_ms=0.0)
+        session = await pool.fetchrow("INSERT INTO sessions (start_time, end_time) VALUES (NOW(), NOW()) RETURNING id")
+        with pytest.raises(ValueError):
+            await pool.fetchrow("SELECT 1")
+        return session
+
+    assert asyncio.run(scenario()) == {"id": 1}
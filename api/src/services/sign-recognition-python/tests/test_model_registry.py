@@ -0,0 +1,63 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("joblib")
+
+from app.models.model_registry import ModelBundle, ModelRegistry, ShadowEvaluator  # noqa: E402
+
+
+class FakeClassifier:
+    scaler_in_graph = True
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.started = threading.Event()
+
+    def predict_scaled(self, sequence):
+        self.started.set()
+        time.sleep(self.delay)
+        return "HOLA", 0.9
+
+
+def make_bundle(version, classifier=None):
+    return ModelBundle(version, classifier or FakeClassifier(), {}, "keras")
+
+
+def test_stop_does_not_block_on_a_full_queue():
+    classifier = FakeClassifier(delay=0.2)
+    shadow = ShadowEvaluator(make_bundle("v2", classifier), sample_rate=1.0, max_queue=1)
+    sequence = np.zeros((30, 126), dtype=np.float32)
+    shadow.offer(sequence, classifier, "HOLA", 0.9, 0.001)
+    classifier.started.wait(1.0)
+    shadow.offer(sequence, classifier, "HOLA", 0.9, 0.001)  # llena la cola
+
+    start = time.perf_counter()
+    shadow.signal_stop()
+    assert time.perf_counter() - start < 0.05
+    shadow.stop()
+    assert not shadow._thread.is_alive()
+    shadow.offer(sequence, classifier, "HOLA", 0.9, 0.001)
+    assert shadow.sampled == 2
+
+
+def test_promote_retires_shadow_without_holding_the_lock():
+    registry = ModelRegistry(make_bundle("v1"))
+    registry.bundles["v2"] = make_bundle("v2", FakeClassifier())
+    assert registry.start_shadow("v2", sample_rate=1.0)
+    shadow = registry.shadow
+
+    original_stop = shadow.stop
+    lock_free = []
+
+    def stop(*args, **kwargs):
+        lock_free.append(not registry._lock.locked())
+        original_stop(*args, **kwargs)
+
+    shadow.stop = stop
+    assert registry.promote("v2")
+    assert registry.active.version == "v2" and registry.shadow is None
+    assert lock_free == [True]
+    assert not shadow._thread.is_alive()
@@ -0,0 +1,32 @@
+import pytest
+
+from app.utils.performance_monitor import LatencyHistogram
+
+
+def test_empty_histogram_reports_zero():
+    assert LatencyHistogram().quantile(0.99) == 0.0
+
+
+@pytest.mark.parametrize("q", [0.5, 0.95, 0.99])
+def test_quantiles_within_relative_error(q):
+    histogram = LatencyHistogram()
+    values = [i / 1000.0 for i in range(1, 1001)]  # 1 ms .. 1 s
+    for value in values:
+        histogram.record(value)
+    expected = values[int(q * len(values)) - 1]
+    assert histogram.quantile(q) == pytest.approx(expected, rel=0.07)
+    assert histogram.count == len(values)
+    assert histogram.max_seen == pytest.approx(1.0)
+
+
+def test_values_above_max_are_clamped():
+    histogram = LatencyHistogram(max_seconds=1.0)
+    histogram.record(5.0)
+    assert histogram.quantile(0.5) == pytest.approx(1.0, rel=0.07)
+    assert histogram.max_seen == 5.0
+
+
+def test_negative_values_count_as_zero():
+    histogram = LatencyHistogram()
+    histogram.record(-0.5)
+    assert histogram.quantile(0.5) == 0.0
@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+
+asyncpg = pytest.importorskip("asyncpg")
+
+from app.utils.postgres_client import PostgresClient  # noqa: E402
+
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def transaction(self):
+        return self.pool
+
+    async def executemany(self, sql, rows):
+        if self.pool.down:
+            raise OSError("conexión rechazada")
+        if any(row[1] == "MALA" for row in rows):
+            raise asyncpg.DataError("fila inválida")
+        self.pool.rows.extend(rows)
+
+    async def execute(self, sql, *row):
+        if self.pool.down:
+            raise OSError("conexión rechazada")
+        if row[1] == "MALA":
+            raise asyncpg.DataError("fila inválida")
+        self.pool.rows.append(row)
+
+
+class FakePool:
+    """Pool mínimo: sirve de contexto para acquire() y transaction()."""
+
+    def __init__(self):
+        self.rows = []
+        self.down = False
+
+    def acquire(self):
+        return self
+
+    async def __aenter__(self):
+        return FakeConnection(self)
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def close(self):
+        pass
+
+
+def make_client(pool, **kwargs):
+    async def factory(**_):
+        return pool
+
+    return PostgresClient(pool_factory=factory, flush_interval=60.0, retry_delay=0.0, **kwargs)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_failed_batch_is_requeued_and_written_on_retry():
+    pool = FakePool()
+
+    async def scenario():
+        client = make_client(pool)
+        await client.save_translation(1, "HOLA", 0.9)
+        pool.down = True
+        await client.flush()
+        assert client.get_buffer_stats()["pending_translations"] == 1
+        pool.down = False
+        await client.flush()
+        stats = client.get_buffer_stats()
+        await client.close_connection()
+        return stats
+
+    stats = run(scenario())
+    assert pool.rows == [(1, "HOLA", 0.9)]
+    assert stats["records_dropped"] == 0 and stats["records_written"] == 1
+
+
+def test_bad_row_is_dropped_alone_on_retry():
+    pool = FakePool()
+
+    async def scenario():
+        client = make_client(pool)
+        for text in ("A", "MALA", "B"):
+            await client.save_translation(1, text, 0.9)
+        await client.flush()  # el lote falla y vuelve al buffer
+        await client.flush()  # reintento fila por fila
+        stats = client.get_buffer_stats()
+        await client.close_connection()
+        return stats
+
+    stats = run(scenario())
+    assert [row[1] for row in pool.rows] == ["A", "B"]
+    assert stats["records_dropped"] == 1 and stats["pending_translations"] == 0
+
+
+def test_full_buffer_drops_oldest_without_blocking():
+    pool = FakePool()
+    pool.down = True
+
+    async def scenario():
+        client = make_client(pool, max_pending=2)
+        results = [client.save_translation_nowait(1, text, 0.9) for text in ("A", "B", "C")]
+        await client.flush()
+        pool.down = False
+        await client.flush()
+        stats = client.get_buffer_stats()
+        await client.close_connection()
+        return results, stats
+
+    results, stats = run(scenario())
+    assert results == [True, True, False]
+    assert [row[1] for row in pool.rows] == ["B", "C"]
+    assert stats["records_dropped"] == 1
+
+
+def test_awaiting_writer_waits_for_flush():
+    pool = FakePool()
+
+    async def scenario():
+        client = make_client(pool, max_pending=2)
+        await client.save_translation(1, "A", 0.9)
+        await client.save_translation(1, "B", 0.9)
+        pool.down = True  # el flusher automático no libera lugar
+        writer = asyncio.ensure_future(client.save_translation(1, "C", 0.9))
+        await asyncio.sleep(0.05)
+        blocked = not writer.done()
+        pool.down = False
+        await client.flush()
+        result = await asyncio.wait_for(writer, 1.0)
+        await client.flush()
+        stats = client.get_buffer_stats()
+        await client.close_connection()
+        return blocked, result, stats
+
+    blocked, result, stats = run(scenario())
+    assert blocked and result is True
+    assert [row[1] for row in pool.rows] == ["A", "B", "C"]
+    assert stats["records_dropped"] == 0
+
+
+def test_awaiting_writer_drops_oldest_after_timeout():
+    pool = FakePool()
+    pool.down = True
+
+    async def scenario():
+        client = make_client(pool, max_pending=1, enqueue_timeout=0.05)
+        await client.save_translation(1, "A", 0.9)
+        result = await asyncio.wait_for(client.save_translation(1, "B", 0.9), 1.0)
+        stats = client.get_buffer_stats()
+        pool.down = False
+        await client.close_connection()
+        return result, stats
+
+    result, stats = run(scenario())
+    assert result is False
+    assert stats["records_dropped"] == 1 and stats["pending_translations"] == 1
+    assert [row[1] for row in pool.rows] == ["B"]
@@ -0,0 +1,33 @@
+import subprocess
+import sys
+
+import numpy as np
+
+from app.services.replay_camera import LandmarkReplayCamera, synthetic_landmarks
+
+
+def test_import_does_not_pull_mediapipe():
+    code = "import sys, app.services.replay_camera; print('mediapipe' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_camera_interface_used_by_video_processor():
+    camera = LandmarkReplayCamera(synthetic_landmarks(5))
+    assert camera.initialize()
+    assert camera.remote_detector is None
+    assert camera.warm_up() == 0.0
+    frame = camera.get_frame()
+    landmarks, num_hands = camera.detect_hands_array(frame)
+    assert num_hands == 2 and landmarks.shape == (2, 21, 3)
+
+
+def test_single_hand_moved_to_first_row():
+    frames = np.zeros((1, 2, 21, 3), dtype=np.float32)
+    frames[0, 1] = 0.5
+    camera = LandmarkReplayCamera(frames.reshape(1, -1), loop=False)
+    camera.initialize()
+    landmarks, num_hands = camera.detect_hands_array(camera.get_frame())
+    assert num_hands == 1
+    assert landmarks[0].all() and not landmarks[1].any()
+    assert camera.get_frame() is None
@@ -0,0 +1,56 @@
+import numpy as np
+
+from app.models.sequence_buffer import ScaledSequenceBuffer
+
+
+def frame(value: float, num_features: int = 4) -> np.ndarray:
+    return np.full(num_features, value, dtype=np.float32)
+
+
+def test_window_is_ordered_oldest_to_newest_after_wrap():
+    buffer = ScaledSequenceBuffer(window=3, num_features=4)
+    for value in range(5):
+        buffer.append(frame(value))
+    assert buffer.is_full()
+    view = buffer.window_view()
+    assert view.shape == (1, 3, 4)
+    np.testing.assert_array_equal(view[0, :, 0], [2, 3, 4])
+
+
+def test_window_view_does_not_copy():
+    buffer = ScaledSequenceBuffer(window=3, num_features=4)
+    for value in range(3):
+        buffer.append(frame(value))
+    assert np.shares_memory(buffer.window_view(), buffer._data)
+
+
+def test_append_standardizes_and_raw_frames_undoes_it():
+    mean = np.arange(4, dtype=np.float32)
+    scale = np.full(4, 2.0, dtype=np.float32)
+    buffer = ScaledSequenceBuffer(window=3, num_features=4, mean=mean, scale=scale)
+    raw = [np.array([1, 2, 3, 4], dtype=np.float32), np.array([5, 6, 7, 8], dtype=np.float32)]
+    for values in raw:
+        buffer.append(values)
+    assert not buffer.is_full()
+    np.testing.assert_allclose(buffer.raw_frames(), np.stack(raw), rtol=1e-6)
+    np.testing.assert_allclose(buffer._data[0], (raw[0] - mean) / scale, rtol=1e-6)
+
+
+def test_raw_frames_after_wrap_and_load_frames_round_trip():
+    buffer = ScaledSequenceBuffer(window=3, num_features=4, mean=np.ones(4), scale=np.full(4, 0.5))
+    for value in range(5):
+        buffer.append(frame(value))
+    raw = buffer.raw_frames()
+    np.testing.assert_allclose(raw[:, 0], [2, 3, 4], rtol=1e-6)
+
+    other = ScaledSequenceBuffer(window=3, num_features=4)
+    other.load_frames(raw)
+    np.testing.assert_allclose(other.window_view()[0], raw, rtol=1e-6)
+
+
+def test_clear_empties_buffer():
+    buffer = ScaledSequenceBuffer(window=2, num_features=4)
+    buffer.append(frame(1))
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.raw_frames().shape == (0, 4)
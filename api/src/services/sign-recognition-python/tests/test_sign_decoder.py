@@ -0,0 +1,71 @@
+import pytest
+
+from app.services.sign_decoder import SignDecoder
+
+FRAME = 0.1
+
+
+def feed(decoder, labels, start=0.0, confidence=0.95):
+    events = []
+    for i, label in enumerate(labels):
+        event = decoder.update(label, confidence, start + i * FRAME)
+        if event is not None:
+            events.append(event)
+    return events
+
+
+@pytest.mark.parametrize("mode", ["majority", "ema"])
+def test_sustained_sign_commits_once(mode):
+    decoder = SignDecoder(mode=mode, window=5, min_hold=0.3)
+    events = feed(decoder, ["A"] * 20)
+    assert [e.label for e in events] == ["A"]
+    assert events[0].commit_time - events[0].start_time >= 0.3
+
+
+def test_single_frame_dropout_does_not_recommit():
+    decoder = SignDecoder(window=5, min_hold=0.3)
+    events = feed(decoder, ["A"] * 20 + ["NO_HANDS_DETECTED"] + ["A"] * 20)
+    assert [e.label for e in events] == ["A"]
+
+
+def test_sustained_absence_releases_the_sign():
+    decoder = SignDecoder(window=5, min_hold=0.3, release_frames=3)
+    events = feed(decoder, ["A"] * 20 + ["NO_HANDS_DETECTED"] * 5 + ["A"] * 20)
+    assert [e.label for e in events] == ["A", "A"]
+
+
+def test_absence_must_last_min_hold():
+    decoder = SignDecoder(window=5, min_hold=1.0, release_frames=2)
+    events = feed(decoder, ["A"] * 20 + ["NO_HANDS_DETECTED"] * 3 + ["A"] * 20)
+    assert len(events) == 1
+
+
+def test_flicker_below_majority_is_ignored():
+    decoder = SignDecoder(window=5, min_hold=0.0)
+    assert feed(decoder, ["A", "B", "C", "D", "E"] * 4) == []
+
+
+def test_hysteresis_keeps_candidate_between_thresholds():
+    decoder = SignDecoder(mode="ema", ema_alpha=1.0, enter_threshold=0.8, exit_threshold=0.6, min_hold=0.2)
+    assert decoder.update("A", 0.9, 0.0) is None
+    assert decoder.update("A", 0.7, 0.1) is None  # entre umbrales: sigue siendo candidata
+    event = decoder.update("A", 0.7, 0.25)
+    assert event is not None and event.label == "A"
+
+
+def test_low_confidence_never_commits():
+    decoder = SignDecoder(window=5, min_hold=0.0)
+    assert feed(decoder, ["A"] * 10, confidence=0.5) == []
+
+
+def test_new_sign_commits_after_previous():
+    decoder = SignDecoder(window=3, min_hold=0.2)
+    events = feed(decoder, ["A"] * 10 + ["B"] * 10)
+    assert [e.label for e in events] == ["A", "B"]
+
+
+def test_explicit_reset_allows_same_sign_again():
+    decoder = SignDecoder(window=3, min_hold=0.2)
+    assert len(feed(decoder, ["A"] * 10)) == 1
+    decoder.reset()
+    assert len(feed(decoder, ["A"] * 10, start=5.0)) == 1
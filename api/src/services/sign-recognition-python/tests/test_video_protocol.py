@@ -0,0 +1,43 @@
+import asyncio
+
+import numpy as np
+
+from app.services.video_protocol import BINARY_HEADER, BINARY_MAGIC, FramePacket
+
+
+def make_packet():
+    return FramePacket(7, np.zeros((48, 64, 3), dtype=np.uint8), "HOLA", 0.9, timestamp=123.5)
+
+
+def test_binary_frame_header_and_shared_encoding():
+    async def scenario():
+        packet = make_packet()
+        first, second = await asyncio.gather(packet.binary_frame(), packet.binary_frame())
+        return packet, first, second
+
+    packet, first, second = asyncio.run(scenario())
+    assert first is second
+    magic, seq, timestamp, length = BINARY_HEADER.unpack_from(first)
+    assert (magic, seq, timestamp) == (BINARY_MAGIC, 7, 123.5)
+    assert len(first) == BINARY_HEADER.size + length
+
+
+def test_cancelled_client_does_not_cancel_shared_encoding():
+    async def scenario():
+        packet = make_packet()
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            return b"jpeg"
+
+        slow = asyncio.ensure_future(packet._cached("key", compute))
+        other = asyncio.ensure_future(packet._cached("key", compute))
+        await asyncio.sleep(0)
+        slow.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return await other, slow.cancelled()
+
+    result, cancelled = asyncio.run(scenario())
+    assert result == b"jpeg" and cancelled